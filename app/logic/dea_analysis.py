@@ -1,143 +1,1980 @@
 # ===== IMPORTS & DEPENDENCIES =====
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 import pulp
-from scipy.optimize import linprog 
+from scipy import sparse
+from scipy.optimize import linprog
+
+from . import dea_cache
+
+try:
+    import highspy
+except ImportError:  # optional: fall back to scipy's bundled HiGHS
+    highspy = None
 
 # ===== CORE BUSINESS LOGIC =====
-def _solve_single_sbm(k: int, X: np.ndarray, Y: np.ndarray, exclude_dmu_index: int = None):
+class _LPTemplate:
     """
-    Solve the SBM-VRS model. Can exclude one DMU from the reference set for super-efficiency.
+    Shared layout of the per-DMU LP templates: objective c, sparse matrix A, row and column
+    bounds, and the coefficients (patch_rows, patch_cols, patch_values) that change between
+    DMUs. Solver sessions read these arrays after every load_dmu call.
     """
-    K, m = X.shape
-    _, n = Y.shape
-    prob = pulp.LpProblem(f"SBM_DMU_{k+1}", pulp.LpMinimize)
-
-    w = pulp.LpVariable("w", lowBound=0)  # For super-efficiency, w can be > 1
-    lambda_vars = [pulp.LpVariable(f"lambda_{j+1}", lowBound=0) for j in range(K)]
-    slack_vars = [pulp.LpVariable(f"s_{i+1}", lowBound=0) for i in range(m)]
-
-    prob += w, "Minimize_w"
-    x0 = X[k, :]
-    prob += (
-        w
-        + (1.0 / m)
-        * pulp.lpSum(
-            slack_vars[i] * (1.0 / (x0[i] if x0[i] > 1e-9 else 1e-9)) for i in range(m)
+
+    excluded = None
+    cost_cols = np.zeros(0, dtype=int)  # objective entries that change between DMUs
+
+    def recover(self, values: np.ndarray, row_duals: np.ndarray) -> np.ndarray:
+        """Map a session's solution back to this template's column layout."""
+        return values
+
+    def envelopment_duals(self, values: np.ndarray, row_duals: np.ndarray) -> np.ndarray:
+        """Row duals of the envelopment LP (HiGHS sign convention)."""
+        return row_duals
+
+    def set_convexity(self, lower: float, upper: float):
+        """Set the bounds of the convexity row sum(lambda): [1, 1] VRS, free CRS, (-inf, 1] NIRS."""
+        self.row_lower[self.vrs_row], self.row_upper[self.vrs_row] = lower, upper
+
+    def _exclude(self, exclude_dmu_index: int = None):
+        # Excluding a DMU from the reference set is the same as fixing its lambda at zero
+        if self.excluded is not None:
+            self.col_upper[self.lambda_cols[self.excluded]] = np.inf
+        if exclude_dmu_index is not None:
+            self.col_upper[self.lambda_cols[exclude_dmu_index]] = 0.0
+        self.excluded = exclude_dmu_index
+
+
+class _SBMTemplate(_LPTemplate):
+    """
+    Sparse constraint template of the input-oriented SBM-VRS model.
+
+    The X/Y block is assembled once per run. Columns are [w, lambda_1..lambda_K, s_1..s_m]
+    and rows are [normalisation, m input rows, n output rows, VRS row]. Between DMUs only
+    the right-hand side and the 1/x0 slack coefficients of the normalisation row change;
+    the coefficients that change are listed in patch_rows/patch_cols/patch_values.
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray):
+        K, m = X.shape
+        _, n = Y.shape
+        self.X, self.Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        self.K, self.m, self.n = K, m, n
+        self.lambda_cols = np.arange(1, K + 1)
+        self.slack_cols = np.arange(K + 1, K + 1 + m)
+        self.vrs_row = 1 + m + n
+
+        self.c = np.zeros(1 + K + m)
+        self.c[0] = 1.0
+        self.A = sparse.bmat(
+            [
+                [sparse.csr_matrix(np.ones((1, 1))), None, sparse.csr_matrix(np.ones((1, m)))],
+                [None, sparse.csr_matrix(self.X.T), sparse.identity(m, format="csr")],
+                [None, sparse.csr_matrix(self.Y.T), None],
+                [None, sparse.csr_matrix(np.ones((1, K))), None],
+            ],
+            format="csr",
         )
-        == 1
+        self.row_lower = np.ones(2 + m + n)
+        self.row_upper = np.ones(2 + m + n)
+        self.row_upper[1 + m:1 + m + n] = np.inf
+        self.col_lower = np.zeros(1 + K + m)
+        self.col_upper = np.full(1 + K + m, np.inf)
+        self.patch_rows = np.zeros(m, dtype=int)
+        self.patch_cols = self.slack_cols
+        self.patch_values = np.full(m, 1.0 / m)
+
+    def load_dmu(self, k: int, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates DMU k."""
+        self.load_point(self.X[k, :], self.Y[k, :], exclude_dmu_index)
+
+    def load_point(self, x0: np.ndarray, y0: np.ndarray, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates the point (x0, y0)."""
+        self.row_lower[1:1 + self.m] = x0
+        self.row_upper[1:1 + self.m] = x0
+        self.row_lower[1 + self.m:1 + self.m + self.n] = y0
+        # A zero input forces its slack to zero, so it takes no part in the average
+        self.patch_values = np.where(x0 > 0, 1.0 / (self.m * np.where(x0 > 0, x0, 1.0)), 0.0)
+        self._exclude(exclude_dmu_index)
+
+
+class _BCCTemplate(_LPTemplate):
+    """
+    Sparse constraint template of the input-oriented BCC (VRS) envelopment model.
+
+    Columns are [theta, lambda_1..lambda_K] and rows are [m input rows, n output rows,
+    VRS row]. Between DMUs only the theta column (-x0) and the output right-hand side change.
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray):
+        K, m = X.shape
+        _, n = Y.shape
+        self.X, self.Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        self.K, self.m, self.n = K, m, n
+        self.lambda_cols = np.arange(1, K + 1)
+        self.vrs_row = m + n
+
+        self.c = np.zeros(1 + K)
+        self.c[0] = 1.0
+        # Input rows: sum(lambda_j * X_ij) - theta * X_ik <= 0
+        # Output rows: sum(lambda_j * Y_rj) >= Y_rk
+        self.A = sparse.bmat(
+            [
+                [sparse.csr_matrix(-np.ones((m, 1))), sparse.csr_matrix(self.X.T)],
+                [None, sparse.csr_matrix(self.Y.T)],
+                [None, sparse.csr_matrix(np.ones((1, K)))],
+            ],
+            format="csr",
+        )
+        self.row_lower = np.concatenate([np.full(m, -np.inf), np.zeros(n), [1.0]])
+        self.row_upper = np.concatenate([np.zeros(m), np.full(n, np.inf), [1.0]])
+        self.col_lower = np.zeros(1 + K)
+        self.col_upper = np.full(1 + K, np.inf)
+        self.patch_rows = np.arange(m)
+        self.patch_cols = np.zeros(m, dtype=int)
+        self.patch_values = -np.ones(m)
+
+    def load_dmu(self, k: int, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates DMU k."""
+        self.load_point(self.X[k, :], self.Y[k, :], exclude_dmu_index)
+
+    def load_point(self, x0: np.ndarray, y0: np.ndarray, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates the point (x0, y0)."""
+        self.patch_values = -np.asarray(x0, dtype=float)
+        self.row_lower[self.m:self.m + self.n] = y0
+        self._exclude(exclude_dmu_index)
+
+
+class _CCRTemplate(_BCCTemplate):
+    """
+    Input-oriented CCR (CRS) envelopment model: the BCC template with its convexity row
+    freed, so theta is measured against the conical hull of the reference DMUs.
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray):
+        super().__init__(X, Y)
+        self.set_convexity(-np.inf, np.inf)
+
+
+class _SuperSBMTemplate(_LPTemplate):
+    """
+    Sparse constraint template of Tone's input-oriented super-SBM-VRS model, which scores
+    points outside the reference technology (where the SBM LP is infeasible).
+
+    Columns are [lambda_1..lambda_K, t_1..t_m] and rows are [m input rows, n output rows,
+    VRS row]: X'lambda - t <= x0 and Y'lambda >= y0, minimising mean(t_i / x0_i). Between
+    DMUs only the right-hand side and the costs of t change. recover puts the score
+    1 + mean(t_i / x0_i) first, as the other templates do.
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray):
+        K, m = X.shape
+        _, n = Y.shape
+        self.X, self.Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        self.K, self.m, self.n = K, m, n
+        self.lambda_cols = np.arange(K)
+        self.excess_cols = np.arange(K, K + m)
+        self.vrs_row = m + n
+
+        self.c = np.zeros(K + m)
+        self.A = sparse.bmat(
+            [
+                [sparse.csr_matrix(self.X.T), -sparse.identity(m, format="csr")],
+                [sparse.csr_matrix(self.Y.T), None],
+                [sparse.csr_matrix(np.ones((1, K))), None],
+            ],
+            format="csr",
+        )
+        self.row_lower = np.concatenate([np.full(m, -np.inf), np.zeros(n), [1.0]])
+        self.row_upper = np.concatenate([np.zeros(m), np.full(n, np.inf), [1.0]])
+        self.col_lower = np.zeros(K + m)
+        self.col_upper = np.full(K + m, np.inf)
+        self.patch_rows = self.patch_cols = np.zeros(0, dtype=int)
+        self.patch_values = np.zeros(0)
+        self.cost_cols = self.excess_cols
+
+    def load_dmu(self, k: int, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates DMU k."""
+        self.load_point(self.X[k, :], self.Y[k, :], exclude_dmu_index)
+
+    def load_point(self, x0: np.ndarray, y0: np.ndarray, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates the point (x0, y0)."""
+        self.row_upper[:self.m] = x0
+        self.row_lower[self.m:self.m + self.n] = y0
+        # A zero input takes no part in the average, as in _SBMTemplate
+        self.c[self.excess_cols] = np.where(x0 > 0, 1.0 / (self.m * np.where(x0 > 0, x0, 1.0)), 0.0)
+        self._exclude(exclude_dmu_index)
+
+    def recover(self, values: np.ndarray, row_duals: np.ndarray) -> np.ndarray:
+        return np.concatenate([[1.0 + self.c @ values], values])
+
+
+class _MultiplierTemplate(_LPTemplate):
+    """
+    Multiplier (dual) form of an envelopment template: the exact LP dual of min c.x subject
+    to the template's EQ/GE/LE rows and 0 <= x. It has one column per envelopment row
+    (m+n+1 or m+n+2) and one row per envelopment column (K+1 or K+m+1), which suits
+    long-and-narrow data. Excluding a DMU frees its row. The envelopment solution (score,
+    lambdas, slacks) is recovered from the row duals, so callers see the same layout.
+    """
+
+    def __init__(self, envelopment: _LPTemplate):
+        self.envelopment = e = envelopment
+        self.lambda_cols = e.lambda_cols
+        self.A = e.A.T.tocsr()
+        self.row_lower = np.full(len(e.c), -np.inf)
+        self.row_upper = e.c.copy()
+        self.cost_cols = np.arange(len(e.row_lower))
+        self._refresh()
+
+    def _refresh(self):
+        # The sign of every multiplier follows the sense of its envelopment row, which
+        # set_convexity may change between solves
+        e = self.envelopment
+        eq = e.row_lower == e.row_upper
+        ge = ~eq & (e.row_upper == np.inf)
+        le = ~eq & ~ge
+        # A free row (e.g. the freed convexity row of _CCRTemplate) has a zero dual
+        self.free = (e.row_lower == -np.inf) & (e.row_upper == np.inf)
+        self.b_from_lower = ~le
+        self.col_lower = np.where(ge, 0.0, -np.inf)
+        self.col_upper = np.where(le | self.free, 0.0, np.inf)
+        self.c = -np.where(self.free, 0.0, np.where(self.b_from_lower, e.row_lower, e.row_upper))
+        self.patch_rows, self.patch_cols, self.patch_values = e.patch_cols, e.patch_rows, e.patch_values
+        self.row_upper = np.where(e.col_upper == 0.0, np.inf, e.c)
+
+    def load_dmu(self, k: int, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates DMU k."""
+        self.envelopment.load_dmu(k, exclude_dmu_index)
+        self._refresh()
+
+    def load_point(self, x0: np.ndarray, y0: np.ndarray, exclude_dmu_index: int = None):
+        """Patch the template in place so that it evaluates the point (x0, y0)."""
+        self.envelopment.load_point(x0, y0, exclude_dmu_index)
+        self._refresh()
+
+    def set_convexity(self, lower: float, upper: float):
+        self.envelopment.set_convexity(lower, upper)
+        self._refresh()
+
+    def recover(self, values: np.ndarray, row_duals: np.ndarray) -> np.ndarray:
+        # Envelopment variables are the (sign-flipped) duals of the multiplier rows, and the
+        # multipliers are the envelopment row duals
+        return self.envelopment.recover(-row_duals, values)
+
+    def envelopment_duals(self, values: np.ndarray, row_duals: np.ndarray) -> np.ndarray:
+        # The multipliers are the envelopment row duals
+        return values
+
+
+# With formulation='auto', the multiplier form is used from this many reference DMUs per
+# input/output column upwards
+_MULTIPLIER_RATIO = 1000
+FORMULATIONS = ("auto", "envelopment", "multiplier")
+
+
+def _use_multiplier(formulation: str, n_reference: int, m: int, n: int) -> bool:
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"فرمول‌بندی '{formulation}' پشتیبانی نمی‌شود.")
+    if formulation == "auto":
+        return n_reference / (m + n) >= _MULTIPLIER_RATIO
+    return formulation == "multiplier"
+
+
+class _PulpSession:
+    """
+    CBC backend: a PuLP model built once from an LP template and re-solved after every patch.
+
+    Kept as a fallback for machines without HiGHS; every solve still starts the bundled
+    cbc executable.
+    """
+
+    def __init__(self, template, tolerance: float = None):
+        self.template = template
+        options = [] if tolerance is None else [f"primalTolerance {tolerance}", f"dualTolerance {tolerance}"]
+        self.solver = pulp.PULP_CBC_CMD(msg=False, options=options)
+        self.prob = pulp.LpProblem("DEA", pulp.LpMinimize)
+        n_cols = template.A.shape[1]
+        self.variables = [pulp.LpVariable(f"v_{j}") for j in range(n_cols)]
+        cost_cols = np.union1d(np.flatnonzero(template.c), template.cost_cols)
+        self.prob += pulp.LpAffineExpression([(self.variables[j], float(template.c[j])) for j in cost_cols])
+
+        A = template.A
+        self.rows = []
+        for i in range(A.shape[0]):
+            cols = A.indices[A.indptr[i]:A.indptr[i + 1]]
+            vals = A.data[A.indptr[i]:A.indptr[i + 1]]
+            expr = pulp.LpAffineExpression([(self.variables[j], float(v)) for j, v in zip(cols, vals)])
+            self.rows.append(pulp.LpConstraint(expr, pulp.LpConstraintEQ, f"R_{i}", 0))
+        # Rows enter the model in solve(); a free row (both bounds infinite) stays out of it
+        self.active = np.zeros(len(self.rows), dtype=bool)
+        self.col_lower = np.full(n_cols, -np.inf)
+        self.col_upper = np.full(n_cols, np.inf)
+        self.row_duals = np.full(len(self.rows), np.nan)
+        self.time_limit = None  # seconds for the next solve
+        self.status, self.iterations, self.objective, self.solve_time = None, None, None, 0.0
+
+    def solve(self):
+        """Copy the DMU-specific parts of the template into the model and solve it."""
+        t = self.template
+        for i, row in enumerate(self.rows):
+            free = t.row_lower[i] == -np.inf and t.row_upper[i] == np.inf
+            if free != (not self.active[i]):
+                if free:
+                    del self.prob.constraints[row.name]
+                else:
+                    self.prob.addConstraint(row)
+                self.active[i] = not free
+            if t.row_upper[i] == np.inf:
+                row.sense = pulp.LpConstraintGE
+            elif t.row_lower[i] == -np.inf:
+                row.sense = pulp.LpConstraintLE
+            else:
+                row.sense = pulp.LpConstraintEQ
+            rhs = t.row_upper[i] if t.row_lower[i] == -np.inf else t.row_lower[i]
+            row.constant = -float(np.clip(rhs, -_INFINITY, _INFINITY))
+        for i, j, v in zip(t.patch_rows, t.patch_cols, t.patch_values):
+            self.rows[i].expr[self.variables[j]] = float(v)
+        for j in t.cost_cols:
+            self.prob.objective[self.variables[j]] = float(t.c[j])
+        for j in np.flatnonzero((t.col_lower != self.col_lower) | (t.col_upper != self.col_upper)):
+            self.variables[j].lowBound = None if t.col_lower[j] == -np.inf else float(t.col_lower[j])
+            self.variables[j].upBound = None if t.col_upper[j] == np.inf else float(t.col_upper[j])
+        self.col_lower, self.col_upper = t.col_lower.copy(), t.col_upper.copy()
+
+        self.solver.timeLimit = self.time_limit
+        start = time.perf_counter()
+        self.prob.solve(self.solver)
+        self.solve_time = time.perf_counter() - start
+        # CBC's iteration count is not exposed through PuLP
+        self.status = pulp.LpStatus[self.prob.status].lower()
+        if self.prob.status == pulp.LpStatusOptimal and self.prob.sol_status != pulp.LpSolutionOptimal:
+            # PuLP reports CBC stopped on timeLimit with a feasible point as optimal
+            self.status = "time limit"
+            self.prob.status = pulp.LpStatusNotSolved
+        self.objective = pulp.value(self.prob.objective)
+        if self.prob.status != pulp.LpStatusOptimal:
+            self.row_duals = np.full(len(self.rows), np.nan)
+            return np.full(len(self.variables), np.nan)
+        self.row_duals = np.array([
+            (np.nan if row.pi is None else row.pi) if active else 0.0 for row, active in zip(self.rows, self.active)
+        ])
+        return np.array([np.nan if v.varValue is None else v.varValue for v in self.variables])
+
+
+class _HighsSession:
+    """
+    In-process HiGHS backend. The model is passed to HiGHS once; each solve only changes
+    row bounds, patched coefficients and column bounds, so HiGHS restarts from the previous
+    optimal basis instead of solving from scratch.
+    """
+
+    def __init__(self, template, tolerance: float = None):
+        self.template = template
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        if tolerance is not None:
+            self.highs.setOptionValue("primal_feasibility_tolerance", tolerance)
+            self.highs.setOptionValue("dual_feasibility_tolerance", tolerance)
+
+        A = template.A.tocsc()
+        lp = highspy.HighsLp()
+        lp.num_row_, lp.num_col_ = A.shape
+        lp.col_cost_ = template.c
+        lp.col_lower_ = template.col_lower
+        lp.col_upper_ = template.col_upper
+        lp.row_lower_ = template.row_lower
+        lp.row_upper_ = template.row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.num_row_, lp.a_matrix_.num_col_ = A.shape
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+        self.highs.passModel(lp)
+        self.cost_cols = np.asarray(template.cost_cols, dtype=np.int32)
+        self.row_lower, self.row_upper = template.row_lower.copy(), template.row_upper.copy()
+        self.col_lower, self.col_upper = template.col_lower.copy(), template.col_upper.copy()
+        self.row_duals = np.full(A.shape[0], np.nan)
+        self.time_limit = None  # seconds for the next solve
+        self.status, self.iterations, self.objective, self.solve_time = None, None, None, 0.0
+
+    def solve(self):
+        """Push the DMU-specific parts of the template into HiGHS and re-solve."""
+        t, h = self.template, self.highs
+        changed = np.flatnonzero((t.row_lower != self.row_lower) | (t.row_upper != self.row_upper)).astype(np.int32)
+        if len(changed):
+            h.changeRowsBounds(len(changed), changed, t.row_lower[changed], t.row_upper[changed])
+            self.row_lower, self.row_upper = t.row_lower.copy(), t.row_upper.copy()
+        for i, j, v in zip(t.patch_rows, t.patch_cols, t.patch_values):
+            h.changeCoeff(int(i), int(j), float(v))
+        if len(self.cost_cols):
+            h.changeColsCost(len(self.cost_cols), self.cost_cols, t.c[self.cost_cols])
+        changed = np.flatnonzero((t.col_lower != self.col_lower) | (t.col_upper != self.col_upper)).astype(np.int32)
+        if len(changed):
+            h.changeColsBounds(len(changed), changed, t.col_lower[changed], t.col_upper[changed])
+            self.col_lower, self.col_upper = t.col_lower.copy(), t.col_upper.copy()
+
+        h.setOptionValue("time_limit", np.inf if self.time_limit is None else float(self.time_limit))
+        start = time.perf_counter()
+        h.run()
+        self.solve_time = time.perf_counter() - start
+        status = h.getModelStatus()
+        info = h.getInfo()
+        self.status = h.modelStatusToString(status).lower()
+        self.iterations, self.objective = info.simplex_iteration_count, info.objective_function_value
+        if status != highspy.HighsModelStatus.kOptimal:
+            self.row_duals = np.full(len(t.row_lower), np.nan)
+            return np.full(len(t.c), np.nan)
+        solution = h.getSolution()
+        self.row_duals = np.array(solution.row_dual)
+        return np.array(solution.col_value)
+
+
+_LINPROG_STATUS = {0: "optimal", 1: "iteration_or_time_limit", 2: "infeasible", 3: "unbounded", 4: "numerical_error"}
+
+
+class _LinprogSession:
+    """
+    In-process HiGHS through scipy.optimize.linprog, used when highspy is not installed.
+    The sparse matrices are split into equality and inequality blocks once; only their
+    patched entries and right-hand sides are refreshed per solve (no warm start).
+    """
+
+    def __init__(self, template, tolerance: float = None):
+        self.template = template
+        self.options = {} if tolerance is None else {
+            "primal_feasibility_tolerance": tolerance, "dual_feasibility_tolerance": tolerance
+        }
+        self.A = template.A.tocsr()
+        self.row_duals = np.full(self.A.shape[0], np.nan)
+        self._split()
+        self.time_limit = None  # seconds for the next solve
+        self.status, self.iterations, self.objective, self.solve_time = None, None, None, 0.0
+
+    def _senses(self):
+        t = self.template
+        eq = t.row_lower == t.row_upper
+        return eq, ~eq & (t.row_upper == np.inf)
+
+    def _split(self):
+        # Split the rows by their current sense; done again when set_convexity changes one
+        self.senses = eq, ge = self._senses()
+        self.eq_rows, self.le_rows, self.ge_rows = np.flatnonzero(eq), np.flatnonzero(~eq & ~ge), np.flatnonzero(ge)
+        self.ub_rows = np.concatenate([self.le_rows, self.ge_rows])
+        sign = np.concatenate([np.ones(len(self.le_rows)), -np.ones(len(self.ge_rows))])
+        self.A_eq = self.A[self.eq_rows].tocsr()
+        self.A_ub = (sparse.diags(sign) @ self.A[self.ub_rows]).tocsr()
+        self.ub_sign = sign
+
+        # Locate every patched coefficient in the split matrices once
+        self.A_eq.sort_indices()
+        self.A_ub.sort_indices()
+        self.patch_slots = []
+        for i, j in zip(self.template.patch_rows, self.template.patch_cols):
+            if eq[i]:
+                M, r, sgn = self.A_eq, int(np.searchsorted(self.eq_rows, i)), 1.0
+            else:
+                r = int(np.flatnonzero(self.ub_rows == i)[0])
+                M, sgn = self.A_ub, sign[r]
+            start, end = M.indptr[r], M.indptr[r + 1]
+            self.patch_slots.append((M, start + int(np.searchsorted(M.indices[start:end], j)), sgn))
+
+    def solve(self):
+        """Refresh the DMU-specific entries and solve with linprog(method='highs')."""
+        t = self.template
+        if any((now != before).any() for now, before in zip(self._senses(), self.senses)):
+            self._split()
+        for (M, pos, sgn), v in zip(self.patch_slots, t.patch_values):
+            M.data[pos] = sgn * v
+        # linprog rejects infinite right-hand sides; HiGHS treats _INFINITY as infinite anyway
+        b_ub = np.clip(np.concatenate([t.row_upper[self.le_rows], -t.row_lower[self.ge_rows]]), None, _INFINITY)
+        bounds = np.column_stack([
+            np.where(t.col_lower == -np.inf, None, t.col_lower), np.where(t.col_upper == np.inf, None, t.col_upper)
+        ])
+        start = time.perf_counter()
+        res = linprog(
+            t.c,
+            A_ub=self.A_ub if len(b_ub) else None,
+            b_ub=b_ub if len(b_ub) else None,
+            A_eq=self.A_eq if len(self.eq_rows) else None,
+            b_eq=t.row_lower[self.eq_rows] if len(self.eq_rows) else None,
+            bounds=bounds,
+            method="highs",
+            options=self.options if self.time_limit is None else dict(self.options, time_limit=self.time_limit),
+        )
+        self.solve_time = time.perf_counter() - start
+        self.status = _LINPROG_STATUS.get(res.status, "error")
+        self.iterations, self.objective = res.nit, res.fun
+        self.row_duals = np.full(len(t.row_lower), np.nan)
+        if not res.success:
+            return np.full(len(t.c), np.nan)
+        if len(b_ub):
+            self.row_duals[self.ub_rows] = self.ub_sign * res.ineqlin.marginals
+        if len(self.eq_rows):
+            self.row_duals[self.eq_rows] = res.eqlin.marginals
+        return res.x
+
+
+SOLVER_BACKENDS = ("highs", "cbc")
+_INFINITY = 1e30
+_FEASIBILITY_TOLERANCE = 1e-7  # default of both HiGHS and CBC; part of the cache key
+
+
+def _open_session(template, solver: str = "highs", tolerance: float = None, time_limit: float = None):
+    """
+    Build a solver session for an LP template.
+
+    'highs' solves in-process (highspy when installed, otherwise scipy's bundled HiGHS);
+    'cbc' is the previous PuLP + CBC executable path. tolerance overrides the solver's
+    primal/dual feasibility tolerances; time_limit (seconds) bounds every solve.
+    """
+    if solver == "highs":
+        session_cls = _HighsSession if highspy is not None else _LinprogSession
+        session = session_cls(template, tolerance)
+    elif solver == "cbc":
+        session = _PulpSession(template, tolerance)
+    else:
+        raise ValueError(f"حل‌کننده '{solver}' پشتیبانی نمی‌شود.")
+    session.time_limit = time_limit
+    return session
+
+
+def _patch_slots(A: sparse.csr_matrix, template) -> list:
+    # Positions of the template's patched coefficients in A.data (A in CSR with sorted indices)
+    return [
+        A.indptr[i] + int(np.searchsorted(A.indices[A.indptr[i]:A.indptr[i + 1]], j))
+        for i, j in zip(template.patch_rows, template.patch_cols)
+    ]
+
+
+class _StackedTemplate:
+    """
+    Several DMU subproblems of one template laid out as a single block-diagonal LP.
+    It has no patches; sessions solve it once and split the solution by block_offsets.
+    """
+
+    patch_rows = patch_cols = patch_values = cost_cols = np.zeros(0, dtype=int)
+
+    def __init__(self, template, X: np.ndarray, Y: np.ndarray, tasks: list):
+        A = template.A.tocsr()
+        A.sort_indices()
+        slots = _patch_slots(A, template)
+        blocks, parts = [], {"c": [], "row_lower": [], "row_upper": [], "col_lower": [], "col_upper": []}
+        for k, exclude_position in tasks:
+            template.load_point(X[k], Y[k], exclude_dmu_index=exclude_position)
+            block = A.copy()
+            block.data[slots] = template.patch_values
+            blocks.append(block)
+            for name, values in parts.items():
+                values.append(getattr(template, name).copy())
+        self.A = sparse.block_diag(blocks, format="csr")
+        for name, values in parts.items():
+            setattr(self, name, np.concatenate(values))
+        self.block_offsets = np.arange(len(tasks) + 1) * A.shape[1]
+        self.row_offsets = np.arange(len(tasks) + 1) * A.shape[0]
+
+
+class _SnapshotTemplate:
+    """
+    Copy of the LP a template currently holds (its DMU loaded, patches applied), for a
+    one-off solve on a fresh session. With rescale every row, bounds included, is divided
+    by its largest absolute coefficient; row_duals maps the duals back to the original rows.
+    """
+
+    patch_rows = patch_cols = patch_values = cost_cols = np.zeros(0, dtype=int)
+
+    def __init__(self, template, rescale: bool = False):
+        A = template.A.tocsr(copy=True)
+        A.sort_indices()
+        A.data[_patch_slots(A, template)] = template.patch_values
+        self.row_scale = np.ones(A.shape[0])
+        if rescale:
+            peak = abs(A).max(axis=1).toarray().ravel()
+            self.row_scale = np.where(peak > 0, 1.0 / np.where(peak > 0, peak, 1.0), 1.0)
+        self.A = sparse.diags(self.row_scale) @ A
+        self.row_lower, self.row_upper = template.row_lower * self.row_scale, template.row_upper * self.row_scale
+        self.c = template.c.copy()
+        self.col_lower, self.col_upper = template.col_lower.copy(), template.col_upper.copy()
+
+    def row_duals(self, row_duals: np.ndarray) -> np.ndarray:
+        return row_duals * self.row_scale
+
+
+def _envelopment_status(session) -> str:
+    # Status of the envelopment LP a session answers for. A multiplier LP is never empty
+    # here (the envelopment objectives are bounded below), so an unbounded one means an
+    # infeasible envelopment LP, e.g. a super-SBM point that no other DMU reaches
+    if isinstance(session.template, _MultiplierTemplate) and session.status in (
+        "unbounded", "primal infeasible or unbounded"
+    ):
+        return "infeasible"
+    return session.status
+
+
+# LP outcomes that are answers; any other status (time or iteration limit, numerical
+# trouble) sends the LP through the fallback chain of _solve_tasks
+_DEFINITE_STATUSES = ("optimal", "infeasible")
+
+
+def _time_left(time_limit: float = None, deadline: float = None):
+    # Seconds the next LP may take: the per-LP limit, capped by the run's deadline (time.time())
+    if deadline is None:
+        return time_limit
+    left = max(0.0, deadline - time.time())
+    return left if time_limit is None else min(time_limit, left)
+
+
+def _fallback_solve(template, solver: str, time_limit: float = None, deadline: float = None):
+    """
+    Retry the LP a template holds after its session gave no answer: first rescaled on a
+    fresh session (no warm start), then on the other backend. Returns (values, row_duals,
+    session, strategy), with strategy None when every attempt failed or time ran out.
+    """
+    other = "cbc" if solver == "highs" else "highs"
+    session = None
+    for strategy, backend, rescale in (("rescaled", solver, True), (other, other, False)):
+        limit = _time_left(time_limit, deadline)
+        if limit is not None and limit <= 0:
+            break
+        snapshot = _SnapshotTemplate(template, rescale)
+        try:
+            session = _open_session(snapshot, backend, time_limit=limit)
+            values = session.solve()
+        except Exception:
+            continue  # backend not available (e.g. no cbc executable)
+        if session.status in _DEFINITE_STATUSES:
+            return values, snapshot.row_duals(session.row_duals), session, strategy
+    return np.full(len(template.c), np.nan), np.full(len(template.row_lower), np.nan), session, None
+
+
+def _task_result(template, values: np.ndarray, row_duals: np.ndarray, with_duals: bool = False) -> np.ndarray:
+    # The template's solution, followed by the envelopment row duals when requested
+    solution = template.recover(values, row_duals)
+    if not with_duals:
+        return solution
+    return np.concatenate([solution, template.envelopment_duals(values, row_duals)])
+
+
+def _lp_record(
+    k: int, session, build_time: float, solve_time: float, iterations, batch: int = 1, fallback: str = None,
+    status: str = None,
+) -> dict:
+    # Measurements of one DMU's LP; batch > 1 marks a share of a stacked LP, fallback the
+    # strategy that produced the answer after the first solve failed
+    return {
+        "dmu": int(k), "build_time": build_time, "solve_time": solve_time, "iterations": iterations,
+        "status": status or session.status, "objective": None if session is None else session.objective,
+        "batch": batch, "fallback": fallback,
+    }
+
+
+def _solve_stacked(
+    template, X: np.ndarray, Y: np.ndarray, tasks: list, solver: str = "highs", with_duals: bool = False,
+    records: list = None, time_limit: float = None, deadline: float = None,
+):
+    """
+    Solve a batch of tasks in one block-diagonal LP. Returns None when the stacked LP is
+    not optimal (one infeasible block makes the whole LP infeasible). The build and solve
+    time of a successful stack are split evenly over its tasks in records. The stacked LP
+    gets time_limit per task.
+    """
+    limit = _time_left(None if time_limit is None else time_limit * len(tasks), deadline)
+    if limit is not None and limit <= 0:
+        return None
+    start = time.perf_counter()
+    stacked = _StackedTemplate(template, X, Y, tasks)
+    session = _open_session(stacked, solver, time_limit=limit)
+    values = session.solve()
+    if np.isnan(values).any():
+        return None
+    if records is not None:
+        build_time = (time.perf_counter() - start - session.solve_time) / len(tasks)
+        records.extend(
+            _lp_record(k, session, build_time, session.solve_time / len(tasks), session.iterations, len(tasks))
+            for k, _ in tasks
+        )
+    blocks = zip(np.split(values, stacked.block_offsets[1:-1]), np.split(session.row_duals, stacked.row_offsets[1:-1]))
+    results = []
+    for (k, exclude_position), (block_values, block_duals) in zip(tasks, blocks):
+        # recover may read the loaded DMU (the super-SBM score uses its 1/x0 costs), and
+        # building the stack left the last task loaded
+        template.load_point(X[k], Y[k], exclude_dmu_index=exclude_position)
+        results.append(_task_result(template, block_values, block_duals, with_duals))
+    return results
+
+
+_BATCH_PROBES = (16, 64, 256)
+
+
+def _solve_tasks(
+    session, X: np.ndarray, Y: np.ndarray, tasks: list, solver: str = "highs", batch_size=None, with_duals: bool = False,
+    records: list = None, time_limit: float = None, deadline: float = None,
+):
+    """
+    Yield the solution of every (k, exclude_position) task, in order (with_duals appends
+    the envelopment row duals). The measurements of every LP are appended to records.
+
+    With batch_size > 1 tasks are solved batch_size at a time as one stacked LP; a batch
+    whose stacked LP fails is re-solved DMU by DMU. batch_size='auto' times the per-DMU
+    loop and a few stacked sizes on the first tasks and keeps the fastest per DMU.
+
+    Every LP may take time_limit seconds, and none starts after deadline (time.time()).
+    An LP without a definite answer goes through _fallback_solve; if that fails too, or
+    the deadline has passed, its solution is NaN and its record has status 'unresolved'.
+    """
+    unresolved = []
+
+    def single(batch):
+        for k, exclude_position in batch:
+            start = time.perf_counter()
+            session.time_limit = _time_left(time_limit, deadline)
+            if session.time_limit is not None and session.time_limit <= 0:
+                if records is not None:
+                    records.append(_lp_record(k, None, 0.0, 0.0, None, status="unresolved"))
+                if not unresolved:
+                    template = session.template
+                    unresolved.append(_task_result(
+                        template, np.full(len(template.c), np.nan), np.full(len(template.row_lower), np.nan), with_duals
+                    ))
+                yield unresolved[0].copy()
+                continue
+            session.template.load_point(X[k], Y[k], exclude_dmu_index=exclude_position)
+            values, row_duals, solved_by, fallback = session.solve(), session.row_duals, session, None
+            solve_time, iterations = session.solve_time, session.iterations
+            status = _envelopment_status(session)
+            if status not in _DEFINITE_STATUSES:
+                values, row_duals, solved_by, fallback = _fallback_solve(session.template, solver, time_limit, deadline)
+                if solved_by is not None and solved_by is not session:
+                    solve_time += solved_by.solve_time
+                status = "unresolved" if fallback is None else None
+            if records is not None:
+                build_time = time.perf_counter() - start - solve_time
+                records.append(_lp_record(
+                    k, solved_by, build_time, solve_time, iterations, fallback=fallback, status=status,
+                ))
+            yield _task_result(session.template, values, row_duals, with_duals)
+
+    def stacked(batch):
+        values = _solve_stacked(session.template, X, Y, batch, solver, with_duals, records, time_limit, deadline)
+        yield from (single(batch) if values is None else values)
+
+    pos = 0
+    if batch_size == "auto":
+        # Probe growing stack sizes on real tasks; stop once a size is slower per DMU
+        timings = {}
+        for size in (1,) + _BATCH_PROBES:
+            batch = tasks[pos:pos + max(size, _BATCH_PROBES[0])]
+            if not batch:
+                break
+            start = time.perf_counter()
+            yield from (single(batch) if size == 1 else stacked(batch))
+            timings[size] = (time.perf_counter() - start) / len(batch)
+            pos += len(batch)
+            if timings[size] > min(timings.values()):
+                break
+        batch_size = min(timings, key=timings.get) if timings else 1
+    if not batch_size or batch_size <= 1:
+        yield from single(tasks[pos:])
+        return
+    for start in range(pos, len(tasks), batch_size):
+        yield from stacked(tasks[start:start + batch_size])
+
+
+# Per-process state of pool workers: one template and solver session, built once per worker
+_worker_state = None
+
+
+def _build_template(template_cls, X: np.ndarray, Y: np.ndarray, multiplier: bool = False):
+    template = template_cls(X, Y)
+    return _MultiplierTemplate(template) if multiplier else template
+
+
+def _init_worker(
+    template_cls, X, Y, reference: np.ndarray, solver: str, batch_size, multiplier: bool, time_limit: float = None,
+    deadline: float = None,
+):
+    global _worker_state
+    session = _open_session(_build_template(template_cls, X[reference], Y[reference], multiplier), solver)
+    _worker_state = (session, X, Y, solver, batch_size, time_limit, deadline)
+
+
+def _solve_chunk(tasks: list, with_duals: bool = False, convexity: tuple = None):
+    """Solve a chunk of tasks in a worker; rows are returned as CSR, with the LP records."""
+    session, X, Y, solver, batch_size, time_limit, deadline = _worker_state
+    if convexity is not None:
+        session.template.set_convexity(*convexity)
+    records = []
+    solutions = np.vstack(list(_solve_tasks(
+        session, X, Y, tasks, solver, batch_size, with_duals, records, time_limit, deadline
+    )))
+    return sparse.csr_matrix(solutions), records
+
+
+def _resolve_n_jobs(n_jobs: int = None) -> int:
+    if n_jobs is None or n_jobs == 1:
+        return 1
+    if n_jobs <= 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+class _DMUSolver:
+    """
+    Solves (k, exclude_dmu_index) tasks against one LP template, either in this process
+    or on a process pool. With n_jobs > 1 (or n_jobs <= 0 for all cores) X and Y are sent
+    to each worker once through the pool initializer; tasks travel in chunks and results
+    come back in task order.
+
+    reference optionally restricts the lambda columns to a subset of the DMUs (see
+    _frontier_reference); every DMU is still evaluated, and the lambda part of each
+    solution is indexed by position in self.reference. batch_size enables the stacked
+    block-diagonal mode of _solve_tasks, and formulation picks the envelopment or
+    multiplier form ('auto' switches on the reference size per input/output).
+    time_limit (seconds per LP) and deadline (time.time() of the run's end) are passed
+    on to _solve_tasks; the DMUs it leaves unresolved are collected in self.unresolved.
+    """
+
+    def __init__(
+        self, template_cls, X: np.ndarray, Y: np.ndarray, solver: str = "highs", n_jobs: int = None,
+        reference: np.ndarray = None, batch_size=None, formulation: str = "envelopment",
+        time_limit: float = None, deadline: float = None,
+    ):
+        self.n_jobs = _resolve_n_jobs(n_jobs)
+        self.reference = np.arange(X.shape[0]) if reference is None else np.asarray(reference)
+        self.X, self.Y = X, Y
+        self.solver, self.batch_size = solver, batch_size
+        self.time_limit, self.deadline = time_limit, deadline
+        self.records = []  # one measurement dict per solved LP (see _lp_record)
+        self.unresolved = set()
+        self._noted = 0
+        multiplier = _use_multiplier(formulation, len(self.reference), X.shape[1], Y.shape[1])
+        self.pool = None
+        if self.n_jobs == 1:
+            template = _build_template(template_cls, X[self.reference], Y[self.reference], multiplier)
+            self.session = _open_session(template, solver)
+        else:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_init_worker,
+                initargs=(template_cls, X, Y, self.reference, solver, batch_size, multiplier, time_limit, deadline),
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def _position(self, exclude_dmu_index: int = None):
+        # Position of a DMU among the reference columns, or None when it is not one of them
+        if exclude_dmu_index is None:
+            return None
+        pos = int(np.searchsorted(self.reference, exclude_dmu_index))
+        return pos if pos < len(self.reference) and self.reference[pos] == exclude_dmu_index else None
+
+    def solve(self, tasks: list, with_duals: bool = False, convexity: tuple = None):
+        """
+        Yield the primal solution vector of every task, in order. with_duals appends the
+        row duals of the envelopment LP to each vector. convexity (lower, upper) first
+        re-bounds the template's convexity row (see _LPTemplate.set_convexity); the
+        session keeps its matrix and warm start.
+        """
+        tasks = [(k, self._position(exclude_dmu_index)) for k, exclude_dmu_index in tasks]
+        if self.pool is None:
+            if convexity is not None:
+                self.session.template.set_convexity(*convexity)
+            for values in _solve_tasks(
+                self.session, self.X, self.Y, tasks, self.solver, self.batch_size, with_duals, self.records,
+                self.time_limit, self.deadline,
+            ):
+                self._note_unresolved()
+                yield values
+            return
+        chunk_size = max(1, -(-len(tasks) // (self.n_jobs * 4)))
+        chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+        for block, records in self.pool.map(
+            _solve_chunk, chunks, [with_duals] * len(chunks), [convexity] * len(chunks)
+        ):
+            self.records.extend(records)
+            self._note_unresolved()
+            yield from block.toarray()
+
+    def _note_unresolved(self):
+        # A task's record is in self.records before its solution is yielded
+        self.unresolved.update(r["dmu"] for r in self.records[self._noted:] if r["status"] == "unresolved")
+        self._noted = len(self.records)
+
+
+def _dominance(X: np.ndarray, Y: np.ndarray):
+    """
+    For every DMU, count the DMUs that dominate it (no more of any input, no less of any
+    output, strictly better in at least one) and keep the index of one such dominator.
+    Pairwise comparisons run in row blocks so the boolean tensors stay around 20M entries.
+    """
+    K = X.shape[0]
+    counts = np.zeros(K, dtype=int)
+    dominator = np.full(K, -1)
+    block = max(1, int(2e7 // max(1, K * (X.shape[1] + Y.shape[1]))))
+    for start in range(0, K, block):
+        xb, yb = X[start:start + block, None, :], Y[start:start + block, None, :]
+        weak = (X[None] <= xb).all(axis=2) & (Y[None] >= yb).all(axis=2)
+        strict = (X[None] < xb).any(axis=2) | (Y[None] > yb).any(axis=2)
+        dom = weak & strict  # dom[i, j]: DMU j dominates DMU start + i
+        counts[start:start + block] = dom.sum(axis=1)
+        dominator[start:start + block] = np.where(dom.any(axis=1), dom.argmax(axis=1), -1)
+    return counts, dominator
+
+
+def _frontier_reference(
+    X: np.ndarray, Y: np.ndarray, solver: str = "highs", tol: float = 1e-9, time_limit: float = None,
+    deadline: float = None,
+):
+    """
+    Find the extreme-efficient DMUs, a reference set that spans the same VRS technology as
+    all K DMUs, so every SBM/BCC envelopment LP can carry only these lambda columns.
+
+    Dominated DMUs are dropped first. The remaining candidates are tested in order of a
+    cheap output/input ratio against the hull built so far (a BCC LP over the current hull
+    only); candidates outside it join the hull. A final pass drops hull members that the
+    other members already span. Also returns the dominance counts and dominators.
+    Membership LPs run with tight feasibility tolerances: a hull DMU wrongly judged as
+    spanned would shift every score that leans on it. A membership LP that fails (e.g. on
+    time_limit) keeps its DMU in the hull, which only makes the reference set larger. So
+    does the deadline (time.time()): past it no membership LP starts, and every DMU not yet
+    tested stays in the hull.
+    """
+    counts, dominator = _dominance(X, Y)
+    candidates = np.flatnonzero(counts == 0)
+    Xn = X / np.where(X.mean(axis=0) > 0, X.mean(axis=0), 1.0)
+    Yn = Y / np.where(Y.mean(axis=0) > 0, Y.mean(axis=0), 1.0)
+    ratio = Yn[candidates].sum(axis=1) / np.maximum(Xn[candidates].sum(axis=1), 1e-12)
+    candidates = candidates[np.argsort(-ratio, kind="stable")]
+
+    def outside(template, session, k, exclude=None):
+        if deadline is not None and time.time() >= deadline:
+            return True
+        template.load_point(X[k], Y[k], exclude_dmu_index=exclude)
+        session.time_limit = _time_left(time_limit, deadline)
+        theta = session.solve()[0]
+        return np.isnan(theta) or theta > 1 + tol
+
+    hull = list(candidates[:X.shape[1] + Y.shape[1]])
+    pos = len(hull)
+    while pos < len(candidates):
+        template = _BCCTemplate(X[hull], Y[hull])
+        session = _open_session(template, solver, tolerance=1e-10, time_limit=time_limit)
+        chunk = candidates[pos:pos + max(16, len(hull))]
+        hull.extend(k for k in chunk if outside(template, session, k))
+        pos += len(chunk)
+
+    # Drop hull members spanned by the rest; a dropped member keeps its lambda fixed at zero
+    template = _BCCTemplate(X[hull], Y[hull])
+    session = _open_session(template, solver, tolerance=1e-10, time_limit=time_limit)
+    keep = np.ones(len(hull), dtype=bool)
+    for i, k in enumerate(hull):
+        if not outside(template, session, k, exclude=i):
+            keep[i] = False
+            template.excluded = None
+    return np.sort(np.asarray(hull)[keep]), counts, dominator
+
+
+def _single_frontier(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    VRS frontier of one input x and one output y: the DMUs at the vertices of the lower
+    convex hull of the (y, x) points, from the smallest input up to the largest output,
+    ordered by output. A sort and one scan over the non-dominated staircase, no LP.
+    """
+    order = np.lexsort((x, y))
+    ys = y[order]
+    order = order[np.r_[True, ys[1:] != ys[:-1]]]  # smallest input per output level
+    xs = x[order]
+    # Keep the points that need strictly less input than every point with more output
+    suffix_min = np.minimum.accumulate(xs[::-1])[::-1]
+    staircase = order[np.r_[xs[:-1] < suffix_min[1:], True]]
+    hull = []
+    for k in staircase:
+        while len(hull) >= 2:
+            o, a = hull[-2], hull[-1]
+            if (y[a] - y[o]) * (x[k] - x[o]) - (x[a] - x[o]) * (y[k] - y[o]) > 0:
+                break
+            hull.pop()
+        hull.append(k)
+    return np.asarray(hull)
+
+
+def _single_projection(x: np.ndarray, y: np.ndarray, y0: np.ndarray):
+    """
+    Minimal input g(y0) of the VRS technology of (x, y) for every output level in y0, with
+    the two frontier DMUs spanning it and their lambdas, and the supporting line x = a*y + b.
+    """
+    hull = _single_frontier(x, y)
+    hx, hy = x[hull], y[hull]
+    right = np.clip(np.searchsorted(hy, y0), 1, max(1, len(hull) - 1))
+    left = right - 1
+    if len(hull) == 1:
+        right = left
+    span = hy[right] - hy[left]
+    slope = np.divide(hx[right] - hx[left], span, out=np.zeros(len(y0)), where=span > 0)
+    # Below the smallest-input vertex the frontier is flat
+    flat = y0 <= hy[0]
+    t = np.where(flat, 0.0, np.divide(y0 - hy[left], span, out=np.zeros(len(y0)), where=span > 0))
+    slope = np.where(flat, 0.0, slope)
+    g = np.where(flat, hx[0], hx[left] + t * (hx[right] - hx[left]))
+    intercept = g - slope * y0
+    return g, hull[left], hull[right], 1.0 - t, t, slope, intercept
+
+
+# Share of a run's remaining time budget the frontier search may take before the untested
+# DMUs join the reference set as they are
+_FRONTIER_BUDGET_SHARE = 0.5
+
+# Session-level store of intermediate results, keyed by a fingerprint of the data and the
+# model, so that e.g. the ranking run can reuse the SBM scores of an efficiency run.
+# Frontiers have an LRU of their own: a Malmquist panel stores one per period and must not
+# push the shared scores out.
+_STORE_SIZE = 8
+_result_store = OrderedDict()
+_FRONTIER_STORE_SIZE = 16
+_frontier_store = OrderedDict()
+
+
+def _store_key(model: str, X: np.ndarray, Y: np.ndarray) -> str:
+    h = hashlib.sha256(model.encode())
+    for M in (X, Y):
+        M = np.ascontiguousarray(M, dtype=float)
+        h.update(str(M.shape).encode())
+        h.update(M.tobytes())
+    return h.hexdigest()
+
+
+def _store_entry(key: str, store: OrderedDict = _result_store, size: int = _STORE_SIZE) -> dict:
+    """Return the (possibly new) store entry for key and mark it as most recently used."""
+    entry = store.pop(key, {})
+    store[key] = entry
+    while len(store) > size:
+        store.popitem(last=False)
+    return entry
+
+
+def clear_result_store():
+    """Forget all results shared between DEA runs in this session."""
+    _result_store.clear()
+    _frontier_store.clear()
+
+
+def _cached_frontier(
+    X: np.ndarray, Y: np.ndarray, solver: str = "highs", time_limit: float = None, deadline: float = None
+):
+    # Under a run deadline the frontier search gets _FRONTIER_BUDGET_SHARE of the time left,
+    # so the DMU LPs still get the rest. A search cut short returns a larger reference set
+    # (still the same technology) and is not stored.
+    entry = _store_entry(_store_key("vrs-frontier", X, Y), _frontier_store, _FRONTIER_STORE_SIZE)
+    if "frontier" in entry:
+        return entry["frontier"]
+    cutoff = None if deadline is None else time.time() + _FRONTIER_BUDGET_SHARE * max(0.0, deadline - time.time())
+    frontier = _frontier_reference(X, Y, solver, time_limit=time_limit, deadline=cutoff)
+    if cutoff is None or time.time() < cutoff:
+        entry["frontier"] = frontier
+    return frontier
+
+
+class _Presolve:
+    """
+    Shared presolve of the DEA entry points. Input/output columns that are constant over
+    all DMUs (all-zero included) are dropped, keeping at least one of each, and the rest
+    are rescaled to unit mean magnitude; X and Y hold the presolved data. BCC and SBM
+    scores do not depend on column units, and a constant SBM input only has zero slacks,
+    so the sbm_* methods map presolved results back to the original columns and units.
+    zero_input flags the DMUs with a zero in a kept input.
+
+    DMUs with identical (X, Y) rows share every score, so only one representative per
+    group (its first DMU) needs an LP; fan_out maps the results back to the members.
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray):
+        self.m, self.n = X.shape[1], Y.shape[1]
+        self.constant_inputs = np.ptp(X, axis=0) == 0
+        self.constant_outputs = np.ptp(Y, axis=0) == 0
+        self.inputs = np.flatnonzero(~self.constant_inputs) if not self.constant_inputs.all() else np.arange(1)
+        self.outputs = np.flatnonzero(~self.constant_outputs) if not self.constant_outputs.all() else np.arange(1)
+        self.kept = (tuple(self.inputs), tuple(self.outputs))
+        self.input_scale = self._scale(X[:, self.inputs])
+        self.output_scale = self._scale(Y[:, self.outputs])
+        self.X = X[:, self.inputs] / self.input_scale
+        self.Y = Y[:, self.outputs] / self.output_scale
+        self.zero_input = np.flatnonzero((X[:, self.inputs] == 0).any(axis=1))
+        _, first, group = np.unique(np.hstack([X, Y]), axis=0, return_index=True, return_inverse=True)
+        group = group.ravel()
+        self.representative = first[group]
+        self.representatives = np.sort(first)
+        self.group_size = np.bincount(group)[group]
+
+    @staticmethod
+    def _scale(M: np.ndarray) -> np.ndarray:
+        scale = np.abs(M).mean(axis=0)
+        return np.where(scale > 0, scale, 1.0)
+
+    def sbm_scores(self, scores):
+        # The objective averages the slack ratios over all m inputs; dropped ones add zero
+        return 1.0 - len(self.inputs) / self.m * (1.0 - scores)
+
+    def sbm_slacks(self, slacks: np.ndarray) -> np.ndarray:
+        full = np.where(np.isnan(slacks).any(axis=-1, keepdims=True), np.nan, 0.0)
+        full = np.broadcast_to(full, slacks.shape[:-1] + (self.m,)).copy()
+        full[..., self.inputs] = slacks * self.input_scale
+        return full
+
+    def sbm_duals(self, duals: np.ndarray) -> np.ndarray:
+        """Row duals [normalisation, inputs, outputs, VRS] of the original SBM LP."""
+        m, n = len(self.inputs), len(self.outputs)
+        full = np.zeros(duals.shape[:-1] + (2 + self.m + self.n,))
+        full[..., 0] = duals[..., 0]
+        full[..., 1 + self.inputs] = duals[..., 1:1 + m] / self.input_scale
+        full[..., 1 + self.m + self.outputs] = duals[..., 1 + m:1 + m + n] / self.output_scale
+        full[..., -1] = duals[..., -1]
+        return full * (m / self.m)
+
+    def fan_out(self, dmus: np.ndarray):
+        """
+        Representatives to solve for the DMUs in dmus, and for each representative the
+        positions in dmus that take its result.
+        """
+        representatives, inverse = np.unique(self.representative[dmus], return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind="stable")
+        return representatives, np.split(order, np.cumsum(np.bincount(inverse.ravel()))[:-1])
+
+    def note(self, report, dmu_names: list, inputs: list, outputs: list):
+        """Record what the presolve changed in a RunReport."""
+        if report is None:
+            return
+        report.presolve = {
+            "dropped_inputs": [inputs[i] for i in range(self.m) if i not in self.inputs],
+            "dropped_outputs": [outputs[r] for r in range(self.n) if r not in self.outputs],
+            "constant_inputs": [inputs[i] for i in np.flatnonzero(self.constant_inputs)],
+            "zero_input_dmus": [dmu_names[k] for k in self.zero_input],
+            "duplicate_dmus": int(len(self.representative) - len(self.representatives)),
+        }
+
+
+class RunReport:
+    """
+    Per-LP measurements of one DEA run. Pass an instance as report= to an entry point and
+    it receives one record per LP: dmu, phase, build_time, solve_time, iterations, status,
+    objective, batch (> 1 for a share of a stacked LP) and fallback (the strategy that
+    answered after the first solve failed; status 'unresolved' when none did, or when the
+    run's time budget ran out first). Frontier-detection LPs are not
+    recorded; a result read from the disk cache records no LPs and sets cached. presolve
+    lists the dropped columns, the zero-input DMUs and the number of duplicate DMUs that
+    were not solved separately (see _Presolve). bootstrap summarises a bootstrap run
+    (replicates, cached, unresolved_lps, wall_time); its LPs are not recorded.
+    """
+
+    COLUMNS = ["dmu", "phase", "build_time", "solve_time", "iterations", "status", "objective", "batch", "fallback"]
+
+    def __init__(self):
+        self.model = None
+        self.dmu_names = []
+        self.records = []
+        self.cached = False
+        self.wall_time = None
+        self.presolve = {}
+        self.bootstrap = {}
+
+    def add(self, records: list, phase: str):
+        for record in records:
+            self.records.append(dict(record, phase=phase))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """One row per LP, with DMU names instead of indices."""
+        df = pd.DataFrame(self.records, columns=self.COLUMNS)
+        df["dmu"] = [self.dmu_names[k] for k in df["dmu"]]
+        return df
+
+    def failed(self) -> pd.DataFrame:
+        """The LPs that did not end optimal."""
+        df = self.to_dataframe()
+        return df[df["status"] != "optimal"]
+
+    def unresolved(self) -> list:
+        """Names of the DMUs left without an answer by the time limits and the fallback chain."""
+        df = self.to_dataframe()
+        return df.loc[df["status"] == "unresolved", "dmu"].drop_duplicates().tolist()
+
+    def summary(self, slowest: int = 10) -> dict:
+        """Totals, time/iteration percentiles, the slowest LPs and the failed solves."""
+        df = self.to_dataframe()
+        df["time"] = (df["build_time"] + df["solve_time"]).astype(float)
+        iterations = pd.to_numeric(df["iterations"], errors="coerce").dropna()
+        percentiles = (50, 90, 99, 100)
+        return {
+            "model": self.model,
+            "cached": self.cached,
+            "wall_time": self.wall_time,
+            "n_lps": len(df),
+            "n_failed": int((df["status"] != "optimal").sum()),
+            "build_time": float(df["build_time"].sum()),
+            "solve_time": float(df["solve_time"].sum()),
+            "lp_time_percentiles": {f"p{q}": float(np.percentile(df["time"], q)) for q in percentiles} if len(df) else {},
+            "iteration_percentiles": (
+                {f"p{q}": float(np.percentile(iterations, q)) for q in percentiles} if len(iterations) else {}
+            ),
+            "slowest": df.nlargest(slowest, "time")[["dmu", "phase", "time", "iterations", "status"]].to_dict("records"),
+            "failed": df.loc[df["status"] != "optimal", ["dmu", "phase", "status"]].to_dict("records"),
+        }
+
+    def to_excel(self, path: str, results: list = None):
+        """Write the LP records and the summary (and the run's results, if given) to one workbook."""
+        summary = self.summary()
+        rows = [(name, value) for name, value in summary.items() if not isinstance(value, (dict, list))]
+        for group in ("lp_time_percentiles", "iteration_percentiles"):
+            rows += [(f"{group}.{q}", value) for q, value in summary[group].items()]
+        with pd.ExcelWriter(path) as writer:
+            if results is not None:
+                pd.DataFrame(results).to_excel(writer, sheet_name="results", index=False)
+            pd.DataFrame(rows, columns=["metric", "value"]).to_excel(writer, sheet_name="summary", index=False)
+            self.to_dataframe().to_excel(writer, sheet_name="lp_records", index=False)
+
+
+def _sbm_single(presolve: _Presolve, dmus: np.ndarray = None):
+    """
+    Closed-form SBM-VRS arrays (as _sbm_arrays) when the presolved data has one input and
+    one output: the score is g(y0) / x0, the slack x0 - g(y0), the lambdas span g(y0) on the
+    frontier and the row duals are [1, -1/x0, a/x0, b/x0] for the supporting line x = a*y + b.
+    A zero input scores 1 when the frontier reaches its output at zero input, else NaN.
+    No LP is solved, so no DMU is left unresolved.
+    """
+    x, y = presolve.X[:, 0], presolve.Y[:, 0]
+    K = len(x)
+    dmus = np.arange(K) if dmus is None else np.asarray(dmus)
+    x0, y0 = x[dmus], y[dmus]
+    g, left, right, w_left, w_right, slope, intercept = _single_projection(x, y, y0)
+    positive = x0 > 0
+    safe_x0 = np.where(positive, x0, 1.0)
+    failed = ~positive & (g > 0)
+    scores = np.where(positive, g / safe_x0, 1.0)
+    slacks = np.where(positive, x0 - g, 0.0)[:, None]
+    duals = np.column_stack([np.ones(len(dmus)), -1.0 / safe_x0, slope / safe_x0, intercept / safe_x0])
+    scores[failed], slacks[failed], duals[failed] = np.nan, np.nan, np.nan
+    rows = np.repeat(np.arange(len(dmus)), 2)
+    lambdas = sparse.csr_matrix(
+        (np.column_stack([w_left, w_right]).ravel(), (rows, np.column_stack([left, right]).ravel())),
+        shape=(len(dmus), K),
+    )
+    lambdas = sparse.diags(np.where(failed, 0.0, 1.0)) @ lambdas
+    lambdas = sparse.csr_matrix(lambdas)
+    lambdas.eliminate_zeros()
+    unresolved = np.zeros(len(dmus), dtype=bool)
+    return presolve.sbm_scores(scores), presolve.sbm_slacks(slacks), lambdas, presolve.sbm_duals(duals), unresolved
+
+
+def _is_single(presolve: _Presolve) -> bool:
+    return presolve.X.shape[1] == 1 and presolve.Y.shape[1] == 1
+
+
+def _iter_sbm(
+    presolve: _Presolve, dmus: np.ndarray = None, reference: np.ndarray = None, report=None, **engine
+):
+    """
+    Solve the input-oriented SBM-VRS model on presolved data for the DMUs in dmus (default:
+    all), yielding (i, score, slacks, peers, peer lambdas, envelopment row duals, unresolved)
+    in the original columns and units as each LP finishes; peers are DMU indices. Failed
+    LPs give NaN, and unresolved marks those the time limits left without an answer.
+    Duplicate DMUs are solved once; the reference defaults to one DMU per group.
+    """
+    X, Y = presolve.X, presolve.Y
+    m = X.shape[1]
+    dmus = np.arange(X.shape[0]) if dmus is None else np.asarray(dmus)
+    if _is_single(presolve):
+        scores, slacks, lambdas, duals, _ = _sbm_single(presolve, dmus)
+        for i in range(len(dmus)):
+            row = slice(lambdas.indptr[i], lambdas.indptr[i + 1])
+            yield i, scores[i], slacks[i], lambdas.indices[row], lambdas.data[row], duals[i], False
+        return
+    representatives, members = presolve.fan_out(dmus)
+    if reference is None:
+        reference = presolve.representatives
+    with _DMUSolver(_SBMTemplate, X, Y, reference=reference, **engine) as dmu_solver:
+        try:
+            reference = dmu_solver.reference
+            n_ref = len(reference)
+            tasks = [(k, None) for k in representatives]
+            for j, values in enumerate(dmu_solver.solve(tasks, with_duals=True)):
+                lambdas = values[1:n_ref + 1]
+                # A failed LP has no peers (its NaN lambdas would fill a dense row)
+                nonzero = np.flatnonzero(np.nan_to_num(lambdas))
+                solution = (
+                    presolve.sbm_scores(values[0]), presolve.sbm_slacks(values[n_ref + 1:n_ref + 1 + m]),
+                    reference[nonzero], lambdas[nonzero], presolve.sbm_duals(values[n_ref + 1 + m:]),
+                    representatives[j] in dmu_solver.unresolved,
+                )
+                for i in members[j]:
+                    yield (i, *solution)
+        finally:
+            if report is not None:
+                report.add(dmu_solver.records, "sbm")
+
+
+def _sbm_arrays(
+    presolve: _Presolve, dmus: np.ndarray = None, reference: np.ndarray = None, report=None, **engine
+):
+    """
+    Solve the input-oriented SBM-VRS model for the DMUs in dmus (default: all).
+    Returns, one row per DMU, the scores, the input slacks (m columns), the lambdas as a
+    CSR matrix whose column j is DMU j, the envelopment row duals (failed LPs give NaN) and
+    whether the DMU was left unresolved.
+    """
+    if _is_single(presolve):
+        return _sbm_single(presolve, dmus)
+    K, m, n = presolve.X.shape[0], presolve.m, presolve.n
+    n_dmus = K if dmus is None else len(dmus)
+    scores = np.zeros(n_dmus)
+    slacks = np.zeros((n_dmus, m))
+    duals = np.zeros((n_dmus, 2 + m + n))
+    unresolved = np.zeros(n_dmus, dtype=bool)
+    rows, cols, vals = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)], [np.zeros(0)]
+    for i, score, slack, peers, weights, dual, lost in _iter_sbm(presolve, dmus, reference, report, **engine):
+        scores[i], slacks[i], duals[i], unresolved[i] = score, slack, dual, lost
+        rows.append(np.full(len(peers), i))
+        cols.append(peers)
+        vals.append(weights)
+    lambdas = sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n_dmus, K)
     )
+    return scores, slacks, lambdas, duals, unresolved
+
 
-    # Define the reference set (all DMUs except the one to exclude)
-    reference_set_indices = [j for j in range(K) if j != exclude_dmu_index]
+# A previous solution stays optimal while no changed DMU prices out below this reduced cost
+_PRICING_TOLERANCE = 1e-8
+
+
+def _sbm_incremental(base: dict, X: np.ndarray, Y: np.ndarray, presolve: _Presolve, report=None, **engine):
+    """
+    Update the SBM arrays of a previous run (base) for new data in which only some DMU rows
+    changed. Re-solved are the changed DMUs, DMUs whose previous peers include a changed
+    DMU, DMUs for which a changed DMU now has a negative reduced cost under their previous
+    row duals (it would enter their reference set, e.g. a newly efficient unit), and DMUs
+    whose previous LP failed. Every other previous solution is still optimal. X, Y and the
+    stored arrays are in original units; re-solves run on the presolved data.
+    Returns None when too many DMUs are affected for an update to pay off.
+    """
+    K, m = X.shape
+    n = Y.shape[1]
+    changed = np.flatnonzero((base["X"] != X).any(axis=1) | (base["Y"] != Y).any(axis=1))
+    if len(changed) > K // 4:
+        return None
+    pi = base["duals"]
+    reduced = -(pi[:, 1:1 + m] @ X[changed].T + pi[:, 1 + m:1 + m + n] @ Y[changed].T + pi[:, [1 + m + n]])
+    resolve = np.union1d(changed, base["lambdas"][:, changed].nonzero()[0])
+    resolve = np.union1d(resolve, np.flatnonzero((reduced < -_PRICING_TOLERANCE).any(axis=1)))
+    resolve = np.union1d(resolve, np.flatnonzero(np.isnan(base["scores"]) | np.isnan(pi).any(axis=1)))
+    if len(resolve) > K // 4:
+        return None
+
+    scores, slacks, duals = base["scores"].copy(), base["slacks"].copy(), pi.copy()
+    unresolved = np.zeros(K, dtype=bool)
+    keep = np.ones(K)
+    keep[resolve] = 0.0
+    lambdas = sparse.diags(keep) @ base["lambdas"]
+    if len(resolve):
+        # The HiGHS session warm-starts each re-solve from the previous DMU's basis
+        new_scores, new_slacks, new_lambdas, new_duals, new_unresolved = _sbm_arrays(
+            presolve, resolve, report=report, **engine
+        )
+        scores[resolve], slacks[resolve], duals[resolve] = new_scores, new_slacks, new_duals
+        unresolved[resolve] = new_unresolved
+        scatter = sparse.csr_matrix((np.ones(len(resolve)), (resolve, np.arange(len(resolve)))), shape=(K, len(resolve)))
+        lambdas = lambdas + scatter @ new_lambdas
+    lambdas = sparse.csr_matrix(lambdas)
+    lambdas.eliminate_zeros()
+    return scores, slacks, lambdas, duals, unresolved
 
-    for i in range(m):
-        prob += pulp.lpSum(X[j, i] * lambda_vars[j] for j in reference_set_indices) + slack_vars[i] == X[k, i]
 
-    for r in range(n):
-        prob += pulp.lpSum(Y[j, r] * lambda_vars[j] for j in reference_set_indices) >= Y[k, r]
+def _deadline(time_budget: float = None):
+    # End of a run's time budget as a time.time() value, comparable across pool workers
+    return None if time_budget is None else time.time() + time_budget
 
-    prob += pulp.lpSum(lambda_vars[j] for j in reference_set_indices) == 1, "VRS_Constraint"
 
-    prob.solve(pulp.PULP_CBC_CMD(msg=False))
+class CancellationToken:
+    """Passed as cancel= to a streaming DEA run; cancel() stops it before the next LP."""
 
-    return pulp.value(w)
+    def __init__(self):
+        self._event = threading.Event()
 
+    def cancel(self):
+        self._event.set()
 
-def run_dea_analysis(df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list):
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+def _is_cancelled(cancel: CancellationToken = None) -> bool:
+    return cancel is not None and cancel.cancelled
+
+
+def _in_dmu_order(stream) -> list:
+    # Collect the (k, result) pairs of a streaming run into a list ordered by DMU
+    return [result for _, result in sorted(stream, key=lambda pair: pair[0])]
+
+
+def _result_status(score: float, unresolved: bool = False) -> str:
+    # 'unresolved': no answer within the time limits; 'failed': the LP ended without a score
+    if unresolved:
+        return "unresolved"
+    return "failed" if score is None or np.isnan(score) else "optimal"
+
+
+def _sbm_result(
+    dmu_names: list, inputs: list, k: int, score: float, slacks: np.ndarray, peers, weights, unresolved: bool = False
+) -> dict:
+    peers_list = [f"{dmu_names[j]} ({v:.2f})" for j, v in zip(peers, weights) if v > 1e-6]
+    return {
+        "dmu": dmu_names[k],
+        "efficiency": None if np.isnan(score) else score,
+        "slacks": {inputs[i]: None if np.isnan(slacks[i]) else slacks[i] for i in range(len(inputs))},
+        "peers": ", ".join(peers_list),
+        "status": _result_status(score, unresolved),
+    }
+
+
+class SBMResult:
+    """
+    Array form of an SBM-VRS run. efficiency is (K,), slacks (K, m), lambdas a K x K CSR
+    matrix whose column j is DMU j, and input_targets (K, m) / output_targets (K, n) the
+    projection X'lambda / Y'lambda of each DMU; rows of failed LPs are NaN, and unresolved
+    (K,) marks the DMUs the time limits left without an answer. groups holds the group
+    label of every DMU in a grouped run, else None. Peer strings are only rendered on
+    request (peers(k), to_records()).
+    """
+
+    def __init__(self, dmu_names: list, inputs: list, outputs: list, X: np.ndarray, Y: np.ndarray,
+                 efficiency: np.ndarray, slacks: np.ndarray, lambdas: sparse.csr_matrix, unresolved: np.ndarray = None,
+                 groups: list = None):
+        self.dmu_names, self.inputs, self.outputs = dmu_names, inputs, outputs
+        self.groups = groups
+        self.efficiency, self.slacks, self.lambdas = efficiency, slacks, lambdas
+        self.unresolved = np.zeros(len(dmu_names), dtype=bool) if unresolved is None else unresolved
+        failed = np.isnan(efficiency)[:, None]
+        self.input_targets = np.where(failed, np.nan, lambdas @ X)
+        self.output_targets = np.where(failed, np.nan, lambdas @ Y)
+
+    def _row(self, k: int):
+        row = slice(self.lambdas.indptr[k], self.lambdas.indptr[k + 1])
+        return self.lambdas.indices[row], self.lambdas.data[row]
+
+    def peers(self, k: int) -> str:
+        """Reference set of DMU k as 'name (lambda), ...'."""
+        return _sbm_result(self.dmu_names, self.inputs, k, self.efficiency[k], self.slacks[k], *self._row(k))["peers"]
+
+    def peer_counts(self, threshold: float = 1e-6) -> np.ndarray:
+        """How many DMUs use each DMU as a peer (lambda above threshold)."""
+        return np.asarray((self.lambdas > threshold).sum(axis=0)).ravel()
+
+    def to_records(self) -> list:
+        """The list-of-dicts form returned by run_dea_analysis."""
+        records = [
+            _sbm_result(
+                self.dmu_names, self.inputs, k, self.efficiency[k], self.slacks[k], *self._row(k), self.unresolved[k]
+            )
+            for k in range(len(self.dmu_names))
+        ]
+        if self.groups is not None:
+            for record, group in zip(records, self.groups):
+                record["group"] = group
+        return records
+
+
+def _prepare_sbm_data(df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list):
     required_cols = [dmu_column] + inputs + outputs
     if not all(col in df.columns for col in required_cols):
         raise ValueError("برخی ستون‌ها در دیتافریم یافت نشدند.")
     work_df = df[required_cols].copy()
     work_df[inputs + outputs] = work_df[inputs + outputs].apply(pd.to_numeric, errors="coerce").fillna(0)
     dmu_names = work_df[dmu_column].tolist()
-    X = work_df[inputs].values
-    Y = work_df[outputs].values
-    K = len(dmu_names)
-    if K == 0:
+    if len(dmu_names) == 0:
         raise ValueError("داده معتبری برای تحلیل وجود ندارد.")
+    return dmu_names, work_df[inputs].values, work_df[outputs].values
 
-    solver = pulp.PULP_CBC_CMD(msg=False)
 
-    raw_results = []
-    for k in range(K):
-        # Standard SBM-VRS formulation for each DMU
-        prob = pulp.LpProblem(f"SBM_VRS_DMU_{k+1}", pulp.LpMinimize)
-        w = pulp.LpVariable("w", 0, 1)
-        lambda_vars = [pulp.LpVariable(f"L_{j}", 0) for j in range(K)]
-        slacks = [pulp.LpVariable(f"S_{i}", 0) for i in range(len(inputs))]
-        prob += w
-        x0 = X[k, :]
-        prob += (
-            w
-            + (1 / len(inputs))
-            * pulp.lpSum([slacks[i] * (1 / (x0[i] if x0[i] > 0 else 1e-9)) for i in range(len(inputs))])
-            == 1
-        )
-        for i in range(len(inputs)):
-            prob += pulp.lpSum([X[j, i] * lambda_vars[j] for j in range(K)]) + slacks[i] == X[k, i]
-        for r in range(len(outputs)):
-            prob += pulp.lpSum([Y[j, r] * lambda_vars[j] for j in range(K)]) >= Y[k, r]
-        prob += pulp.lpSum(lambda_vars) == 1
-        prob.solve(solver)
-
-        peers_list = [
-            f"{dmu_names[j]} ({lam.varValue:.2f})"
-            for j, lam in enumerate(lambda_vars)
-            if lam.varValue is not None and lam.varValue > 1e-6
-        ]
-        raw_results.append(
-            {
-                "dmu": dmu_names[k],
-                "efficiency": w.varValue,
-                "slacks": {inputs[i]: slacks[i].varValue for i in range(len(inputs))},
-                "peers": ", ".join(peers_list),
+def _load_sbm_arrays(key: str, K: int):
+    # SBM arrays of K DMUs from the disk cache, or None
+    cached = dea_cache.load(key)
+    if cached is None:
+        return None
+    lambdas = sparse.csr_matrix(
+        (cached["lambda_data"], cached["lambda_indices"], cached["lambda_indptr"]), shape=(K, K)
+    )
+    return cached["efficiency"], cached["slacks"], lambdas, cached.get("duals"), np.zeros(K, dtype=bool)
+
+
+def _save_sbm_arrays(key: str, arrays):
+    scores, slacks, lambdas, duals, _ = arrays
+    dea_cache.save(
+        key, efficiency=scores, slacks=slacks, duals=duals,
+        lambda_data=lambdas.data, lambda_indices=lambdas.indices, lambda_indptr=lambdas.indptr,
+    )
+
+
+def _known_sbm_arrays(key: str, base: dict, dmu_names: list, X: np.ndarray, Y: np.ndarray, presolve: _Presolve,
+                      use_cache: bool, incremental: bool, report, engine: dict):
+    """
+    SBM arrays available without a full solve: from the disk cache, or by updating the
+    previous run (incremental). Returns (arrays or None, whether they came from the cache).
+    """
+    arrays = _load_sbm_arrays(key, len(dmu_names)) if use_cache else None
+    if arrays is not None:
+        if report is not None:
+            report.cached = True
+        return arrays, True
+    if (
+        incremental and base.get("names") == dmu_names and base.get("duals") is not None
+        and base["X"].shape == X.shape and base.get("kept") == presolve.kept
+    ):
+        return _sbm_incremental(base, X, Y, presolve, report=report, **engine), False
+    return None, False
+
+
+def _remember_sbm_arrays(
+    key: str, base: dict, dmu_names: list, X: np.ndarray, Y: np.ndarray, presolve: _Presolve, arrays, save: bool
+):
+    # Disk cache, the scores shared with the ranking run, and the base of the next incremental run.
+    # A run with unresolved DMUs is not cached; its NaN rows are re-solved by the next incremental run.
+    scores, slacks, lambdas, duals, unresolved = arrays
+    if save and not unresolved.any():
+        _save_sbm_arrays(key, arrays)
+    if not unresolved.any():
+        _store_entry(_store_key("sbm", X, Y))["scores"] = scores
+    base.update(
+        names=dmu_names, X=X, Y=Y, kept=presolve.kept, scores=scores, slacks=slacks, lambdas=lambdas, duals=duals
+    )
+
+
+def _group_codes(df: pd.DataFrame, groups):
+    # groups is a column of df or one label per row (e.g. cluster labels); returns the
+    # group code 0..G-1 of every row and the label of every code
+    if isinstance(groups, str):
+        if groups not in df.columns:
+            raise ValueError("برخی ستون‌ها در دیتافریم یافت نشدند.")
+        groups = df[groups].values
+    groups = np.asarray(groups)
+    if groups.ndim != 1 or len(groups) != len(df):
+        raise ValueError("تعداد برچسب‌های گروه باید با تعداد واحدها برابر باشد.")
+    codes, labels = pd.factorize(groups, use_na_sentinel=False)
+    return codes, labels.tolist()
+
+
+def _group_sbm_arrays(X: np.ndarray, Y: np.ndarray, frontier_first: bool, use_cache: bool, engine: dict):
+    """
+    SBM arrays (as _sbm_arrays) of one group's DMUs against the group's own frontier, the
+    records of its LPs and whether they came from the disk cache. Runs in this process or
+    in a pool worker. The cache key is that of an ungrouped run on the same rows, so an
+    unchanged group is not solved again.
+    """
+    key = dea_cache.make_key("sbm", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    arrays = _load_sbm_arrays(key, len(X)) if use_cache else None
+    if arrays is not None:
+        return arrays, [], True
+    presolve = _Presolve(X, Y)
+    reference = None
+    if frontier_first and not _is_single(presolve):
+        limits = {name: engine[name] for name in ("time_limit", "deadline")}
+        reference = _cached_frontier(presolve.X, presolve.Y, engine["solver"], **limits)[0]
+    report = RunReport()
+    arrays = _sbm_arrays(presolve, reference=reference, report=report, **engine)
+    if use_cache and not arrays[4].any():
+        _save_sbm_arrays(key, arrays)
+    return arrays, report.records, False
+
+
+def _grouped_sbm_arrays(
+    X: np.ndarray, Y: np.ndarray, codes: np.ndarray, labels: list, frontier_first: bool, use_cache: bool,
+    report: RunReport, engine: dict,
+):
+    """
+    SBM arrays of all K DMUs, each scored against the frontier of its own group only, so
+    lambdas never leave a group. The groups are independent: with n_jobs > 1 and several
+    groups, whole groups are spread over a process pool (largest first), otherwise they
+    run here one after the other with n_jobs applied to each group's LPs.
+    """
+    K, m = X.shape
+    n = Y.shape[1]
+    members = [np.flatnonzero(codes == g) for g in range(len(labels))]
+    order = sorted(range(len(labels)), key=lambda g: -len(members[g]))
+    n_jobs = _resolve_n_jobs(engine["n_jobs"])
+    if n_jobs > 1 and len(labels) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(labels))) as pool:
+            futures = {
+                g: pool.submit(
+                    _group_sbm_arrays, X[members[g]], Y[members[g]], frontier_first, use_cache, dict(engine, n_jobs=1)
+                )
+                for g in order
             }
-        )
-    return raw_results
+            outcomes = {g: futures[g].result() for g in order}
+    else:
+        outcomes = {
+            g: _group_sbm_arrays(X[members[g]], Y[members[g]], frontier_first, use_cache, engine) for g in order
+        }
+
+    scores, slacks, duals = np.zeros(K), np.zeros((K, m)), np.zeros((K, 2 + m + n))
+    unresolved = np.zeros(K, dtype=bool)
+    rows, cols, vals = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)], [np.zeros(0)]
+    for g in order:
+        (g_scores, g_slacks, g_lambdas, g_duals, g_unresolved), records, _ = outcomes[g]
+        idx = members[g]
+        scores[idx], slacks[idx], unresolved[idx] = g_scores, g_slacks, g_unresolved
+        duals[idx] = np.nan if g_duals is None else g_duals
+        g_lambdas = g_lambdas.tocoo()
+        rows.append(idx[g_lambdas.row])
+        cols.append(idx[g_lambdas.col])
+        vals.append(g_lambdas.data)
+        if report is not None:
+            report.add([dict(r, dmu=int(idx[r["dmu"]])) for r in records], f"group {labels[g]}")
+    if report is not None:
+        report.cached = all(cached for _, _, cached in outcomes.values())
+    lambdas = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(K, K))
+    return scores, slacks, lambdas, duals, unresolved
+
+
+def run_dea_analysis(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    incremental: bool = False, report: RunReport = None, time_limit: float = None, time_budget: float = None,
+    bootstrap: int = 0, alpha: float = 0.05, seed: int = 0, groups=None,
+):
+    """
+    Input-oriented SBM-VRS efficiency, slacks and reference set for every DMU.
+    solver selects the LP backend; n_jobs > 1 spreads the DMUs over a process pool.
+    With frontier_first the LPs only carry lambda columns for the extreme-efficient DMUs.
+    batch_size > 1 (or 'auto') solves that many DMUs per stacked block-diagonal LP.
+    formulation='multiplier' solves the dual LP ('auto' switches on K/(m+n)).
+    With use_cache, results of identical data are read from the on-disk cache (dea_cache).
+    With incremental, the previous run on the same DMUs and columns in this session is
+    updated: only DMUs affected by the changed rows are re-solved (see _sbm_incremental).
+    A RunReport passed as report receives the measurements of every LP.
+    With one input and one output (after presolve) no LP is solved (see _sbm_single).
+    time_limit bounds every LP (seconds) and time_budget the whole run; an LP that gives no
+    answer is retried rescaled and then on the other backend, and DMUs still without one
+    get status 'unresolved' (every result carries a status) and are not cached.
+    With bootstrap > 0, that many smoothed-bootstrap replicates (see _bootstrap_intervals)
+    add bias_corrected, ci_lower and ci_upper (1 - alpha interval) to every result.
+    groups (a column name, or one label per row such as the cluster labels of
+    run_single_clustering_model) scores every DMU against the frontier of its own group
+    only; the groups are solved independently (see _grouped_sbm_arrays), every result
+    carries its group, and incremental does not apply.
+    run_dea_arrays returns the same results as arrays, without the peer strings.
+    """
+    _check_bootstrap(bootstrap, alpha)
+    deadline = _deadline(time_budget)
+    result = run_dea_arrays(
+        df, dmu_column, inputs, outputs, solver=solver, n_jobs=n_jobs, frontier_first=frontier_first,
+        batch_size=batch_size, formulation=formulation, use_cache=use_cache, incremental=incremental, report=report,
+        time_limit=time_limit, time_budget=time_budget, groups=groups,
+    )
+    records = result.to_records()
+    if bootstrap:
+        _, X, Y = _prepare_sbm_data(df, dmu_column, inputs, outputs)
+        engine = dict(solver=solver, batch_size=batch_size, formulation=formulation, time_limit=time_limit,
+                      deadline=deadline)
+        save = use_cache and not result.unresolved.any()
+        if groups is None:
+            _add_bootstrap(records, *_run_bootstrap(
+                "sbm", X, Y, result.efficiency, result.input_targets, bootstrap, alpha, seed, n_jobs, engine, save,
+                report,
+            ))
+        else:
+            # Every group is resampled against its own frontier
+            codes, _ = _group_codes(df, groups)
+            bounds = np.zeros((3, len(codes)))
+            for g in range(codes.max() + 1):
+                idx = np.flatnonzero(codes == g)
+                bounds[:, idx] = _run_bootstrap(
+                    "sbm", X[idx], Y[idx], result.efficiency[idx], result.input_targets[idx], bootstrap, alpha,
+                    seed, n_jobs, engine, save,
+                )
+            _add_bootstrap(records, *bounds)
+    return records
+
+
+def run_dea_arrays(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    incremental: bool = False, report: RunReport = None, time_limit: float = None, time_budget: float = None,
+    groups=None,
+) -> SBMResult:
+    """Same run as run_dea_analysis, returned as an SBMResult (sparse lambdas, dense slacks and targets)."""
+    dmu_names, X, Y = _prepare_sbm_data(df, dmu_column, inputs, outputs)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "sbm", dmu_names
+
+    engine = dict(
+        solver=solver, n_jobs=n_jobs, batch_size=batch_size, formulation=formulation,
+        time_limit=time_limit, deadline=_deadline(time_budget),
+    )
+    if groups is not None:
+        codes, labels = _group_codes(df, groups)
+        arrays = _grouped_sbm_arrays(X, Y, codes, labels, frontier_first, use_cache, report, engine)
+        if report is not None:
+            report.wall_time = time.perf_counter() - start
+        return SBMResult(dmu_names, inputs, outputs, X, Y, *arrays[:3], arrays[4], [labels[g] for g in codes])
+    presolve = _Presolve(X, Y)
+    presolve.note(report, dmu_names, inputs, outputs)
+    base = _store_entry(f"sbm-base|{dmu_column}|{inputs}|{outputs}")
+    key = dea_cache.make_key("sbm", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    arrays, from_cache = _known_sbm_arrays(
+        key, base, dmu_names, X, Y, presolve, use_cache, incremental, report, engine
+    )
+    if arrays is None:
+        reference = None
+        if frontier_first and not _is_single(presolve):
+            reference = _cached_frontier(presolve.X, presolve.Y, solver, time_limit, engine["deadline"])[0]
+        arrays = _sbm_arrays(presolve, reference=reference, report=report, **engine)
+    _remember_sbm_arrays(key, base, dmu_names, X, Y, presolve, arrays, use_cache and not from_cache)
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+    return SBMResult(dmu_names, inputs, outputs, X, Y, *arrays[:3], arrays[4])
+
+
+def iter_dea_analysis(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    incremental: bool = False, report: RunReport = None, cancel: CancellationToken = None,
+    time_limit: float = None, time_budget: float = None,
+):
+    """
+    Streaming form of run_dea_analysis: yields (k, result) for DMU row k as soon as its LP
+    is solved. A cancelled run stops before the next LP and is not cached.
+    """
+    dmu_names, X, Y = _prepare_sbm_data(df, dmu_column, inputs, outputs)
+    K = len(dmu_names)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "sbm", dmu_names
+
+    # Standard SBM-VRS formulation, built once and re-targeted at each DMU
+    engine = dict(
+        solver=solver, n_jobs=n_jobs, batch_size=batch_size, formulation=formulation,
+        time_limit=time_limit, deadline=_deadline(time_budget),
+    )
+    presolve = _Presolve(X, Y)
+    presolve.note(report, dmu_names, inputs, outputs)
+    base = _store_entry(f"sbm-base|{dmu_column}|{inputs}|{outputs}")
+    key = dea_cache.make_key("sbm", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    arrays, from_cache = _known_sbm_arrays(
+        key, base, dmu_names, X, Y, presolve, use_cache, incremental, report, engine
+    )
+
+    if arrays is not None:
+        scores, slacks, lambdas, _, unresolved = arrays
+        for k in range(K):
+            if _is_cancelled(cancel):
+                return
+            row = slice(lambdas.indptr[k], lambdas.indptr[k + 1])
+            yield k, _sbm_result(
+                dmu_names, inputs, k, scores[k], slacks[k], lambdas.indices[row], lambdas.data[row], unresolved[k]
+            )
+    else:
+        reference = None
+        if frontier_first and not _is_single(presolve):
+            reference = _cached_frontier(presolve.X, presolve.Y, solver, time_limit, engine["deadline"])[0]
+        scores = np.zeros(K)
+        slacks = np.zeros((K, len(inputs)))
+        duals = np.zeros((K, 2 + len(inputs) + len(outputs)))
+        unresolved = np.zeros(K, dtype=bool)
+        rows, cols, vals = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)], [np.zeros(0)]
+        for k, score, slack, peers, weights, dual, lost in _iter_sbm(
+            presolve, reference=reference, report=report, **engine
+        ):
+            scores[k], slacks[k], duals[k], unresolved[k] = score, slack, dual, lost
+            rows.append(np.full(len(peers), k))
+            cols.append(peers)
+            vals.append(weights)
+            yield k, _sbm_result(dmu_names, inputs, k, score, slack, peers, weights, lost)
+            if _is_cancelled(cancel):
+                return
+        lambdas = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(K, K))
+        arrays = (scores, slacks, lambdas, duals, unresolved)
+
+    _remember_sbm_arrays(key, base, dmu_names, X, Y, presolve, arrays, use_cache and not from_cache)
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
 
 
-def run_ranking_dea(df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list):
+RANKING_METHODS = ("super-efficiency", "cross-efficiency")
+
+
+def run_ranking_dea(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    report: RunReport = None, time_limit: float = None, time_budget: float = None,
+    method: str = "super-efficiency", secondary_goal: str = "aggressive",
+):
     """
     Calculate super-efficiency scores for ranking all DMUs.
+    Efficient DMUs are scored with Tone's input-oriented super-SBM-VRS (_SuperSBMTemplate);
+    one whose outputs no other DMU reaches has no score (None, status 'infeasible').
+    solver selects the LP backend ('highs' in-process, or 'cbc'); n_jobs > 1 uses a process pool.
+    With frontier_first the standard scores are computed against the extreme-efficient DMUs
+    only, and only those DMUs can leave score 1 in super-efficiency mode. Standard scores
+    already computed by run_dea_analysis on the same data in this session are reused.
+    batch_size > 1 (or 'auto') solves that many DMUs per stacked block-diagonal LP.
+    formulation='multiplier' solves the dual LP ('auto' switches on K/(m+n)).
+    With use_cache, results of identical data are read from the on-disk cache (dea_cache).
+    A RunReport passed as report receives the measurements of every LP.
+    time_limit and time_budget bound the LPs as in run_dea_analysis; every result carries
+    a status, 'unresolved' for DMUs left without an answer.
+    method='cross-efficiency' ranks by mean cross-efficiency instead (run_cross_efficiency,
+    with secondary_goal); frontier_first, batch_size and formulation do not apply to it.
     """
-    required_cols = [dmu_column] + inputs + outputs
-    if not all(col in df.columns for col in required_cols):
-        raise ValueError("برخی ستون‌ها در دیتافریم یافت نشدند.")
+    if method not in RANKING_METHODS:
+        raise ValueError("روش رتبه‌بندی باید super-efficiency یا cross-efficiency باشد.")
+    if method == "cross-efficiency":
+        return run_cross_efficiency(
+            df, dmu_column, inputs, outputs, secondary_goal=secondary_goal, solver=solver, n_jobs=n_jobs,
+            use_cache=use_cache, report=report, time_limit=time_limit, time_budget=time_budget,
+        )
+    return _in_dmu_order(iter_ranking_dea(
+        df, dmu_column, inputs, outputs, solver=solver, n_jobs=n_jobs, frontier_first=frontier_first,
+        batch_size=batch_size, formulation=formulation, use_cache=use_cache, report=report,
+        time_limit=time_limit, time_budget=time_budget,
+    ))
 
-    work_df = df[required_cols].copy()
-    work_df[inputs + outputs] = work_df[inputs + outputs].apply(pd.to_numeric, errors="coerce").fillna(0)
-    dmu_names = work_df[dmu_column].tolist()
-    X = work_df[inputs].values
-    Y = work_df[outputs].values
+
+def iter_ranking_dea(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    report: RunReport = None, cancel: CancellationToken = None, time_limit: float = None, time_budget: float = None,
+):
+    """
+    Streaming form of run_ranking_dea: yields (k, result) as soon as DMU row k's final score
+    is known. Inefficient DMUs come out of the standard pass, the efficient ones follow from
+    the super-efficiency pass. A cancelled run stops before the next LP and is not cached.
+    """
+    dmu_names, X, Y = _prepare_sbm_data(df, dmu_column, inputs, outputs)
     K = len(dmu_names)
-    if K == 0:
-        raise ValueError("داده معتبری برای تحلیل وجود ندارد.")
 
-    scores = np.zeros(K)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "sbm-super", dmu_names
+    unresolved, infeasible = set(), set()
+
+    def result(k, score):
+        # A DMU without a score gets None and says why: no answer in time, an infeasible
+        # super-SBM LP (no other DMU reaches its outputs), or a failed LP
+        if k in unresolved:
+            return {"dmu": dmu_names[k], "score": None, "status": "unresolved"}
+        if np.isnan(score):
+            return {"dmu": dmu_names[k], "score": None, "status": "infeasible" if k in infeasible else "failed"}
+        return {"dmu": dmu_names[k], "score": float(score), "status": "optimal"}
+
+    key = dea_cache.make_key("sbm-super", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    cached = dea_cache.load(key) if use_cache else None
+    if cached is not None:
+        if report is not None:
+            report.cached, report.wall_time = True, time.perf_counter() - start
+        infeasible.update(np.flatnonzero(cached["infeasible"]).tolist())
+        for k in range(K):
+            if _is_cancelled(cancel):
+                return
+            yield k, result(k, cached["score"][k])
+        return
+
     tol = 1e-6
+    limits = dict(time_limit=time_limit, deadline=_deadline(time_budget))
+    presolve = _Presolve(X, Y)
+    presolve.note(report, dmu_names, inputs, outputs)
 
-    # Step 1: Run standard efficiency for all DMUs
-    for k in range(K):
-        scores[k] = _solve_single_sbm(k, X, Y, exclude_dmu_index=None)
+    reference, super_reference = presolve.representatives, presolve.representatives
+    in_hull = np.ones(K, dtype=bool)
+    if frontier_first:
+        reference, counts, dominator = _cached_frontier(presolve.X, presolve.Y, solver, **limits)
+        in_hull = np.isin(np.arange(K), reference)
+
+    def final(k):
+        # Only efficient DMUs of the hull are re-scored in super-efficiency mode
+        return not scores[k] >= 1 - tol or not in_hull[k]
+
+    # Step 1: Run standard efficiency for all DMUs (unless this session already has them)
+    entry = _store_entry(_store_key("sbm", X, Y))
+    if "scores" in entry:
+        scores = entry["scores"].copy()
+        for k in range(K):
+            if final(k):
+                yield k, result(k, scores[k])
+                if _is_cancelled(cancel):
+                    return
+    else:
+        scores = np.zeros(K)
+        representatives, members = presolve.fan_out(np.arange(K))
+        with _DMUSolver(
+            _SBMTemplate, presolve.X, presolve.Y, solver, n_jobs, reference, batch_size, formulation, **limits
+        ) as dmu_solver:
+            for j, values in enumerate(dmu_solver.solve([(k, None) for k in representatives])):
+                if representatives[j] in dmu_solver.unresolved:
+                    unresolved.update(members[j])
+                for k in members[j]:
+                    scores[k] = presolve.sbm_scores(values[0])
+                    if final(k):
+                        yield k, result(k, scores[k])
+                if _is_cancelled(cancel):
+                    break
+        if report is not None:
+            report.add(dmu_solver.records, "sbm")
+        if _is_cancelled(cancel):
+            return
+        if not unresolved:
+            entry["scores"] = scores.copy()
 
-    # Step 2: For efficient DMUs, re-run in super-efficiency mode (exclude DMU from reference)
+    # Step 2: Score efficient DMUs with Tone's super-SBM against the other DMUs (the plain
+    # SBM LP without DMU k is infeasible for every extreme-efficient k)
     efficient_indices = np.where(scores >= 1 - tol)[0]
-    for k in efficient_indices:
-        scores[k] = _solve_single_sbm(k, X, Y, exclude_dmu_index=k)
+    if frontier_first:
+        # An efficient DMU outside the hull is spanned by the hull without it, so its score
+        # cannot change. Removing a hull DMU k can only expose DMUs that nothing but k dominates.
+        efficient_indices = np.intersect1d(efficient_indices, reference)
+        super_reference = np.flatnonzero((counts == 0) | ((counts == 1) & np.isin(dominator, efficient_indices)))
+    # A duplicated DMU keeps its twin in the reference set, so its super-efficiency score
+    # is its standard score
+    shared = presolve.group_size[efficient_indices] > 1
+    for k in efficient_indices[shared]:
+        yield k, result(k, scores[k])
+        if _is_cancelled(cancel):
+            return
+    efficient_indices = efficient_indices[~shared]
+    super_tasks = [(k, k) for k in efficient_indices]
+    with _DMUSolver(
+        _SuperSBMTemplate, presolve.X, presolve.Y, solver, n_jobs, super_reference, batch_size, formulation, **limits
+    ) as dmu_solver:
+        for k, values in zip(efficient_indices, dmu_solver.solve(super_tasks)):
+            scores[k] = presolve.sbm_scores(values[0])
+            if k in dmu_solver.unresolved:
+                unresolved.add(k)
+            elif np.isnan(scores[k]):
+                infeasible.update(r["dmu"] for r in dmu_solver.records if r["dmu"] == k and r["status"] == "infeasible")
+            yield k, result(k, scores[k])
+            if _is_cancelled(cancel):
+                break
+    if report is not None:
+        report.add(dmu_solver.records, "super-efficiency")
+    if _is_cancelled(cancel):
+        return
 
-    # Step 3: Format results
-    results = [{"dmu": dmu_names[k], "score": scores[k]} for k in range(K)]
-    return results
+    # Only a complete run is cached: every DMU has a score or a proven-infeasible super-SBM LP
+    is_infeasible = np.isin(np.arange(K), list(infeasible))
+    if use_cache and not unresolved and not (np.isnan(scores) & ~is_infeasible).any():
+        dea_cache.save(key, score=scores, infeasible=is_infeasible)
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
 
 
-def run_hr_dea_analysis(df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list):
-    """
-    Calculates efficiency scores using the PRIMAL formulation of the input-oriented BCC model.
-    This model directly solves for the efficiency score (theta) for each DMU.
-    The logic is an exact, production-ready replica of the validated debug script.
-    """
-    # --- 1. Data Preparation ---
+def _prepare_bcc_data(df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list):
     required_cols = [dmu_column] + inputs + outputs
     if not all(col in df.columns for col in required_cols):
         raise ValueError("برخی ستون‌ها در دیتافریم یافت نشدند.")
@@ -150,55 +1987,880 @@ def run_hr_dea_analysis(df: pd.DataFrame, dmu_column: str, inputs: list, outputs
     dmu_names = work_df[dmu_column].values
     X = work_df[inputs].values   # Shape: (n_dmus, n_inputs)
     Y = work_df[outputs].values  # Shape: (n_dmus, n_outputs)
-    
-    n_dmus, n_inputs, n_outputs = X.shape[0], X.shape[1], Y.shape[1]
+    return dmu_names, X, Y
 
-    results = []
+
+def run_hr_dea_analysis(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    report: RunReport = None, time_limit: float = None, time_budget: float = None, bootstrap: int = 0,
+    alpha: float = 0.05, seed: int = 0,
+):
+    """
+    Calculates efficiency scores using the PRIMAL formulation of the input-oriented BCC model.
+    This model directly solves for the efficiency score (theta) for each DMU.
+    The model is loaded into one solver session; consecutive DMUs only patch the theta
+    column and the output right-hand side, so HiGHS warm-starts from the previous basis.
+    n_jobs > 1 gives each pool worker its own session over a chunk of DMUs, and
+    frontier_first restricts the lambda columns to the extreme-efficient DMUs.
+    batch_size > 1 (or 'auto') solves that many DMUs per stacked block-diagonal LP.
+    formulation='multiplier' solves the dual LP ('auto' switches on K/(m+n)).
+    With use_cache, scores of identical data are read from the on-disk cache (dea_cache).
+    A RunReport passed as report receives the measurements of every LP; DMUs whose LP
+    failed get score None and status 'failed' and are listed by report.failed().
+    With one input and one output (after presolve) theta is read off the closed-form
+    frontier of _single_frontier and no LP is solved.
+    time_limit and time_budget bound the LPs as in run_dea_analysis; DMUs left without an
+    answer get score None and status 'unresolved'.
+    bootstrap, alpha and seed add smoothed-bootstrap intervals as in run_dea_analysis.
+    """
+    _check_bootstrap(bootstrap, alpha)
+    deadline = _deadline(time_budget)
+    results = _in_dmu_order(iter_hr_dea_analysis(
+        df, dmu_column, inputs, outputs, solver=solver, n_jobs=n_jobs, frontier_first=frontier_first,
+        batch_size=batch_size, formulation=formulation, use_cache=use_cache, report=report,
+        time_limit=time_limit, time_budget=time_budget,
+    ))
+    if bootstrap:
+        _, X, Y = _prepare_bcc_data(df, dmu_column, inputs, outputs)
+        thetas = np.array([r['score'] if r['status'] == "optimal" else np.nan for r in results], dtype=float)
+        engine = dict(solver=solver, batch_size=batch_size, formulation=formulation, time_limit=time_limit,
+                      deadline=deadline)
+        _add_bootstrap(results, *_run_bootstrap(
+            "bcc", X, Y, thetas, X * thetas[:, None], bootstrap, alpha, seed, n_jobs, engine,
+            use_cache and all(r['status'] != "unresolved" for r in results), report,
+        ))
+    return results
+
+
+def iter_hr_dea_analysis(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    report: RunReport = None, cancel: CancellationToken = None, time_limit: float = None, time_budget: float = None,
+):
+    """
+    Streaming form of run_hr_dea_analysis: yields (k, result) for DMU row k as soon as its
+    LP is solved. A cancelled run stops before the next LP and is not cached.
+    """
+    # --- 1. Data Preparation ---
+    dmu_names, X, Y = _prepare_bcc_data(df, dmu_column, inputs, outputs)
+
+    n_dmus = X.shape[0]
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "bcc", list(dmu_names)
+
+    def result(k, theta, unresolved=False):
+        score = None if unresolved or np.isnan(theta) else theta
+        return {
+            'dmu': dmu_names[k],
+            'score': score,
+            'status': _result_status(theta, unresolved),
+        }
 
     # --- 2. Solve LP for each DMU ---
-    for k in range(n_dmus):
-        # The variables are [theta, lambda_1, ..., lambda_n_dmus]
-        # Total variables: n_dmus + 1
-
-        # Objective: Minimize theta
-        c = np.zeros(n_dmus + 1)
-        c[0] = 1
-
-        # --- Constraint Matrix Construction (Row-by-Row for fidelity) ---
-        A_ub_rows = []
-        b_ub_rows = []
-
-        # Input constraints: Sum(lambda_j * X_ij) - theta * X_ik <= 0
-        for i in range(n_inputs):
-            row = np.concatenate([[-X[k, i]], X[:, i]])
-            A_ub_rows.append(row)
-            b_ub_rows.append(0)
-
-        # Output constraints: -Sum(lambda_j * Y_rj) <= -Y_rk
-        for r in range(n_outputs):
-            row = np.concatenate([[0], -Y[:, r]])
-            A_ub_rows.append(row)
-            b_ub_rows.append(-Y[k, r])
-        
-        A_ub = np.array(A_ub_rows)
-        b_ub = np.array(b_ub_rows)
-        
-        # Equality constraint: Sum(lambda_j) = 1 (VRS constraint)
-        A_eq = np.zeros((1, n_dmus + 1))
-        A_eq[0, 1:] = 1
-        b_eq = [1]
-        
-        # Bounds for variables: theta >= 0, lambdas >= 0
-        bounds = [(0, None)] * (n_dmus + 1)
-
-        # Solve the linear programming problem
-        res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method='highs')
-        
-        score = res.fun if res.success and res.fun is not None else 0.0
-        
+    key = dea_cache.make_key("bcc", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    cached = dea_cache.load(key) if use_cache else None
+    if cached is not None:
+        if report is not None:
+            report.cached, report.wall_time = True, time.perf_counter() - start
+        for k, theta in enumerate(cached["theta"]):
+            if _is_cancelled(cancel):
+                return
+            yield k, result(k, theta)
+        return
+
+    presolve = _Presolve(X, Y)
+    presolve.note(report, list(dmu_names), inputs, outputs)
+    if presolve.constant_inputs.any() or _is_single(presolve):
+        if presolve.constant_inputs.any():
+            # No radial contraction of a constant input stays feasible: every DMU scores 1
+            thetas = np.ones(n_dmus)
+        else:
+            # One input and one output: theta = g(y0) / x0 on the closed-form frontier
+            x, y = presolve.X[:, 0], presolve.Y[:, 0]
+            thetas = _single_projection(x, y, y)[0] / x
+        for k in range(n_dmus):
+            if _is_cancelled(cancel):
+                return
+            yield k, result(k, thetas[k])
+        if use_cache:
+            dea_cache.save(key, theta=thetas)
+        if report is not None:
+            report.wall_time = time.perf_counter() - start
+        return
+
+    deadline = _deadline(time_budget)
+    reference = presolve.representatives
+    if frontier_first:
+        reference = _cached_frontier(presolve.X, presolve.Y, solver, time_limit, deadline)[0]
+    thetas = np.zeros(n_dmus)
+    representatives, members = presolve.fan_out(np.arange(n_dmus))
+    with _DMUSolver(
+        _BCCTemplate, presolve.X, presolve.Y, solver, n_jobs, reference, batch_size, formulation,
+        time_limit=time_limit, deadline=deadline,
+    ) as dmu_solver:
+        for j, values in enumerate(dmu_solver.solve([(k, None) for k in representatives])):
+            for k in members[j]:
+                thetas[k] = values[0]
+                yield k, result(k, thetas[k], representatives[j] in dmu_solver.unresolved)
+            if _is_cancelled(cancel):
+                break
+    if report is not None:
+        report.add(dmu_solver.records, "bcc")
+    if _is_cancelled(cancel):
+        return
+
+    if use_cache and not dmu_solver.unresolved and not np.isnan(thetas).any():
+        dea_cache.save(key, theta=thetas)
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+
+
+def _nondominated(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """
+    Indices of the DMUs that no other DMU dominates. DMUs are visited in order of falling
+    normalised output minus input, so a dominator always comes first, and each row block
+    is only compared with the non-dominated DMUs found so far and then with itself.
+    """
+    K = X.shape[0]
+    Xn = X / np.where(np.abs(X).mean(axis=0) > 0, np.abs(X).mean(axis=0), 1.0)
+    Yn = Y / np.where(np.abs(Y).mean(axis=0) > 0, np.abs(Y).mean(axis=0), 1.0)
+    order = np.argsort(Xn.sum(axis=1) - Yn.sum(axis=1), kind="stable")
+    # Inputs and negated outputs: j dominates k when no column is larger and one is smaller
+    Z = np.hstack([X, -Y])
+
+    def dominated(rows, by):
+        weak = np.ones((len(rows), len(by)), dtype=bool)
+        strict = np.zeros((len(rows), len(by)), dtype=bool)
+        for col in Z.T:
+            a, b = col[by][None, :], col[rows][:, None]
+            weak &= a <= b
+            strict |= a < b
+        return (weak & strict).any(axis=1)
+
+    found = np.zeros(0, dtype=int)
+    block = 1024
+    for start in range(0, K, block):
+        rows = order[start:start + block]
+        # Bound the (rows x found) matrices to about 4M entries
+        step = max(1, int(4e6 // len(rows)))
+        for s in range(0, len(found), step):
+            rows = rows[~dominated(rows, found[s:s + step])]
+        found = np.concatenate([found, rows[~dominated(rows, rows)]])
+    return np.sort(found)
+
+
+def _fdh_ratios(X: np.ndarray, Y: np.ndarray, xb: np.ndarray, yb: np.ndarray):
+    """
+    ratio[i, j] = max_r X_jr / xb_ir (a zero input needs a zero from j) and covers[i, j]:
+    DMU j produces at least yb_i.
+    """
+    ratio = np.zeros((len(xb), len(X)))
+    for i in range(X.shape[1]):
+        a, b = X[None, :, i], xb[:, None, i]
+        if (b > 0).all():
+            column = a * (1.0 / b)
+        else:
+            column = np.divide(a, b, out=np.where(a > 0, np.inf, np.zeros_like(b)), where=b > 0)
+        np.maximum(ratio, column, out=ratio)
+    covers = np.ones(ratio.shape, dtype=bool)
+    for r in range(Y.shape[1]):
+        covers &= Y[None, :, r] >= yb[:, None, r]
+    return ratio, covers
+
+
+def _fdh_scores(X: np.ndarray, Y: np.ndarray):
+    """
+    Input-oriented FDH efficiency: for DMU k the smallest max_i X_ij / X_ik over the DMUs j
+    that produce at least Y_k, and the j attaining it. A dominated j is never better than its
+    dominator, so only the non-dominated DMUs are compared, in row blocks of about 4M
+    pairs. A zero input needs a zero from the peer.
+    """
+    K = X.shape[0]
+    reference = _nondominated(X, Y)
+    Xr, Yr = X[reference], Y[reference]
+    theta = np.zeros(K)
+    peer = np.zeros(K, dtype=int)
+    block = max(1, int(4e6 // len(reference)))
+    for start in range(0, K, block):
+        ratio, covers = _fdh_ratios(Xr, Yr, X[start:start + block], Y[start:start + block])
+        ratio[~covers] = np.inf
+        best = ratio.argmin(axis=1)
+        theta[start:start + block] = ratio[np.arange(len(ratio)), best]
+        peer[start:start + block] = reference[best]
+    return theta, peer
+
+
+def run_fdh_analysis(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, use_cache: bool = True,
+    report: RunReport = None,
+):
+    """
+    Input-oriented Free Disposal Hull efficiency for every DMU: the non-convex benchmark
+    computed from pairwise dominance only, without any LP. 'peer' is the observed DMU
+    that sets the score. With use_cache, scores of identical data are read from the
+    on-disk cache (dea_cache); a RunReport receives the model and wall time.
+    """
+    dmu_names, X, Y = _prepare_sbm_data(df, dmu_column, inputs, outputs)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "fdh", dmu_names
+
+    key = dea_cache.make_key("fdh", X, Y)
+    cached = dea_cache.load(key) if use_cache else None
+    if cached is not None:
+        theta, peer = cached["theta"], cached["peer"]
+        if report is not None:
+            report.cached = True
+    else:
+        theta, peer = _fdh_scores(X, Y)
+        if use_cache:
+            dea_cache.save(key, theta=theta, peer=peer)
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+    return [
+        {"dmu": dmu_names[k], "score": float(theta[k]), "peer": dmu_names[peer[k]]}
+        for k in range(len(dmu_names))
+    ]
+
+
+# Per-process data of order-m pool workers
+_order_m_state = None
+
+
+def _init_order_m_worker(X: np.ndarray, Y: np.ndarray, m: int, replicates: int, seed: int):
+    global _order_m_state
+    _order_m_state = (X, Y, m, replicates, seed)
+
+
+def _order_m_block(start: int, stop: int, state=None):
+    """
+    Order-m scores of DMUs start..stop-1. Every replicate draws m DMUs (with replacement)
+    from those producing at least the DMU's outputs and keeps the FDH score against them;
+    the score is the mean over the replicates. The generator is seeded with (seed, start),
+    so results do not depend on how blocks are spread over workers.
+    """
+    X, Y, m, replicates, seed = state or _order_m_state
+    ratio, covers = _fdh_ratios(X, Y, X[start:stop], Y[start:stop])
+    counts = covers.sum(axis=1)
+    # The candidates of all DMUs in the block, row after row; a draw is an offset into it
+    values = ratio[covers]
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rng = np.random.default_rng([seed, start])
+    draws = offsets[:, None, None] + rng.integers(0, counts[:, None, None], size=(len(counts), replicates, m))
+    return values[draws].min(axis=2).mean(axis=1)
+
+
+def run_order_m_analysis(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, m: int = 25, replicates: int = 200,
+    seed: int = 0, n_jobs: int = None, use_cache: bool = True, report: RunReport = None,
+):
+    """
+    Input-oriented order-m partial frontier efficiency (Cazals, Florens and Simar): the
+    expected FDH score of each DMU against m DMUs drawn from the ones producing at least
+    its outputs, estimated over `replicates` Monte Carlo draws. Extreme units only enter a
+    fraction of the draws, so they shift the scores far less than on the full frontier;
+    scores above 1 mark DMUs beyond the order-m frontier. The same seed gives the same
+    scores for any n_jobs; n_jobs > 1 spreads the DMU blocks over a process pool.
+    """
+    if m < 1 or replicates < 1:
+        raise ValueError("مقدار m و تعداد تکرارها باید حداقل ۱ باشد.")
+    dmu_names, X, Y = _prepare_sbm_data(df, dmu_column, inputs, outputs)
+    K = len(dmu_names)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "order-m", dmu_names
+
+    key = dea_cache.make_key(f"order-m|{m}|{replicates}|{seed}", X, Y)
+    cached = dea_cache.load(key) if use_cache else None
+    if cached is not None:
+        scores = cached["score"]
+        if report is not None:
+            report.cached = True
+    else:
+        # Blocks keep the (DMUs x K) ratios and the (DMUs x replicates x m) draws around 4M entries
+        block = max(1, int(min(4e6 // K, 4e6 // (replicates * m))))
+        starts = list(range(0, K, block))
+        stops = [min(K, s + block) for s in starts]
+        n_jobs = _resolve_n_jobs(n_jobs)
+        if n_jobs == 1:
+            state = (X, Y, m, replicates, seed)
+            scores = np.concatenate([_order_m_block(a, b, state) for a, b in zip(starts, stops)])
+        else:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs, initializer=_init_order_m_worker, initargs=(X, Y, m, replicates, seed),
+            ) as pool:
+                scores = np.concatenate(list(pool.map(_order_m_block, starts, stops)))
+        if use_cache:
+            dea_cache.save(key, score=scores)
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+    return [
+        {"dmu": dmu_names[k], "score": float(scores[k]) if np.isfinite(scores[k]) else None}
+        for k in range(K)
+    ]
+
+
+# ===== BOOTSTRAP =====
+# Replicates per block; each block is seeded with (seed, first replicate), so results do not
+# depend on how the blocks are spread over workers
+_BOOTSTRAP_BLOCK = 8
+
+# Per-process data of bootstrap pool workers
+_bootstrap_state = None
+
+
+def _init_bootstrap_worker(state: dict):
+    global _bootstrap_state
+    _bootstrap_state = state
+
+
+def _bandwidth(distances: np.ndarray) -> float:
+    # Silverman's rule on the sample reflected around 1; the interquartile range is skipped
+    # when the efficient DMUs (distance 1) fill the middle half
+    reflected = np.concatenate([distances, 2.0 - distances])
+    spread = reflected.std()
+    iqr = np.subtract(*np.percentile(reflected, [75, 25]))
+    if iqr > 0:
+        spread = min(spread, iqr / 1.34)
+    return 0.9 * spread * len(reflected) ** -0.2
+
+
+def _pseudo_distances(rng, distances: np.ndarray, bandwidth: float, replicates: int) -> np.ndarray:
+    """
+    Smoothed-bootstrap draws of the Shephard distances (Simar and Wilson), one row per
+    replicate: resample the sample reflected around 1, add bandwidth * N(0, 1) noise, shrink
+    towards the row mean so the draws keep the sample variance, and reflect back above 1.
+    Shrinking before reflecting keeps the mass of the efficient DMUs at the frontier.
+    """
+    reflected = np.concatenate([distances, 2.0 - distances])
+    beta = reflected[rng.integers(0, len(reflected), size=(replicates, len(distances)))]
+    noisy = beta + bandwidth * rng.standard_normal(beta.shape)
+    variance = reflected.var()
+    if variance > 0:
+        mean = beta.mean(axis=1, keepdims=True)
+        noisy = mean + (noisy - mean) / np.sqrt(1.0 + bandwidth ** 2 / variance)
+    return np.where(noisy < 1.0, 2.0 - noisy, noisy)
+
+
+def _replicate_scores(Xs: np.ndarray, Ys: np.ndarray, X0: np.ndarray, Y0: np.ndarray, model: str, engine: dict):
+    """
+    Scores of the points (X0, Y0) against the pseudo-sample (Xs, Ys), and the number of
+    points left unresolved. A dominated pseudo DMU is never needed as a peer, so only the
+    non-dominated ones become lambda columns. SBM points outside the pseudo technology are
+    scored by super-SBM (above 1), as BCC scores them by theta above 1.
+    """
+    if Xs.shape[1] == 1 and Ys.shape[1] == 1:
+        # One input and one output: read the score off the closed-form frontier
+        g = _single_projection(Xs[:, 0], Ys[:, 0], Y0[:, 0])[0]
+        x0 = X0[:, 0]
+        return np.where(x0 > 0, g / np.where(x0 > 0, x0, 1.0), np.where(g > 0, np.nan, 1.0)), 0
+    reference = _nondominated(Xs, Ys)
+    X_all, Y_all = np.vstack([Xs, X0]), np.vstack([Ys, Y0])
+    tasks = [(len(Xs) + k, None) for k in range(len(X0))]
+    with _DMUSolver(_BCCTemplate if model == "bcc" else _SBMTemplate, X_all, Y_all, reference=reference,
+                    **engine) as dmu_solver:
+        scores = np.array([values[0] for values in dmu_solver.solve(tasks)])
+    unresolved = dmu_solver.unresolved
+    if model == "sbm":
+        # An SBM LP that ended without the time limits cutting it short found the point infeasible
+        outside = [i for i in np.flatnonzero(np.isnan(scores)) if tasks[i][0] not in unresolved]
+        if outside:
+            with _DMUSolver(_SuperSBMTemplate, X_all, Y_all, reference=reference,
+                            **dict(engine, formulation="envelopment")) as dmu_solver:
+                scores[outside] = [values[0] for values in dmu_solver.solve([tasks[i] for i in outside])]
+            unresolved = unresolved | dmu_solver.unresolved
+    return scores, len(unresolved)
+
+
+def _bootstrap_block(start: int, stop: int, state: dict = None):
+    """Scores of the evaluated DMUs in replicates start..stop-1, one row per replicate."""
+    s = state or _bootstrap_state
+    rng = np.random.default_rng([s["seed"], start])
+    factors = _pseudo_distances(rng, s["distances"], s["bandwidth"], stop - start)
+    scores = np.zeros((stop - start, len(s["X0"])))
+    unresolved = 0
+    for b, factor in enumerate(factors):
+        scores[b], lost = _replicate_scores(
+            factor[:, None] * s["targets"], s["Y"], s["X0"], s["Y0"], s["model"], s["engine"]
+        )
+        unresolved += lost
+    return scores, unresolved
+
+
+def _bootstrap_intervals(
+    presolve: _Presolve, scores: np.ndarray, targets: np.ndarray, model: str, replicates: int, alpha: float,
+    seed: int, n_jobs: int = None, engine: dict = None,
+):
+    """
+    Simar–Wilson smoothed bootstrap of input-oriented scores on presolved data. scores are
+    the estimated efficiencies and targets their input projections on the estimated
+    frontier. Every replicate draws Shephard distances delta* (1 / score) from the reflected
+    kernel estimate, moves each DMU to delta* times its target, and scores the observed DMUs
+    against that pseudo-sample. Returns the bias-corrected scores, the lower and upper
+    bounds of the 1 - alpha basic bootstrap intervals (NaN where the score is not valid) and the
+    number of unresolved LPs. The same seed gives the same results for any n_jobs; n_jobs > 1
+    spreads the blocks of replicates over a process pool.
+    """
+    K = len(scores)
+    valid = np.flatnonzero(np.isfinite(scores) & (scores > 0))
+    corrected, lower, upper = np.full(K, np.nan), np.full(K, np.nan), np.full(K, np.nan)
+    if not len(valid):
+        return corrected, lower, upper, 0
+    distances = 1.0 / scores[valid]
+    # Identical DMUs share every replicate score, so one per group is evaluated
+    representatives, members = presolve.fan_out(valid)
+    state = {
+        "targets": targets[valid], "Y": presolve.Y[valid], "X0": presolve.X[representatives],
+        "Y0": presolve.Y[representatives], "distances": distances, "bandwidth": _bandwidth(distances),
+        "seed": seed, "model": model, "engine": dict(engine or {}, n_jobs=1),
+    }
+    starts = list(range(0, replicates, _BOOTSTRAP_BLOCK))
+    stops = [min(replicates, s + _BOOTSTRAP_BLOCK) for s in starts]
+    n_jobs = _resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        blocks = [_bootstrap_block(a, b, state) for a, b in zip(starts, stops)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_bootstrap_worker, initargs=(state,),
+        ) as pool:
+            blocks = list(pool.map(_bootstrap_block, starts, stops))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        boot = 1.0 / np.vstack([block for block, _ in blocks])
+    estimate = 1.0 / scores[representatives]
+    answered = np.flatnonzero(np.isfinite(boot).any(axis=0))
+    boot = np.where(np.isfinite(boot[:, answered]), boot[:, answered], np.nan)
+    low, high = np.nanquantile(boot, [alpha / 2, 1 - alpha / 2], axis=0)
+    # Basic bootstrap on the distance scale; true distances are at least 1
+    rows = np.full((3, len(representatives)), np.nan)
+    rows[:, answered] = np.maximum(
+        [2 * estimate[answered] - np.nanmean(boot, axis=0), 2 * estimate[answered] - high,
+         2 * estimate[answered] - low],
+        1.0,
+    )
+    for j, positions in enumerate(members):
+        corrected[valid[positions]], upper[valid[positions]], lower[valid[positions]] = 1.0 / rows[:, j]
+    return corrected, lower, upper, sum(lost for _, lost in blocks)
+
+
+def _check_bootstrap(replicates: int, alpha: float):
+    if replicates < 0:
+        raise ValueError("تعداد تکرارهای بوت‌استرپ نمی‌تواند منفی باشد.")
+    if not 0 < alpha < 1:
+        raise ValueError("سطح معناداری باید بین ۰ و ۱ باشد.")
+
+
+def _run_bootstrap(
+    model: str, X: np.ndarray, Y: np.ndarray, scores: np.ndarray, targets: np.ndarray, replicates: int,
+    alpha: float, seed: int, n_jobs: int, engine: dict, use_cache: bool, report: RunReport = None,
+):
+    """
+    Bootstrap of a finished BCC ('bcc') or SBM ('sbm') run: scores (NaN where the run gave
+    none) and their input targets in the original units. Returns the bias-corrected scores
+    and interval bounds in the run's score scale, read from and written to the disk cache.
+    """
+    start = time.perf_counter()
+    key = dea_cache.make_key(f"{model}-boot|{replicates}|{alpha!r}|{seed}", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    cached = dea_cache.load(key) if use_cache else None
+    if cached is not None:
+        if report is not None:
+            report.bootstrap = {"replicates": replicates, "cached": True}
+        return cached["corrected"], cached["lower"], cached["upper"]
+
+    presolve = _Presolve(X, Y)
+    unresolved = 0
+    if model == "bcc" and presolve.constant_inputs.any():
+        # A constant input fixes every theta at 1 exactly: nothing to correct
+        corrected = lower = upper = scores
+    else:
+        raw = scores
+        if model == "sbm":
+            # SBM scores of the presolved inputs (dropped constant inputs averaged in zeros)
+            raw = 1.0 - (1.0 - scores) * presolve.m / len(presolve.inputs)
+        corrected, lower, upper, unresolved = _bootstrap_intervals(
+            presolve, raw, targets[:, presolve.inputs] / presolve.input_scale, model, replicates, alpha, seed,
+            n_jobs, engine,
+        )
+        if model == "sbm":
+            corrected, lower, upper = (presolve.sbm_scores(a) for a in (corrected, lower, upper))
+    if use_cache and not unresolved:
+        dea_cache.save(key, corrected=corrected, lower=lower, upper=upper)
+    if report is not None:
+        report.bootstrap = {
+            "replicates": replicates, "cached": False, "unresolved_lps": unresolved,
+            "wall_time": time.perf_counter() - start,
+        }
+    return corrected, lower, upper
+
+
+def _add_bootstrap(results: list, corrected: np.ndarray, lower: np.ndarray, upper: np.ndarray):
+    for k, result in enumerate(results):
+        result.update({
+            name: None if np.isnan(values[k]) else float(values[k])
+            for name, values in (("bias_corrected", corrected), ("ci_lower", lower), ("ci_upper", upper))
+        })
+
+
+# ===== MALMQUIST =====
+MALMQUIST_RETURNS = {"crs": _CCRTemplate, "vrs": _BCCTemplate}
+
+
+def _prepare_panel_data(df: pd.DataFrame, dmu_column: str, period_column: str, inputs: list, outputs: list):
+    # Long-form panel: one row per DMU and period; periods are coded 0..T-1 in sorted order
+    if period_column not in df.columns:
+        raise ValueError("برخی ستون‌ها در دیتافریم یافت نشدند.")
+    dmu_names, X, Y = _prepare_bcc_data(df, dmu_column, inputs, outputs)
+    periods, codes = np.unique(df[period_column].values, return_inverse=True)
+    if len(periods) < 2:
+        raise ValueError("برای شاخص مالم‌کوئیست حداقل دو دوره لازم است.")
+    if pd.Series(list(zip(dmu_names, codes))).duplicated().any():
+        raise ValueError("هر واحد در هر دوره باید فقط یک ردیف داشته باشد.")
+    return list(dmu_names), codes.ravel(), periods.tolist(), X, Y
+
+
+def run_malmquist_analysis(
+    df: pd.DataFrame, dmu_column: str, period_column: str, inputs: list, outputs: list,
+    returns_to_scale: str = "crs", solver: str = "highs", n_jobs: int = None, batch_size=None,
+    formulation: str = "envelopment", use_cache: bool = True, report: RunReport = None,
+    time_limit: float = None, time_budget: float = None,
+):
+    """
+    Input-oriented Malmquist productivity index (Färe, Grosskopf, Norris and Zhang) of a
+    DMU x period panel in long form. For every DMU present in two consecutive periods,
+    malmquist = efficiency_change x technical_change: efficiency_change is the ratio of its
+    within-period scores (catching up with the frontier), technical_change the geometric
+    mean shift of the frontier measured at its two points. Values above 1 mean progress.
+
+    Each period's frontier is one LP template (returns_to_scale 'crs', the usual index, or
+    'vrs') that scores that period's DMUs and, for the DMUs present in both, those of the
+    periods before and after it: T x K within-period and 2 x (T-1) x K cross-period LPs,
+    spread over n_jobs workers. Only the extreme-efficient DMUs of a period (see
+    _frontier_reference) become its lambda columns. A VRS
+    cross-period LP can be infeasible, which leaves that index None with status
+    'infeasible' (as in run_ranking_dea); time_limit and time_budget work as in
+    run_dea_analysis.
+    """
+    if returns_to_scale not in MALMQUIST_RETURNS:
+        raise ValueError("نوع بازده به مقیاس باید crs یا vrs باشد.")
+    dmu_names, codes, periods, X, Y = _prepare_panel_data(df, dmu_column, period_column, inputs, outputs)
+    start = time.perf_counter()
+    if report is not None:
+        report.model = f"malmquist-{returns_to_scale}"
+        report.dmu_names = [f"{name} ({periods[t]})" for name, t in zip(dmu_names, codes)]
+    row_of = {(name, t): r for r, (name, t) in enumerate(zip(dmu_names, codes))}
+    # theta of every panel row against the frontier of its own, the previous and the next period
+    name_codes = np.unique(np.asarray(dmu_names, dtype=str), return_inverse=True)[1].ravel()
+    key = dea_cache.make_key(
+        f"malmquist|{returns_to_scale}", np.column_stack([codes, name_codes, X]), Y, tolerance=_FEASIBILITY_TOLERANCE
+    )
+    cached = dea_cache.load(key) if use_cache else None
+    if cached is not None:
+        own, previous, following = cached["own"], cached["previous"], cached["following"]
+        lost = np.zeros((3, len(codes)), dtype=bool)
+        # Only runs whose missing scores are all infeasible LPs are cached
+        void = np.isnan(np.vstack([own, previous, following]))
+        if report is not None:
+            report.cached = True
+    else:
+        # Theta is unit-free: one scale per column over the whole panel keeps the LPs well conditioned
+        Xs, Ys = X / _Presolve._scale(X), Y / _Presolve._scale(Y)
+        own, previous, following = (np.full(len(codes), np.nan) for _ in range(3))
+        # solved: an LP was run; lost: it gave no answer in time; void: it was infeasible
+        solved, lost, void = (np.zeros((3, len(codes)), dtype=bool) for _ in range(3))
+        deadline = _deadline(time_budget)
+        for t in range(len(periods)):
+            rows = np.flatnonzero(codes == t)
+            names = {dmu_names[r] for r in rows}
+            before = [r for r in np.flatnonzero(codes == t - 1) if dmu_names[r] in names]
+            after = [r for r in np.flatnonzero(codes == t + 1) if dmu_names[r] in names]
+            tasks = np.concatenate([rows, before, after]).astype(int)
+            # The extreme-efficient DMUs span the VRS frontier, and with it the CRS one
+            reference = rows[_cached_frontier(Xs[rows], Ys[rows], solver, time_limit, deadline)[0]]
+            with _DMUSolver(
+                MALMQUIST_RETURNS[returns_to_scale], Xs, Ys, solver, n_jobs, reference, batch_size, formulation,
+                time_limit=time_limit, deadline=deadline,
+            ) as dmu_solver:
+                thetas = np.array([values[0] for values in dmu_solver.solve([(r, None) for r in tasks])])
+            if report is not None:
+                report.add(dmu_solver.records, f"period {periods[t]}")
+            missing = np.isin(tasks, list(dmu_solver.unresolved))
+            infeasible = np.isin(tasks, [r["dmu"] for r in dmu_solver.records if r["status"] == "infeasible"])
+            for i, target, part in (
+                (0, own, slice(0, len(rows))),
+                (2, following, slice(len(rows), len(rows) + len(before))),
+                (1, previous, slice(len(rows) + len(before), len(tasks))),
+            ):
+                target[tasks[part]], solved[i, tasks[part]] = thetas[part], True
+                lost[i, tasks[part]], void[i, tasks[part]] = missing[part], infeasible[part]
+        failed = np.isnan(np.vstack([own, previous, following])) & solved & ~void
+        if use_cache and not lost.any() and not failed.any():
+            dea_cache.save(key, own=own, previous=previous, following=following)
+
+    def value(v):
+        return None if not np.isfinite(v) else float(v)
+
+    results = []
+    for t in range(len(periods) - 1):
+        for a in np.flatnonzero(codes == t):
+            b = row_of.get((dmu_names[a], t + 1))
+            if b is None:
+                continue
+            with np.errstate(divide="ignore", invalid="ignore"):
+                efficiency_change = own[b] / own[a]
+                technical_change = np.sqrt(previous[b] / own[b] * own[a] / following[a])
+            unresolved = lost[0, a] or lost[0, b] or lost[1, b] or lost[2, a]
+            infeasible = void[0, a] or void[0, b] or void[1, b] or void[2, a]
+            malmquist = efficiency_change * technical_change
+            results.append({
+                "dmu": dmu_names[a], "period_from": periods[t], "period_to": periods[t + 1],
+                "efficiency_from": value(own[a]), "efficiency_to": value(own[b]),
+                "efficiency_change": value(efficiency_change), "technical_change": value(technical_change),
+                "malmquist": value(malmquist),
+                "status": "unresolved" if unresolved else "infeasible" if infeasible else _result_status(malmquist),
+            })
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+    return results
+
+
+# ===== CROSS-EFFICIENCY =====
+CROSS_GOALS = ("aggressive", "benevolent")
+# Entries of one block of the K x K cross-efficiency matrix; bounds the memory of the products
+_CROSS_BLOCK_ENTRIES = 4_000_000
+
+
+class _CrossWeightTemplate(_LPTemplate):
+    """
+    Doyle and Green's secondary-goal LP for the CCR multiplier weights (v on inputs, u on
+    outputs) of one DMU. The DMU keeps its CCR score theta (u.y0 = theta v.x0), and the
+    aggregate efficiency of the other DMUs is made as small ('aggressive') or as large
+    ('benevolent') as possible: min or max u.(sum(Y) - y0), with v.(sum(X) - x0) = 1 and
+    u.y_j <= v.x_j for every reference DMU j.
+
+    Columns are [v_1..v_m, u_1..u_n] and rows are [normalisation, efficiency row, one row
+    per reference DMU]. theta travels as an extra last column of X, so _DMUSolver can load
+    it together with the DMU's point; totals holds the column sums of all K DMUs.
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray, totals: tuple = None, goal: str = "aggressive"):
+        X = np.asarray(X, dtype=float)[:, :-1]
+        K, m = X.shape
+        _, n = Y.shape
+        self.X, self.Y = X, np.asarray(Y, dtype=float)
+        self.K, self.m, self.n = K, m, n
+        self.X_total, self.Y_total = totals
+        self.sign = 1.0 if goal == "aggressive" else -1.0
+
+        self.c = np.zeros(m + n)
+        top = np.ones((2, m + n))
+        top[0, m:] = 0.0
+        self.A = sparse.vstack([sparse.csr_matrix(top), sparse.csr_matrix(np.hstack([-self.X, self.Y]))], format="csr")
+        self.row_lower = np.concatenate([[1.0, 0.0], np.full(K, -np.inf)])
+        self.row_upper = np.concatenate([[1.0, 0.0], np.zeros(K)])
+        self.col_lower = np.zeros(m + n)
+        self.col_upper = np.full(m + n, np.inf)
+        self.patch_rows = np.concatenate([np.zeros(m, dtype=int), np.ones(m + n, dtype=int)])
+        self.patch_cols = np.concatenate([np.arange(m), np.arange(m + n)])
+        self.patch_values = np.ones(2 * m + n)
+        self.cost_cols = np.arange(m, m + n)
+
+    def load_point(self, x0: np.ndarray, y0: np.ndarray, exclude_dmu_index: int = None):
+        """Patch the template in place for the point x0 = (inputs, theta), y0."""
+        x0, theta = np.asarray(x0[:-1], dtype=float), x0[-1]
+        self.patch_values = np.concatenate([self.X_total - x0, -theta * x0, y0])
+        self.c[self.cost_cols] = self.sign * (self.Y_total - y0)
+
+
+def _cross_efficiency_means(X: np.ndarray, Y: np.ndarray, V: np.ndarray, U: np.ndarray) -> np.ndarray:
+    """
+    Mean cross-efficiency of every DMU j: the average of E[d, j] = u_d.y_j / v_d.x_j over
+    the other DMUs d with weights (NaN rows of V/U are skipped). The K x K matrix is built
+    as row blocks of two matrix products, at most _CROSS_BLOCK_ENTRIES entries at a time.
+    """
+    K = X.shape[0]
+    raters = np.flatnonzero(np.isfinite(V).all(axis=1) & np.isfinite(U).all(axis=1))
+    total, count = np.zeros(K), np.zeros(K)
+    block = max(1, _CROSS_BLOCK_ENTRIES // max(K, 1))
+    for start in range(0, len(raters), block):
+        rows = raters[start:start + block]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            E = (U[rows] @ Y.T) / (V[rows] @ X.T)
+        E[np.arange(len(rows)), rows] = np.nan  # self-appraisal is not part of the mean
+        valid = np.isfinite(E)
+        total += np.where(valid, E, 0.0).sum(axis=0)
+        count += valid.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def run_cross_efficiency(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, secondary_goal: str = "aggressive",
+    solver: str = "highs", n_jobs: int = None, use_cache: bool = True, report: RunReport = None,
+    time_limit: float = None, time_budget: float = None,
+):
+    """
+    Rank DMUs by mean cross-efficiency (peer appraisal): every DMU rates all the others
+    with its own CCR multiplier weights, and a DMU's score is the mean of the ratings it
+    receives, so DMUs tied at self-appraised 1.0 are told apart.
+
+    Each DMU's weights are solved once: its CCR score theta, then the weights that keep
+    theta while following secondary_goal ('aggressive' or 'benevolent', see
+    _CrossWeightTemplate). Both passes run on n_jobs workers against the extreme-efficient
+    DMUs only. The K x K matrix is then computed in bounded row blocks of matrix products.
+    Results carry dmu, score, self_efficiency (the CCR score), rank (1 is best) and status;
+    time_limit and time_budget work as in run_dea_analysis.
+    """
+    if secondary_goal not in CROSS_GOALS:
+        raise ValueError("هدف ثانویه باید aggressive یا benevolent باشد.")
+    dmu_names, X, Y = _prepare_bcc_data(df, dmu_column, inputs, outputs)
+    K = len(dmu_names)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = f"cross-{secondary_goal}", list(dmu_names)
+
+    key = dea_cache.make_key(f"cross|{secondary_goal}", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    cached = dea_cache.load(key) if use_cache else None
+    unresolved = set()
+    if cached is not None:
+        theta, scores = cached["theta"], cached["score"]
+        if report is not None:
+            report.cached = True
+    else:
+        # Ratios of weighted sums are unit-free, so the weights are solved on scaled columns
+        Xs, Ys = X / _Presolve._scale(X), Y / _Presolve._scale(Y)
+        limits = dict(time_limit=time_limit, deadline=_deadline(time_budget))
+        # Every rating constraint u.y_j <= v.x_j follows from those of the hull DMUs
+        reference = _cached_frontier(Xs, Ys, solver, **limits)[0]
+        with _DMUSolver(_CCRTemplate, Xs, Ys, solver, n_jobs, reference, **limits) as dmu_solver:
+            theta = np.array([values[0] for values in dmu_solver.solve([(k, None) for k in range(K)])])
+        unresolved.update(dmu_solver.unresolved)
+        if report is not None:
+            report.add(dmu_solver.records, "ccr")
+
+        weights = np.full((K, X.shape[1] + Y.shape[1]), np.nan)
+        rated = np.flatnonzero(np.isfinite(theta))
+        template_cls = functools.partial(
+            _CrossWeightTemplate, totals=(Xs.sum(axis=0), Ys.sum(axis=0)), goal=secondary_goal
+        )
+        with _DMUSolver(
+            template_cls, np.column_stack([Xs, theta]), Ys, solver, n_jobs, reference, **limits
+        ) as dmu_solver:
+            for k, values in zip(rated, dmu_solver.solve([(k, None) for k in rated])):
+                weights[k] = values
+        unresolved.update(dmu_solver.unresolved)
+        if report is not None:
+            report.add(dmu_solver.records, secondary_goal)
+
+        m = X.shape[1]
+        scores = _cross_efficiency_means(Xs, Ys, weights[:, :m], weights[:, m:])
+        if use_cache and not unresolved:
+            dea_cache.save(key, theta=theta, score=scores)
+
+    ranks = pd.Series(scores).rank(ascending=False, method="min").values
+    results = []
+    for k in range(K):
+        score = float(scores[k]) if np.isfinite(scores[k]) else None
         results.append({
-            'dmu': dmu_names[k],
-            'score': score
+            "dmu": dmu_names[k], "score": score,
+            "self_efficiency": float(theta[k]) if np.isfinite(theta[k]) else None,
+            "rank": int(ranks[k]) if score is not None else None,
+            "status": _result_status(score, k in unresolved),
+        })
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+    return results
+
+
+# ===== SCALE EFFICIENCY =====
+# Bounds of the convexity row sum(lambda), from the widest technology to the narrowest
+CONVEXITY_BOUNDS = {"crs": (-np.inf, np.inf), "nirs": (-np.inf, 1.0), "vrs": (1.0, 1.0)}
+
+
+def _returns_label(crs: float, nirs: float, vrs: float, tol: float = 1e-6):
+    # Scale efficient ('CRS') when the CRS and VRS scores agree; otherwise the NIRS score
+    # equals the CRS one below the optimal scale ('IRS') and the VRS one above it ('DRS')
+    if not np.isfinite([crs, nirs, vrs]).all():
+        return None
+    if vrs - crs <= tol:
+        return "CRS"
+    return "IRS" if nirs - crs <= tol else "DRS"
+
+
+def run_scale_efficiency(
+    df: pd.DataFrame, dmu_column: str, inputs: list, outputs: list, solver: str = "highs", n_jobs: int = None,
+    frontier_first: bool = True, batch_size=None, formulation: str = "envelopment", use_cache: bool = True,
+    report: RunReport = None, time_limit: float = None, time_budget: float = None,
+):
+    """
+    Input-oriented CRS, NIRS and VRS scores of every DMU, the scale efficiency crs / vrs
+    and the returns to scale of its projection: 'IRS' (too small), 'CRS' or 'DRS' (too big).
+
+    The three models share one BCC template and solver session and differ only in the
+    bounds of the convexity row, so they run as three passes of one _DMUSolver, and HiGHS
+    keeps its warm start across them. The technologies are nested (CRS contains NIRS
+    contains VRS): an optimum whose lambdas already satisfy the next model's convexity
+    row is optimal there too, so NIRS LPs run only for DMUs whose CRS lambdas sum above 1
+    and VRS LPs only for those whose NIRS lambdas sum below 1. With frontier_first only
+    the extreme-efficient DMUs, which span all three technologies, are lambda columns.
+    The other options work as in run_hr_dea_analysis.
+    """
+    dmu_names, X, Y = _prepare_bcc_data(df, dmu_column, inputs, outputs)
+    K = len(dmu_names)
+    start = time.perf_counter()
+    if report is not None:
+        report.model, report.dmu_names = "scale", list(dmu_names)
+
+    key = dea_cache.make_key("scale", X, Y, tolerance=_FEASIBILITY_TOLERANCE)
+    cached = dea_cache.load(key) if use_cache else None
+    unresolved = set()
+    if cached is not None:
+        scores = {model: cached[model] for model in CONVEXITY_BOUNDS}
+        if report is not None:
+            report.cached = True
+    else:
+        # Theta is unit-free: scaled columns keep the LPs well conditioned
+        Xs, Ys = X / _Presolve._scale(X), Y / _Presolve._scale(Y)
+        deadline = _deadline(time_budget)
+        reference = _cached_frontier(Xs, Ys, solver, time_limit, deadline)[0] if frontier_first else None
+        scores = {model: np.full(K, np.nan) for model in CONVEXITY_BOUNDS}
+        lambda_sums = np.full(K, np.nan)
+        previous = None
+        with _DMUSolver(
+            _BCCTemplate, Xs, Ys, solver, n_jobs, reference, batch_size, formulation,
+            time_limit=time_limit, deadline=deadline,
+        ) as dmu_solver:
+            for model, (lower, upper) in CONVEXITY_BOUNDS.items():
+                pending = np.arange(K)
+                if previous is not None:
+                    tol = _FEASIBILITY_TOLERANCE
+                    reuse = (lambda_sums >= lower - tol) & (lambda_sums <= upper + tol)
+                    scores[model][reuse] = scores[previous][reuse]
+                    pending = np.flatnonzero(~reuse)
+                solved = len(dmu_solver.records)
+                tasks = [(k, None) for k in pending]
+                for k, values in zip(pending, dmu_solver.solve(tasks, convexity=(lower, upper))):
+                    scores[model][k], lambda_sums[k] = values[0], values[1:].sum()
+                if report is not None:
+                    report.add(dmu_solver.records[solved:], model)
+                previous = model
+        unresolved = dmu_solver.unresolved
+        if use_cache and not unresolved:
+            dea_cache.save(key, **scores)
+
+    def value(v):
+        return None if not np.isfinite(v) else float(v)
+
+    results = []
+    for k in range(K):
+        crs, nirs, vrs = (scores[model][k] for model in CONVEXITY_BOUNDS)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = crs / vrs
+        results.append({
+            "dmu": dmu_names[k], "crs": value(crs), "nirs": value(nirs), "vrs": value(vrs),
+            "scale_efficiency": value(scale), "returns_to_scale": _returns_label(crs, nirs, vrs),
+            "status": _result_status(scale, k in unresolved),
         })
-        
-    return results
\ No newline at end of file
+    if report is not None:
+        report.wall_time = time.perf_counter() - start
+    return results
@@ -0,0 +1,103 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import hashlib
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# ===== CONFIGURATION =====
+# Total size of the on-disk cache; least recently used entries are removed beyond it
+CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+CACHE_VERSION = 2
+
+
+# ===== CORE BUSINESS LOGIC =====
+def cache_dir() -> str:
+    """
+    Directory of the DEA result cache: OPTIWISE_CACHE_DIR if set, otherwise the platform's
+    per-user cache location.
+    """
+    if os.environ.get("OPTIWISE_CACHE_DIR"):
+        return os.environ["OPTIWISE_CACHE_DIR"]
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "OptiWise", "Cache", "dea")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Caches"), "OptiWise", "dea")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "optiwise", "dea")
+
+
+def make_key(model: str, X: np.ndarray, Y: np.ndarray, orientation: str = "input", tolerance: float = 1e-7) -> str:
+    """Content hash of the data and everything that determines the DEA results."""
+    h = hashlib.sha256(f"v{CACHE_VERSION}|{model}|{orientation}|{tolerance!r}".encode())
+    for M in (X, Y):
+        M = np.ascontiguousarray(M, dtype=float)
+        h.update(str(M.shape).encode())
+        h.update(M.tobytes())
+    return h.hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(cache_dir(), f"{key}.npz")
+
+
+def load(key: str):
+    """Return the cached arrays for key as a dict, or None. A hit marks the entry as recently used."""
+    path = _path(key)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        os.utime(path)
+        return arrays
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Unreadable or truncated entry: drop it and recompute
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def save(key: str, **arrays):
+    """Store arrays under key (compressed .npz) and trim the cache to CACHE_SIZE_LIMIT. Best effort."""
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, _path(key))
+        _trim(directory)
+    except OSError:
+        pass
+
+
+def _trim(directory: str):
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(".npz"):
+            stat = os.stat(os.path.join(directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= CACHE_SIZE_LIMIT:
+            break
+        os.remove(os.path.join(directory, name))
+        total -= size
+
+
+def clear():
+    """Remove every cached DEA result."""
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith((".npz", ".tmp")):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
@@ -2,19 +2,24 @@
 # ===== IMPORTS & DEPENDENCIES =====
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QTableView,
-    QMessageBox, QGroupBox, QComboBox, QListWidget, QListWidgetItem, QSplitter, QCheckBox
+    QMessageBox, QGroupBox, QComboBox, QListWidget, QListWidgetItem, QSplitter, QCheckBox, QProgressBar
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
 import pandas as pd
 import traceback
 
-from ..logic.dea_analysis import run_dea_analysis
+from ..logic.dea_analysis import run_dea_analysis, iter_dea_analysis, CancellationToken
 from ..logic.clustering_analysis import run_single_clustering_model
 # --- MODIFIED: Import BasePage and other necessary utilities ---
-from .utils import create_numeric_item, create_text_item, get_color_for_cluster, save_table_to_excel, BasePage
+from .utils import create_numeric_item, create_score_item, create_slack_item, create_text_item, get_color_for_cluster, save_table_to_excel, BasePage, StreamWorker
 
 # ===== UI & APPLICATION LOGIC =====
+def normalize_dmu_name(name):
+    if not isinstance(name, str): name = str(name)
+    name = name.replace("ي", "ی").replace("ك", "ک")
+    return "".join(name.split())
+
 # --- MODIFIED: Inherit from BasePage instead of QWidget ---
 class EfficiencyPage(BasePage):
     analysis_completed = pyqtSignal(dict)
@@ -24,9 +29,13 @@ class EfficiencyPage(BasePage):
         self.clustering_data = None
         self.dea_df = None
         self.full_dea_results_df = None
+        self.result_groups = None
         self.selected_inputs = []
         self.selected_outputs = []
         self.is_fullscreen = False
+        self.worker = None
+        self.cancel_token = None
+        self.stream_results = {}
         self.initUI()
 
     def initUI(self):
@@ -106,12 +115,27 @@ class EfficiencyPage(BasePage):
         run_layout = QVBoxLayout()
         self.run_button = QPushButton("محاسبه بهره‌وری واحدی")
         self.run_button.setEnabled(False)
+        self.cancel_button = QPushButton("توقف محاسبه")
+        self.cancel_button.setEnabled(False)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
         run_layout.addWidget(self.run_button)
+        run_layout.addWidget(self.cancel_button)
+        run_layout.addWidget(self.progress_bar)
         self.run_group.setLayout(run_layout)
         
         self.middle_splitter.addWidget(self.run_group)
         self.middle_splitter.setSizes([400, 100])
         self.content_layout.addWidget(self.middle_splitter)
+
+        # Data editor: after an analysis, every edited value re-solves only the affected DMUs
+        self.data_group = QGroupBox("ویرایش داده‌ها (نتایج پس از هر تغییر به‌روز می‌شوند)")
+        self.data_group.setAlignment(Qt.AlignmentFlag.AlignRight)
+        data_layout = QVBoxLayout()
+        self.data_table = QTableView()
+        data_layout.addWidget(self.data_table)
+        self.data_group.setLayout(data_layout)
+        self.content_layout.addWidget(self.data_group)
         
         # --- Step 4: Results ---
         self.results_group = QGroupBox("نتایج تحلیل بهره‌وری (SBM ورودی-محور)")
@@ -123,12 +147,16 @@ class EfficiencyPage(BasePage):
         res_ctrl_layout.setDirection(QHBoxLayout.Direction.RightToLeft)
         self.cluster_filter_combo = QComboBox()
         self.cluster_filter_combo.setEnabled(False)
+        # Scores every DMU against the frontier of its own cluster instead of all DMUs
+        self.group_frontier_cb = QCheckBox("مرز جداگانه برای هر خوشه")
+        self.group_frontier_cb.setEnabled(False)
         self.export_button = QPushButton("خروجی اکسل")
         self.export_button.setObjectName("ExportButton")
         self.fullscreen_button = QPushButton("نمایش تمام صفحه")
         
         res_ctrl_layout.addWidget(QLabel("فیلتر خوشه:"))
         res_ctrl_layout.addWidget(self.cluster_filter_combo)
+        res_ctrl_layout.addWidget(self.group_frontier_cb)
         res_ctrl_layout.addWidget(self.export_button)
         res_ctrl_layout.addWidget(self.fullscreen_button)
         res_ctrl_layout.addStretch()
@@ -144,7 +172,9 @@ class EfficiencyPage(BasePage):
         self.upload_button.clicked.connect(self.load_dea_data)
         self.download_button.clicked.connect(self.download_template)
         self.run_button.clicked.connect(self.run_analysis)
+        self.cancel_button.clicked.connect(self.cancel_analysis)
         self.cluster_filter_combo.currentIndexChanged.connect(self.filter_display)
+        self.group_frontier_cb.stateChanged.connect(self.filter_display)
         self.inputs_select_all_cb.stateChanged.connect(self.toggle_select_all_inputs)
         self.outputs_select_all_cb.stateChanged.connect(self.toggle_select_all_outputs)
         self.inputs_list.itemSelectionChanged.connect(self.update_inputs_checkbox_state)
@@ -156,6 +186,7 @@ class EfficiencyPage(BasePage):
         self.is_fullscreen = not self.is_fullscreen
         self.upload_group.setVisible(not self.is_fullscreen)
         self.middle_splitter.setVisible(not self.is_fullscreen)
+        self.data_group.setVisible(not self.is_fullscreen)
         
         if self.is_fullscreen:
             self.fullscreen_button.setText("خروج از تمام صفحه")
@@ -215,6 +246,7 @@ class EfficiencyPage(BasePage):
         
         if clustering_data and 'all_results' in clustering_data:
             self.cluster_filter_combo.setEnabled(True)
+            self.group_frontier_cb.setEnabled(True)
             self.cluster_filter_combo.addItem("نمایش همه (بدون گروه‌بندی)", userData=None)
             
             best_model_info = sorted(clustering_data['all_results'], key=lambda x: self._calculate_combined_score(x, clustering_data['all_results']), reverse=True)[0]
@@ -230,6 +262,8 @@ class EfficiencyPage(BasePage):
         else:
             self.cluster_filter_combo.setPlaceholderText("خوشه‌بندی انجام نشده")
             self.cluster_filter_combo.setEnabled(False)
+            self.group_frontier_cb.setChecked(False)
+            self.group_frontier_cb.setEnabled(False)
             
         if self.full_dea_results_df is not None:
             self.display_results()
@@ -252,62 +286,149 @@ class EfficiencyPage(BasePage):
         if not self.selected_inputs or not self.selected_outputs:
             QMessageBox.warning(self, "شاخص انتخاب نشده", "لطفاً شاخص‌های ورودی و خروجی را انتخاب کنید.")
             return
+        cluster_info_df = self.cluster_labels() if self.group_frontier_cb.isChecked() else None
+        if self.dea_groups(cluster_info_df) is not None:
+            # Per-cluster frontiers are solved group by group, without streaming
+            self.compute_results(cluster_info_df=cluster_info_df)
+            return
+
+        # Results stream in from a worker thread; the table fills as DMUs are solved
+        df = self.dea_df.copy()
+        dmu_column_dea = df.columns[0]
+        inputs, outputs = list(self.selected_inputs), list(self.selected_outputs)
+        self.cancel_token = token = CancellationToken()
+        self.stream_results = {}
+
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(
+            ["خوشه", "DMU", "امتیاز بهره‌وری"] + [f"اسلک {inp}" for inp in inputs] + ["مجموعه مرجع"]
+        )
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setModel(model)
+        self.progress_bar.setRange(0, len(df))
+        self.progress_bar.setValue(0)
+        self.set_running(True)
+
+        self.worker = StreamWorker(lambda: iter_dea_analysis(df, dmu_column_dea, inputs, outputs, cancel=token))
+        self.worker.result_ready.connect(self.on_result_ready)
+        self.worker.failed.connect(self.on_analysis_failed)
+        self.worker.finished.connect(self.on_analysis_finished)
+        self.worker.start()
+
+    def set_running(self, running):
+        self.run_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+        self.data_table.setEnabled(not running)
+
+    def cancel_analysis(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+
+    def on_result_ready(self, k, result):
+        self.stream_results[k] = result
+        row_items = [
+            create_text_item('-'),
+            create_text_item(result['dmu']),
+            create_score_item(result, 'efficiency')
+        ]
+        for inp in self.selected_inputs:
+            row_items.append(create_slack_item(result['slacks'].get(inp, 0)))
+        row_items.append(create_text_item(result['peers']))
+        self.results_table.model().appendRow(row_items)
+        self.progress_bar.setValue(len(self.stream_results))
+
+    def on_analysis_failed(self, message):
+        QMessageBox.critical(self, "خطا در تحلیل", f"یک خطای پیش‌بینی نشده رخ داد:\n{message}")
+
+    def on_analysis_finished(self):
+        self.set_running(False)
+        self.results_table.setSortingEnabled(True)
+        if len(self.stream_results) < len(self.dea_df):
+            # Cancelled or failed: the partial table stays, but nothing is passed on
+            return
+        self.result_groups = None
+        self.show_results([self.stream_results[k] for k in sorted(self.stream_results)])
 
+    def compute_results(self, incremental=False, cluster_info_df=None):
         try:
             QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
             dmu_column_dea = self.dea_df.columns[0]
-            results = run_dea_analysis(self.dea_df, dmu_column_dea, self.selected_inputs, self.selected_outputs)
-            self.full_dea_results_df = pd.DataFrame(results)
-            
-            final_df, cluster_info_df = self.display_results()
-            
-            if final_df is not None:
-                self.analysis_completed.emit({
-                    "input_df": self.dea_df,
-                    "results_df": self.full_dea_results_df,
-                    "cluster_info": cluster_info_df
-                })
-            
+            if cluster_info_df is None:
+                cluster_info_df = self.cluster_labels()
+            groups = self.dea_groups(cluster_info_df)
+            results = run_dea_analysis(
+                self.dea_df, dmu_column_dea, self.selected_inputs, self.selected_outputs, incremental=incremental,
+                groups=groups
+            )
+            self.result_groups = groups
+            self.show_results(results, cluster_info_df)
         except Exception as e:
             traceback.print_exc()
             QMessageBox.critical(self, "خطا در تحلیل", f"یک خطای پیش‌بینی نشده رخ داد:\n{e}")
         finally:
             QApplication.restoreOverrideCursor()
 
-    def display_results(self):
+    def show_results(self, results, cluster_info_df=None):
+        self.full_dea_results_df = pd.DataFrame(results)
+
+        final_df, cluster_info_df = self.display_results(cluster_info_df)
+
+        if final_df is not None:
+            self.analysis_completed.emit({
+                "input_df": self.dea_df,
+                "results_df": self.full_dea_results_df,
+                "cluster_info": cluster_info_df
+            })
+
+    def cluster_labels(self):
+        """Labels of the selected clustering model (DMU, cluster, norm_dmu); empty when none is selected."""
+        selected_model_info = self.cluster_filter_combo.currentData()
+        if not (selected_model_info and self.clustering_data and 'dataframe' in self.clustering_data):
+            return pd.DataFrame()
+        clustering_df_original = self.clustering_data['dataframe']
+        clustering_dmu_col = clustering_df_original.columns[0]
+
+        labels = run_single_clustering_model(
+            clustering_df_original,
+            self.clustering_data['selected_features'],
+            selected_model_info['algorithm'],
+            selected_model_info['k']
+        )
+        labels = [l + 1 for l in labels]
+
+        cluster_info_df = pd.DataFrame({
+            clustering_dmu_col: clustering_df_original.iloc[:, 0],
+            'cluster': labels
+        })
+        cluster_info_df['norm_dmu'] = cluster_info_df[clustering_dmu_col].apply(normalize_dmu_name)
+        return cluster_info_df
+
+    def dea_groups(self, cluster_info_df=None):
+        """
+        Cluster of every row of the DEA data when per-cluster frontiers are on, else None.
+        cluster_info_df (from cluster_labels) saves running the clustering model again.
+        """
+        if not self.group_frontier_cb.isChecked():
+            return None
+        if cluster_info_df is None:
+            cluster_info_df = self.cluster_labels()
+        if cluster_info_df.empty:
+            return None
+        clusters = dict(zip(cluster_info_df['norm_dmu'], cluster_info_df['cluster']))
+        # DMUs missing from the clustering data form one group of their own
+        return [str(clusters.get(normalize_dmu_name(name), '-')) for name in self.dea_df.iloc[:, 0]]
+
+    def display_results(self, cluster_info_df=None):
         if self.full_dea_results_df is None: 
             return None, pd.DataFrame()
         
         final_df = self.full_dea_results_df.copy()
-        selected_model_info = self.cluster_filter_combo.currentData()
-        
-        cluster_info_df = pd.DataFrame()
-
-        def normalize_dmu_name(name):
-            if not isinstance(name, str): name = str(name)
-            name = name.replace("ي", "ی").replace("ك", "ک")
-            return "".join(name.split())
+        if cluster_info_df is None:
+            cluster_info_df = self.cluster_labels()
 
-        if selected_model_info and self.clustering_data and 'dataframe' in self.clustering_data:
-            clustering_df_original = self.clustering_data['dataframe']
-            clustering_dmu_col = clustering_df_original.columns[0]
-            
-            labels = run_single_clustering_model(
-                clustering_df_original, 
-                self.clustering_data['selected_features'], 
-                selected_model_info['algorithm'], 
-                selected_model_info['k']
-            )
-            labels = [l + 1 for l in labels]
-            
-            cluster_info_df = pd.DataFrame({
-                clustering_dmu_col: clustering_df_original.iloc[:, 0],
-                'cluster': labels
-            })
-            
+        if not cluster_info_df.empty:
             dea_dmu_col = 'dmu'
             final_df['norm_dmu'] = final_df[dea_dmu_col].apply(normalize_dmu_name)
-            cluster_info_df['norm_dmu'] = cluster_info_df[clustering_dmu_col].apply(normalize_dmu_name)
             
             final_df = pd.merge(final_df, cluster_info_df[['norm_dmu', 'cluster']], on='norm_dmu', how='left')
             final_df.drop(columns=['norm_dmu'], inplace=True)
@@ -329,10 +450,10 @@ class EfficiencyPage(BasePage):
             row_items = [
                 create_numeric_item(cluster_val, precision=0),
                 create_text_item(row['dmu']),
-                create_numeric_item(row.get('efficiency', 0), precision=2)
+                create_score_item(row, 'efficiency')
             ]
             for inp in self.selected_inputs:
-                row_items.append(create_numeric_item(row['slacks'].get(inp, 0)))
+                row_items.append(create_slack_item(row['slacks'].get(inp, 0)))
             row_items.append(create_text_item(row['peers']))
             
             if row_color:
@@ -347,7 +468,13 @@ class EfficiencyPage(BasePage):
         return final_df, cluster_info_df
 
     def filter_display(self):
-        self.display_results()
+        # The clustering model runs once; its labels serve both the groups and the table.
+        # Switching per-cluster frontiers (or the clusters they use) changes the scores themselves
+        cluster_info_df = self.cluster_labels()
+        if self.full_dea_results_df is not None and self.dea_groups(cluster_info_df) != self.result_groups:
+            self.compute_results(cluster_info_df=cluster_info_df)
+        else:
+            self.display_results(cluster_info_df)
 
     def load_dea_data(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "انتخاب فایل داده بهره‌وری", "", "Excel Files (*.xlsx *.xls)")
@@ -356,6 +483,7 @@ class EfficiencyPage(BasePage):
             self.dea_df = pd.read_excel(file_path)
             self.file_path_label.setText(file_path.split('/')[-1])
             self.populate_io_lists()
+            self.populate_data_table()
             self.run_button.setEnabled(True)
         except Exception as e:
             QMessageBox.critical(self, "خطا در خواندن فایل", f"فایل اکسل قابل پردازش نیست:\n{e}")
@@ -368,4 +496,37 @@ class EfficiencyPage(BasePage):
             self.inputs_list.addItem(QListWidgetItem(col)); self.outputs_list.addItem(QListWidgetItem(col))
         
         self.update_inputs_checkbox_state()
-        self.update_outputs_checkbox_state()
\ No newline at end of file
+        self.update_outputs_checkbox_state()
+
+    def populate_data_table(self):
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels([str(col) for col in self.dea_df.columns])
+        for _, row in self.dea_df.iterrows():
+            row_items = [create_text_item(row.iloc[0])]
+            for value in row.iloc[1:]:
+                item = QStandardItem(str(value))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                row_items.append(item)
+            model.appendRow(row_items)
+        model.itemChanged.connect(self.on_data_edited)
+        self.data_table.setModel(model)
+        self.data_table.resizeColumnsToContents()
+
+    def on_data_edited(self, item):
+        row, col = item.row(), item.column()
+        column = self.dea_df.columns[col]
+        try:
+            value = float(item.text())
+        except ValueError:
+            QMessageBox.warning(self, "مقدار نامعتبر", "لطفاً یک مقدار عددی وارد کنید.")
+            item.model().blockSignals(True)
+            item.setText(str(self.dea_df.iat[row, col]))
+            item.model().blockSignals(False)
+            return
+
+        if not pd.api.types.is_float_dtype(self.dea_df[column]):
+            self.dea_df[column] = pd.to_numeric(self.dea_df[column], errors="coerce").astype(float)
+        self.dea_df.iat[row, col] = value
+        # Only the DMUs affected by the edit are re-solved
+        if self.full_dea_results_df is not None and column in self.selected_inputs + self.selected_outputs:
+            self.compute_results(incremental=True)
@@ -1,16 +1,15 @@
 # ===== SECTION BEING MODIFIED: app/pages/hr_efficiency_page.py =====
 # ===== IMPORTS & DEPENDENCIES =====
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QTableView,
-    QMessageBox, QGroupBox, QListWidget, QListWidgetItem, QSplitter, QCheckBox
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QTableView,
+    QMessageBox, QGroupBox, QListWidget, QListWidgetItem, QSplitter, QCheckBox, QProgressBar
 )
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtGui import QStandardItemModel
 import pandas as pd
-import traceback
-from ..logic.dea_analysis import run_hr_dea_analysis
+from ..logic.dea_analysis import iter_hr_dea_analysis, RunReport, CancellationToken
 # --- MODIFIED: Import BasePage ---
-from .utils import create_numeric_item, create_text_item, save_table_to_excel, BasePage
+from .utils import create_score_item, create_text_item, save_table_to_excel, BasePage, StreamWorker
 
 
 # ===== UI & APPLICATION LOGIC =====
@@ -23,6 +22,10 @@ class HrEfficiencyPage(BasePage):
         super().__init__()
         self.df = None
         self.is_fullscreen = False
+        self.worker = None
+        self.cancel_token = None
+        self.report = None
+        self.stream_results = {}
         self.initUI()
         
     def initUI(self):
@@ -97,7 +100,13 @@ class HrEfficiencyPage(BasePage):
         run_layout = QVBoxLayout()
         self.run_button = QPushButton("محاسبه بهره‌وری پرسنل")
         self.run_button.setEnabled(False)
+        self.cancel_button = QPushButton("توقف محاسبه")
+        self.cancel_button.setEnabled(False)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
         run_layout.addWidget(self.run_button)
+        run_layout.addWidget(self.cancel_button)
+        run_layout.addWidget(self.progress_bar)
         self.run_group.setLayout(run_layout)
         
         self.middle_splitter.addWidget(self.run_group)
@@ -130,6 +139,7 @@ class HrEfficiencyPage(BasePage):
         self.upload_button.clicked.connect(self.load_data)
         self.download_button.clicked.connect(self.download_template)
         self.run_button.clicked.connect(self.run_analysis)
+        self.cancel_button.clicked.connect(self.cancel_analysis)
         self.inputs_select_all_cb.stateChanged.connect(self.toggle_select_all_inputs)
         self.outputs_select_all_cb.stateChanged.connect(self.toggle_select_all_outputs)
         self.inputs_list.itemSelectionChanged.connect(self.update_inputs_checkbox_state)
@@ -224,26 +234,73 @@ class HrEfficiencyPage(BasePage):
             QMessageBox.warning(self, "شاخص انتخاب نشده", "لطفاً شاخص‌های ورودی و خروجی را انتخاب کنید.")
             return
 
-        try:
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            dmu_column = self.df.columns[0]
-            results_list = run_hr_dea_analysis(self.df, dmu_column, selected_inputs, selected_outputs)
-            
-            results_df = pd.DataFrame(results_list)
-            self.display_results(results_list, self.df)
-            
-            # Emit signal with BOTH original data and results for the Resource Allocation page
-            self.analysis_completed.emit({
-                'original_df': self.df,
-                'results_df': results_df,
-                'results_list': results_list
-            })
-            
-        except Exception as e:
-            traceback.print_exc()
-            QMessageBox.critical(self, "خطا در تحلیل", f"یک خطای پیش‌بینی نشده رخ داد:\n{e}")
-        finally:
-            QApplication.restoreOverrideCursor()
+        # Scores stream in from a worker thread; the table fills as DMUs are solved
+        df = self.df.copy()
+        dmu_column = df.columns[0]
+        self.cancel_token = token = CancellationToken()
+        self.report = report = RunReport()
+        self.stream_results = {}
+
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(["DMU (از فایل)", "امتیاز بهره‌وری (BCC)"])
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setModel(model)
+        self.progress_bar.setRange(0, len(df))
+        self.progress_bar.setValue(0)
+        self.set_running(True)
+
+        self.worker = StreamWorker(
+            lambda: iter_hr_dea_analysis(df, dmu_column, selected_inputs, selected_outputs, report=report, cancel=token)
+        )
+        self.worker.result_ready.connect(self.on_result_ready)
+        self.worker.failed.connect(self.on_analysis_failed)
+        self.worker.finished.connect(self.on_analysis_finished)
+        self.worker.start()
+
+    def set_running(self, running):
+        self.run_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def cancel_analysis(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+
+    def on_result_ready(self, k, result):
+        self.stream_results[k] = result
+        self.results_table.model().appendRow([
+            create_text_item(result['dmu']),
+            create_score_item(result, 'score')
+        ])
+        self.progress_bar.setValue(len(self.stream_results))
+
+    def on_analysis_failed(self, message):
+        QMessageBox.critical(self, "خطا در تحلیل", f"یک خطای پیش‌بینی نشده رخ داد:\n{message}")
+
+    def on_analysis_finished(self):
+        self.set_running(False)
+        self.results_table.setSortingEnabled(True)
+        if len(self.stream_results) < len(self.df):
+            # Cancelled or failed: the partial scores stay, but nothing is passed on
+            return
+
+        results_list = [self.stream_results[k] for k in sorted(self.stream_results)]
+        results_df = pd.DataFrame(results_list)
+        self.display_results(results_list, self.df)
+
+        # Emit signal with BOTH original data and results for the Resource Allocation page
+        self.analysis_completed.emit({
+            'original_df': self.df,
+            'results_df': results_df,
+            'results_list': results_list
+        })
+
+        failed = self.report.failed()
+        if len(failed):
+            names = "، ".join(str(name) for name in failed['dmu'].head(10))
+            QMessageBox.warning(
+                self, "حل ناموفق",
+                f"مدل برای {len(failed)} واحد به جواب بهینه نرسید و برای آن‌ها امتیازی درج نشد:\n{names}"
+            )
 
     def display_results(self, results_list, original_df):
         results_df = pd.DataFrame(results_list)
@@ -272,7 +329,7 @@ class HrEfficiencyPage(BasePage):
             if name_col: row_items.append(create_text_item(row.get(name_col, '')))
             row_items.extend([
                 create_text_item(row['dmu']),
-                create_numeric_item(row.get('score', 0), precision=2)
+                create_score_item(row, 'score')
             ])
             model.appendRow(row_items)
         
@@ -1,17 +1,16 @@
 # ===== SECTION BEING MODIFIED: app/pages/ranking_page.py =====
 #===== IMPORTS & DEPENDENCIES =====
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QTableView,
-    QMessageBox, QGroupBox, QListWidget, QListWidgetItem, QSplitter, QCheckBox
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QTableView,
+    QMessageBox, QGroupBox, QListWidget, QListWidgetItem, QSplitter, QCheckBox, QProgressBar
 )
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtGui import QStandardItemModel
 import pandas as pd
-import traceback
 
-from ..logic.dea_analysis import run_ranking_dea
+from ..logic.dea_analysis import iter_ranking_dea, CancellationToken
 # --- MODIFIED: Import BasePage ---
-from .utils import create_numeric_item, create_text_item, save_table_to_excel, BasePage
+from .utils import create_numeric_item, create_score_item, create_text_item, save_table_to_excel, BasePage, StreamWorker
 
 #===== UI & APPLICATION LOGIC =====
 # --- MODIFIED: Inherit from BasePage ---
@@ -20,6 +19,9 @@ class RankingPage(BasePage):
         super().__init__()
         self.df = None
         self.is_fullscreen = False
+        self.worker = None
+        self.cancel_token = None
+        self.stream_results = {}
         self.initUI()
         
     def initUI(self):
@@ -95,7 +97,13 @@ class RankingPage(BasePage):
         run_layout = QVBoxLayout()
         self.run_button = QPushButton("محاسبه رتبه‌بندی")
         self.run_button.setEnabled(False)
+        self.cancel_button = QPushButton("توقف محاسبه")
+        self.cancel_button.setEnabled(False)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
         run_layout.addWidget(self.run_button)
+        run_layout.addWidget(self.cancel_button)
+        run_layout.addWidget(self.progress_bar)
         self.run_group.setLayout(run_layout)
         
         self.middle_splitter.addWidget(self.run_group)
@@ -128,6 +136,7 @@ class RankingPage(BasePage):
         self.upload_button.clicked.connect(self.load_data)
         self.download_button.clicked.connect(self.download_template)
         self.run_button.clicked.connect(self.run_analysis)
+        self.cancel_button.clicked.connect(self.cancel_analysis)
         self.inputs_select_all_cb.stateChanged.connect(self.toggle_select_all_inputs)
         self.outputs_select_all_cb.stateChanged.connect(self.toggle_select_all_outputs)
         self.inputs_list.itemSelectionChanged.connect(self.update_inputs_checkbox_state)
@@ -217,28 +226,71 @@ class RankingPage(BasePage):
             QMessageBox.warning(self, "شاخص انتخاب نشده", "لطفاً شاخص‌های ورودی و خروجی را انتخاب کنید.")
             return
 
-        try:
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            dmu_column = self.df.columns[0]
-            results = run_ranking_dea(self.df, dmu_column, selected_inputs, selected_outputs)
-            self.display_results(results)
-        except Exception as e:
-            traceback.print_exc()
-            QMessageBox.critical(self, "خطا در تحلیل", f"یک خطای پیش‌بینی نشده رخ داد:\n{e}")
-        finally:
-            QApplication.restoreOverrideCursor()
+        # Scores stream in from a worker thread; ranks are assigned once all are known
+        df = self.df.copy()
+        dmu_column = df.columns[0]
+        self.cancel_token = token = CancellationToken()
+        self.stream_results = {}
+
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(["رتبه", "واحد تصمیم‌گیرنده (DMU)", "امتیاز ابرکارایی"])
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setModel(model)
+        self.progress_bar.setRange(0, len(df))
+        self.progress_bar.setValue(0)
+        self.set_running(True)
+
+        self.worker = StreamWorker(
+            lambda: iter_ranking_dea(df, dmu_column, selected_inputs, selected_outputs, cancel=token)
+        )
+        self.worker.result_ready.connect(self.on_result_ready)
+        self.worker.failed.connect(self.on_analysis_failed)
+        self.worker.finished.connect(self.on_analysis_finished)
+        self.worker.start()
+
+    def set_running(self, running):
+        self.run_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def cancel_analysis(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+
+    def on_result_ready(self, k, result):
+        self.stream_results[k] = result
+        self.results_table.model().appendRow([
+            create_text_item('-'),
+            create_text_item(result['dmu']),
+            create_score_item(result, 'score')
+        ])
+        self.progress_bar.setValue(len(self.stream_results))
+
+    def on_analysis_failed(self, message):
+        QMessageBox.critical(self, "خطا در تحلیل", f"یک خطای پیش‌بینی نشده رخ داد:\n{message}")
+
+    def on_analysis_finished(self):
+        self.set_running(False)
+        self.results_table.setSortingEnabled(True)
+        if len(self.stream_results) < len(self.df):
+            # Cancelled or failed: the partial scores stay, without ranks
+            return
+        self.display_results([self.stream_results[k] for k in sorted(self.stream_results)])
 
     def display_results(self, results):
         model = QStandardItemModel()
         model.setHorizontalHeaderLabels(["رتبه", "واحد تصمیم‌گیرنده (DMU)", "امتیاز ابرکارایی"])
 
-        sorted_results = sorted(results, key=lambda x: x.get('score', 0) or 0, reverse=True)
+        # DMUs without a score are listed last, without a rank
+        scored = [res for res in results if res.get('score') is not None]
+        sorted_results = sorted(scored, key=lambda x: x['score'], reverse=True)
+        sorted_results += [res for res in results if res.get('score') is None]
 
         for i, res in enumerate(sorted_results):
+            rank = create_numeric_item(i + 1, precision=0) if i < len(scored) else create_text_item('-')
             row = [
-                create_numeric_item(i + 1, precision=0),
+                rank,
                 create_text_item(res['dmu']),
-                create_numeric_item(res.get('score', 0), precision=2)
+                create_score_item(res, 'score')
             ]
             model.appendRow(row)
         
@@ -8,7 +8,7 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QStandardItemModel
 import pandas as pd
 # --- MODIFIED: Import BasePage ---
-from .utils import create_numeric_item, create_text_item, save_table_to_excel, BasePage
+from .utils import create_numeric_item, create_score_item, create_text_item, save_table_to_excel, BasePage
 
 # ===== UI & APPLICATION LOGIC =====
 # --- MODIFIED: Inherit from BasePage ---
@@ -164,17 +164,20 @@ class ResourceAllocationPage(BasePage):
         # Merge score into input_df for easier row iteration
         # We need to map dmu names correctly
         if 'dmu' in results_df.columns:
-            score_map = dict(zip(results_df['dmu'], results_df['score']))
+            result_map = {result['dmu']: result for result in results_df.to_dict('records')}
         else:
-            score_map = {}
+            result_map = {}
             
         for idx, row in input_df.iterrows():
             dmu_val = row[dmu_col_name]
-            score = score_map.get(dmu_val, 0)
+            result = result_map.get(dmu_val, {'score': 0})
+            score = result.get('score')
+            # Unresolved or failed DMUs have no score, so no target either
+            has_score = score is not None and not pd.isna(score)
             
             row_items = [
                 create_text_item(dmu_val),
-                create_numeric_item(score, precision=2)
+                create_score_item(result, 'score')
             ]
             
             for col in relevant_inputs:
@@ -191,6 +194,9 @@ class ResourceAllocationPage(BasePage):
                 # Target input = Theta * Input - Slack. 
                 # If we don't have explicit slacks from HR solver, we approximate: Target ~ Score * Input
                 
+                if not has_score:
+                    row_items.extend([create_numeric_item(current_val, 0), create_text_item('-'), create_text_item('-')])
+                    continue
                 target_val = current_val * score
                 gap = current_val - target_val # "Slack" or "Surplus"
                 
@@ -4,8 +4,9 @@ from PyQt6.QtGui import QStandardItem, QColor
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 import pandas as pd
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton
-from PyQt6.QtCore import pyqtSignal, Qt, QSize
+from PyQt6.QtCore import pyqtSignal, Qt, QSize, QThread
 from PyQt6.QtGui import QIcon
+import traceback
 
 CLUSTER_COLORS = [
     "#E6F7FF", "#F6FFED", "#FFFBE6", "#FFF1F0", "#F9F0FF",
@@ -37,6 +38,22 @@ def create_numeric_item(value, precision=2):
     item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
     return item
 
+SCORE_STATUS_LABELS = {"unresolved": "حل‌نشده", "infeasible": "نشدنی"}
+
+def create_score_item(result, key, precision=2):
+    # DMUs without a score (no answer in time, infeasible or failed LP) are labelled
+    # instead of shown as a number
+    value = result.get(key)
+    if result.get('status') == 'unresolved' or value is None or pd.isna(value):
+        return create_text_item(SCORE_STATUS_LABELS.get(result.get('status'), "ناموفق"))
+    return create_numeric_item(value, precision=precision)
+
+def create_slack_item(value, precision=2):
+    # A DMU without a score has no slacks either (None), shown as '-'
+    if value is None or pd.isna(value):
+        return create_text_item('-')
+    return create_numeric_item(value, precision=precision)
+
 def create_text_item(text):
     item = QStandardItem(str(text))
     item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -81,6 +98,28 @@ def save_table_to_excel(parent, table_view, default_name="results.xlsx"):
     except Exception as e:
         QMessageBox.critical(parent, "خطا", f"خطا در ذخیره فایل اکسل:\n{e}")
 
+# ===== BACKGROUND ANALYSIS =====
+class StreamWorker(QThread):
+    """
+    Runs a streaming DEA generator (the iter_* functions of dea_analysis) off the GUI
+    thread and emits every (k, result) pair it yields. stream_factory is called inside
+    the thread, so data errors also arrive through the failed signal.
+    """
+    result_ready = pyqtSignal(int, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, stream_factory, parent=None):
+        super().__init__(parent)
+        self.stream_factory = stream_factory
+
+    def run(self):
+        try:
+            for k, result in self.stream_factory():
+                self.result_ready.emit(int(k), result)
+        except Exception as e:
+            traceback.print_exc()
+            self.failed.emit(str(e))
+
 # ===== BASE PAGE CLASS =====
 class BasePage(QWidget):
     """
@@ -0,0 +1,198 @@
+# ===== IMPORTS & DEPENDENCIES =====
+"""
+Benchmark of the DEA entry points on reproducible synthetic data.
+
+    python benchmarks/dea_benchmark.py --sizes 100,1000,10000,50000 --output results.json
+    python benchmarks/dea_benchmark.py --compare old.json --output new.json
+
+Every (entry point, backend, size) case runs in a fresh process, with the on-disk cache and
+the session store disabled, so wall time and peak memory are not shared between cases.
+Wall time comes from an untraced run; peak_python_bytes from a second run under tracemalloc,
+which does not see the solvers' native allocations. peak_rss_bytes is the case process
+itself, peak_rss_children_bytes the largest pool worker (n_jobs > 1).
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.logic import dea_analysis  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+# ===== CONFIGURATION =====
+ENTRY_POINTS = {
+    "sbm": dea_analysis.run_dea_analysis,
+    "ranking": dea_analysis.run_ranking_dea,
+    "hr": dea_analysis.run_hr_dea_analysis,
+}
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+# CBC starts an external process per LP; larger sizes take hours
+DEFAULT_CBC_MAX_K = 1000
+
+
+# ===== CORE BUSINESS LOGIC =====
+def make_dataset(K: int, m: int = 3, n: int = 2, frontier_density: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic DMU table with K rows, m inputs and n outputs. Frontier units produce
+    prod(x ** (0.8 / m)) split over the outputs; the others (a 1 - frontier_density share)
+    use their inputs inflated by a factor 1 / u, u ~ U(0.3, 1). Same arguments, same table.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(10, 100, (K, m))
+    mix = rng.dirichlet(np.ones(n), K)
+    Y = np.prod(X ** (0.8 / m), axis=1)[:, None] * mix * n
+    efficiency = np.where(rng.random(K) < frontier_density, 1.0, rng.uniform(0.3, 1.0, K))
+    X = X / efficiency[:, None]
+    df = pd.DataFrame(np.hstack([X, Y]), columns=[f"x{i + 1}" for i in range(m)] + [f"y{r + 1}" for r in range(n)])
+    df.insert(0, "DMU", [f"DMU_{k + 1}" for k in range(K)])
+    return df
+
+
+def run_case(entry_point: str, solver: str, K: int, m: int, n: int, frontier_density: float, seed: int, n_jobs: int):
+    """Run one benchmark case (in a worker process) and return its measurements."""
+    df = make_dataset(K, m, n, frontier_density, seed)
+    inputs = [f"x{i + 1}" for i in range(m)]
+    outputs = [f"y{r + 1}" for r in range(n)]
+    def run(report=None):
+        dea_analysis.clear_result_store()
+        ENTRY_POINTS[entry_point](
+            df, "DMU", inputs, outputs, solver=solver, n_jobs=n_jobs, use_cache=False, report=report
+        )
+
+    # Timed run without tracemalloc, which slows Python-heavy code several times over
+    report = dea_analysis.RunReport()
+    start = time.perf_counter()
+    run(report)
+    wall = time.perf_counter() - start
+    # DMU LPs the run actually solved (duplicates share one; frontier-detection LPs are not recorded)
+    lps = len(report.records)
+    peak_rss = peak_rss_children = None
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        unit = 1 if sys.platform == "darwin" else 1024
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+        peak_rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+
+    # Separate run for the peak of Python allocations
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "entry_point": entry_point, "solver": solver, "K": K, "m": m, "n": n,
+        "frontier_density": frontier_density, "seed": seed, "n_jobs": n_jobs,
+        "wall_time": wall, "lps": lps, "lps_per_sec": lps / wall if wall > 0 else None,
+        "peak_python_bytes": peak, "peak_rss_bytes": peak_rss, "peak_rss_children_bytes": peak_rss_children,
+    }
+
+
+def _app_version():
+    # Read from main.py without importing the Qt application
+    with open(os.path.join(ROOT, "main.py"), encoding="utf-8") as f:
+        match = re.search(r'__version__\s*=\s*"([^"]+)"', f.read())
+    return match.group(1) if match else None
+
+
+def _environment():
+    highspy = dea_analysis.highspy
+    return {
+        "app_version": _app_version(), "python": platform.python_version(), "platform": platform.platform(),
+        "numpy": np.__version__, "pandas": pd.__version__,
+        "highspy": getattr(highspy, "__version__", "installed") if highspy is not None else None,
+        "cpu_count": os.cpu_count(), "timestamp": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def _case_key(record: dict):
+    return (record["entry_point"], record["solver"], record["K"], record["m"], record["n"],
+            record["frontier_density"], record["n_jobs"])
+
+
+def compare(previous: dict, current: dict):
+    """Print the wall-time ratio current / previous of every case present in both runs."""
+    old = {_case_key(r): r for r in previous["results"]}
+    print(f"\nComparison with {previous['environment'].get('app_version')} ({previous['environment'].get('timestamp')}):")
+    for record in current["results"]:
+        before = old.get(_case_key(record))
+        if before is None:
+            continue
+        ratio = record["wall_time"] / before["wall_time"]
+        flag = "  SLOWER" if ratio > 1.2 else ""
+        print(f"  {record['entry_point']:8s} {record['solver']:5s} K={record['K']:<6d} "
+              f"{before['wall_time']:9.3f}s -> {record['wall_time']:9.3f}s  x{ratio:.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DEA entry points on synthetic data.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated K values")
+    parser.add_argument("--entry-points", default=",".join(ENTRY_POINTS), help="subset of sbm,ranking,hr")
+    parser.add_argument("--solvers", default=",".join(dea_analysis.SOLVER_BACKENDS), help="subset of highs,cbc")
+    parser.add_argument("--cbc-max-k", type=int, default=DEFAULT_CBC_MAX_K, help="skip CBC above this K")
+    parser.add_argument("--inputs", type=int, default=3, help="number of inputs m")
+    parser.add_argument("--outputs", type=int, default=2, help="number of outputs n")
+    parser.add_argument("--frontier-density", type=float, default=0.1, help="share of DMUs on the frontier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-jobs", type=int, default=None, help="passed to the entry points")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is kept")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    parser.add_argument("--compare", default=None, help="earlier JSON results file to compare against")
+    args = parser.parse_args(argv)
+
+    sizes = [int(k) for k in args.sizes.split(",")]
+    entry_points = args.entry_points.split(",")
+    solvers = args.solvers.split(",")
+    output = args.output or f"dea-benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+
+    records = []
+    print(f"{'entry':8s} {'solver':5s} {'K':>6s} {'wall [s]':>10s} {'LPs/s':>10s} {'peak py [MB]':>13s} "
+          f"{'peak RSS [MB]':>14s} {'workers [MB]':>13s}")
+    for K in sizes:
+        for entry_point in entry_points:
+            for solver in solvers:
+                if solver == "cbc" and K > args.cbc_max_k:
+                    continue
+                runs = []
+                for _ in range(args.repeat):
+                    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                        runs.append(pool.submit(
+                            run_case, entry_point, solver, K, args.inputs, args.outputs,
+                            args.frontier_density, args.seed, args.n_jobs,
+                        ).result())
+                record = min(runs, key=lambda r: r["wall_time"])
+                records.append(record)
+                rss, workers = (
+                    "-" if record[name] is None else f"{record[name] / 2 ** 20:.1f}"
+                    for name in ("peak_rss_bytes", "peak_rss_children_bytes")
+                )
+                print(f"{entry_point:8s} {solver:5s} {K:6d} {record['wall_time']:10.3f} "
+                      f"{record['lps_per_sec']:10.1f} {record['peak_python_bytes'] / 2 ** 20:13.1f} {rss:>14s} "
+                      f"{workers:>13s}")
+
+    report = {"environment": _environment(), "results": records}
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
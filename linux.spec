@@ -18,7 +18,7 @@ a = Analysis(
     # Use the dynamically generated relative path. This is robust and portable.
     datas=[(pulp_relative_path, 'pulp')],
     
-    hiddenimports=['pulp', 'pulp.apis'],
+    hiddenimports=['pulp', 'pulp.apis', 'highspy'],
     hookspath=[],
     # The runtime hook is still essential for setting execute permissions.
     runtime_hooks=['hook-pulp.py'],
@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
 from app.main_window import MainWindow
@@ -6,6 +7,9 @@ from app.main_window import MainWindow
 __version__ = "0.13.0"
 
 if __name__ == "__main__":
+    # Required for the DEA process pool in PyInstaller builds
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
 
     # Set Right-to-Left layout for Persian UI
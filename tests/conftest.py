@@ -0,0 +1,15 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import pytest
+
+from app.logic import dea_analysis
+
+
+# ===== FIXTURES =====
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Every test gets an empty on-disk cache and an empty in-session result store."""
+    monkeypatch.setenv("OPTIWISE_CACHE_DIR", str(tmp_path / "cache"))
+    dea_analysis.clear_result_store()
+    yield
+    dea_analysis.clear_result_store()
+
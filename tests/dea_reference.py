@@ -0,0 +1,106 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+
+
+# ===== TEST DATA =====
+def make_frame(X: np.ndarray, Y: np.ndarray) -> tuple:
+    """DataFrame with a DMU column plus the input and output column names."""
+    inputs = [f"x{i}" for i in range(X.shape[1])]
+    outputs = [f"y{r}" for r in range(Y.shape[1])]
+    df = pd.DataFrame(np.hstack([X, Y]), columns=inputs + outputs)
+    df.insert(0, "DMU", [f"d{k}" for k in range(len(df))])
+    return df, inputs, outputs
+
+
+def scores_of(results: list, key: str) -> np.ndarray:
+    """Scores of a list of result dicts, NaN where a DMU has no score."""
+    return np.array([np.nan if r[key] is None else r[key] for r in results], dtype=float)
+
+
+# ===== REFERENCE LPs =====
+# Dense textbook LPs on the raw data: no presolve, every DMU in the reference set
+def bcc_theta(X: np.ndarray, Y: np.ndarray, k: int) -> float:
+    """Input-oriented BCC envelopment LP: min theta over [theta, lambda]."""
+    K = X.shape[0]
+    A_ub = np.vstack([np.hstack([-X[k][:, None], X.T]), np.hstack([np.zeros((Y.shape[1], 1)), -Y.T])])
+    b_ub = np.r_[np.zeros(X.shape[1]), -Y[k]]
+    r = linprog(np.r_[1.0, np.zeros(K)], A_ub=A_ub, b_ub=b_ub, A_eq=np.r_[0.0, np.ones(K)][None], b_eq=[1.0],
+                method="highs")
+    return r.fun if r.status == 0 else np.nan
+
+
+def theta_against(X_ref: np.ndarray, Y_ref: np.ndarray, x0: np.ndarray, y0: np.ndarray,
+                  returns_to_scale: str = "crs") -> float:
+    """Input-oriented theta of the point (x0, y0) against the 'crs', 'nirs' or 'vrs' hull of (X_ref, Y_ref)."""
+    K = X_ref.shape[0]
+    A_ub = np.vstack([np.hstack([-x0[:, None], X_ref.T]), np.hstack([np.zeros((Y_ref.shape[1], 1)), -Y_ref.T])])
+    b_ub = np.r_[np.zeros(X_ref.shape[1]), -y0]
+    convexity = np.r_[0.0, np.ones(K)][None]
+    if returns_to_scale == "nirs":
+        A_ub, b_ub = np.vstack([A_ub, convexity]), np.r_[b_ub, 1.0]
+    equality = {"A_eq": convexity, "b_eq": [1.0]} if returns_to_scale == "vrs" else {}
+    r = linprog(np.r_[1.0, np.zeros(K)], A_ub=A_ub, b_ub=b_ub, bounds=[(None, None)] + [(0, None)] * K,
+                method="highs", **equality)
+    return r.fun if r.status == 0 else np.nan
+
+
+def sbm_score(X: np.ndarray, Y: np.ndarray, k: int) -> float:
+    """Input-oriented SBM-VRS LP: min 1 - mean(s / x0) over [lambda, s]; a zero input adds no term."""
+    K, m = X.shape
+    weights = np.where(X[k] > 0, 1.0 / (m * np.where(X[k] > 0, X[k], 1.0)), 0.0)
+    A_eq = np.vstack([np.hstack([X.T, np.eye(m)]), np.r_[np.ones(K), np.zeros(m)][None]])
+    A_ub = np.hstack([-Y.T, np.zeros((Y.shape[1], m))])
+    r = linprog(np.r_[np.zeros(K), -weights], A_ub=A_ub, b_ub=-Y[k], A_eq=A_eq, b_eq=np.r_[X[k], 1.0],
+                method="highs")
+    return 1.0 + r.fun if r.status == 0 else np.nan
+
+
+def super_sbm_score(X: np.ndarray, Y: np.ndarray, k: int) -> float:
+    """Tone's input-oriented super-SBM-VRS LP of DMU k against the other DMUs; NaN when infeasible."""
+    K, m = X.shape
+    others = np.delete(np.arange(K), k)
+    weights = np.where(X[k] > 0, 1.0 / (m * np.where(X[k] > 0, X[k], 1.0)), 0.0)
+    A_ub = np.vstack([np.hstack([X[others].T, -np.eye(m)]), np.hstack([-Y[others].T, np.zeros((Y.shape[1], m))])])
+    r = linprog(np.r_[np.zeros(K - 1), weights], A_ub=A_ub, b_ub=np.r_[X[k], -Y[k]],
+                A_eq=np.r_[np.ones(K - 1), np.zeros(m)][None], b_eq=[1.0], method="highs")
+    return 1.0 + r.fun if r.status == 0 else np.nan
+
+
+def ranking_scores(X: np.ndarray, Y: np.ndarray, tol: float = 1e-6) -> np.ndarray:
+    """SBM score of every DMU, replaced by the super-SBM score for the efficient ones."""
+    scores = np.array([sbm_score(X, Y, k) for k in range(X.shape[0])])
+    return np.array([super_sbm_score(X, Y, k) if s >= 1 - tol else s for k, s in enumerate(scores)])
+
+
+
+def cross_efficiency_scores(X: np.ndarray, Y: np.ndarray, goal: str = "aggressive") -> np.ndarray:
+    """
+    Doyle and Green mean cross-efficiency: every DMU d keeps its CCR score with weights
+    [v, u] that minimise ('aggressive') or maximise the others' aggregate output u.(sum(Y) - y_d),
+    with v.(sum(X) - x_d) = 1; DMU j's score is the mean of u_d.y_j / v_d.x_j over d != j.
+    """
+    K, m = X.shape
+    sign = 1.0 if goal == "aggressive" else -1.0
+    E = np.zeros((K, K))
+    for d in range(K):
+        theta = theta_against(X, Y, X[d], Y[d], "crs")
+        A_eq = np.vstack([np.r_[X.sum(axis=0) - X[d], np.zeros(Y.shape[1])], np.r_[-theta * X[d], Y[d]]])
+        r = linprog(sign * np.r_[np.zeros(m), Y.sum(axis=0) - Y[d]], A_ub=np.hstack([-X, Y]), b_ub=np.zeros(K),
+                    A_eq=A_eq, b_eq=[1.0, 0.0], method="highs")
+        v, u = r.x[:m], r.x[m:]
+        E[d] = (Y @ u) / (X @ v)
+    np.fill_diagonal(E, np.nan)
+    return np.nanmean(E, axis=0)
+
+# ===== REFERENCE ENUMERATIONS =====
+def fdh_theta(X: np.ndarray, Y: np.ndarray, k: int) -> float:
+    """Input-oriented FDH score by enumeration: the best single peer producing at least Y[k]."""
+    best = np.inf
+    for j in range(X.shape[0]):
+        if (Y[j] >= Y[k]).all():
+            ratios = [X[j, i] / X[k, i] if X[k, i] > 0 else (0.0 if X[j, i] == 0 else np.inf)
+                      for i in range(X.shape[1])]
+            best = min(best, max(ratios))
+    return best
@@ -0,0 +1,48 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic import dea_analysis
+from app.logic.dea_analysis import run_dea_analysis, run_hr_dea_analysis
+from dea_reference import bcc_theta, make_frame, scores_of
+
+
+# ===== TEST DATA =====
+def _data():
+    rng = np.random.default_rng(21)
+    return rng.uniform(1, 10, (25, 2)), rng.uniform(1, 10, (25, 2))
+
+
+ENTRY_POINTS = {"bcc": (run_hr_dea_analysis, "score"), "sbm": (run_dea_analysis, "efficiency")}
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("model", ENTRY_POINTS)
+def test_bootstrap_does_not_depend_on_n_jobs(model):
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    run, _ = ENTRY_POINTS[model]
+    # 20 replicates are three blocks, spread over two workers
+    runs = []
+    for n_jobs in (1, 2):
+        dea_analysis.clear_result_store()
+        results = run(df, "DMU", inputs, outputs, n_jobs=n_jobs, use_cache=False, bootstrap=20, seed=7)
+        runs.append(np.array([scores_of(results, name) for name in ("bias_corrected", "ci_lower", "ci_upper")]))
+    # Same draws; the LPs only differ in warm starts, hence in round-off
+    np.testing.assert_allclose(runs[0], runs[1], rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("model", ENTRY_POINTS)
+def test_bootstrap_intervals_are_ordered_below_one(model):
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    run, key = ENTRY_POINTS[model]
+    results = run(df, "DMU", inputs, outputs, use_cache=False, bootstrap=40, seed=3)
+    lower, upper = scores_of(results, "ci_lower"), scores_of(results, "ci_upper")
+    corrected = scores_of(results, "bias_corrected")
+    assert not np.isnan(lower).any()
+    assert (lower <= corrected + 1e-12).all() and (corrected <= upper + 1e-12).all()
+    assert (upper <= 1 + 1e-12).all()
+    if model == "bcc":
+        # The interval is built around the estimate of the reference LP
+        assert scores_of(results, key) == pytest.approx([bcc_theta(X, Y, k) for k in range(len(X))], abs=1e-6)
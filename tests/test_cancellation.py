@@ -0,0 +1,49 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import os
+
+import numpy as np
+import pytest
+
+from app.logic import dea_analysis, dea_cache
+from app.logic.dea_analysis import (
+    CancellationToken, RunReport, iter_dea_analysis, iter_hr_dea_analysis, iter_ranking_dea, run_ranking_dea,
+)
+from dea_reference import make_frame
+
+
+# ===== TEST DATA =====
+def _frame():
+    rng = np.random.default_rng(13)
+    return make_frame(rng.uniform(1, 10, (30, 2)), rng.uniform(1, 10, (30, 2)))
+
+
+def _cached_entries():
+    directory = dea_cache.cache_dir()
+    return [f for f in os.listdir(directory) if f.endswith(".npz")] if os.path.isdir(directory) else []
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("stream", [iter_dea_analysis, iter_ranking_dea, iter_hr_dea_analysis])
+def test_cancelled_run_writes_nothing(stream):
+    df, inputs, outputs = _frame()
+    token = CancellationToken()
+    results = []
+    for k, result in stream(df, "DMU", inputs, outputs, cancel=token):
+        results.append(result)
+        if len(results) == 3:
+            token.cancel()
+    assert len(results) < len(df)
+    assert _cached_entries() == []
+    # Nor were partial scores kept in the session store for later runs to reuse
+    assert not any({"scores", "arrays"} & set(entry) for entry in dea_analysis._result_store.values())
+
+
+def test_ranking_after_cancelled_efficiency_solves_the_sbm_phase():
+    df, inputs, outputs = _frame()
+    token = CancellationToken()
+    for k, _ in iter_dea_analysis(df, "DMU", inputs, outputs, cancel=token):
+        token.cancel()
+    report = RunReport()
+    run_ranking_dea(df, "DMU", inputs, outputs, report=report)
+    assert not report.cached
+    assert "sbm" in {r["phase"] for r in report.records}
@@ -0,0 +1,29 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import CROSS_GOALS, run_cross_efficiency
+from dea_reference import cross_efficiency_scores, make_frame, scores_of, theta_against
+
+
+# ===== TEST DATA =====
+def _data():
+    rng = np.random.default_rng(23)
+    # Columns on different scales: the weights are solved on scaled columns
+    return rng.uniform(1, 10, (20, 2)) * [1.0, 1000.0], rng.uniform(1, 10, (20, 2)) * [0.01, 1.0]
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("goal", CROSS_GOALS)
+def test_cross_efficiency_matches_reference_lps(goal):
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_cross_efficiency(df, "DMU", inputs, outputs, secondary_goal=goal, use_cache=False)
+    theta = [theta_against(X, Y, X[k], Y[k], "crs") for k in range(len(X))]
+    assert scores_of(results, "self_efficiency") == pytest.approx(theta, abs=1e-6)
+    expected = cross_efficiency_scores(X, Y, goal)
+    assert scores_of(results, "score") == pytest.approx(expected, abs=1e-5)
+    # Rank 1 is the highest mean rating
+    ranks = [r["rank"] for r in results]
+    assert ranks[int(np.argmax(expected))] == 1
+
@@ -0,0 +1,65 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import os
+
+import numpy as np
+
+from app.logic import dea_cache
+from app.logic.dea_analysis import RunReport, clear_result_store, run_dea_analysis, run_ranking_dea
+from dea_reference import make_frame
+
+
+# ===== TEST DATA =====
+def _frame():
+    rng = np.random.default_rng(9)
+    return make_frame(rng.uniform(1, 10, (20, 2)), rng.uniform(1, 10, (20, 2)))
+
+
+def _cached_run(run, df, inputs, outputs):
+    # A fresh session, so only the disk cache can answer
+    clear_result_store()
+    report = RunReport()
+    return run(df, "DMU", inputs, outputs, report=report), report
+
+
+# ===== TESTS =====
+def test_results_round_trip_through_disk_cache():
+    df, inputs, outputs = _frame()
+    for run in (run_dea_analysis, run_ranking_dea):
+        first, report = _cached_run(run, df, inputs, outputs)
+        assert not report.cached and report.records
+        second, report = _cached_run(run, df, inputs, outputs)
+        assert report.cached and not report.records
+        assert second == first
+    # The ranking keeps its infeasible super-SBM statuses through the cache
+    assert {r["status"] for r in second} == {"optimal", "infeasible"}
+
+
+def test_corrupt_entry_is_dropped_and_recomputed():
+    df, inputs, outputs = _frame()
+    first, _ = _cached_run(run_dea_analysis, df, inputs, outputs)
+    (name,) = [f for f in os.listdir(dea_cache.cache_dir()) if f.endswith(".npz")]
+    path = os.path.join(dea_cache.cache_dir(), name)
+    with open(path, "wb") as f:
+        f.write(b"not an npz archive")
+    assert dea_cache.load(name[:-len(".npz")]) is None
+    assert not os.path.exists(path)
+
+    with open(path, "wb") as f:
+        f.write(b"not an npz archive")
+    second, report = _cached_run(run_dea_analysis, df, inputs, outputs)
+    assert not report.cached
+    assert second == first
+
+
+def test_trim_removes_least_recently_used_entries(monkeypatch):
+    rng = np.random.default_rng(0)
+    for key in "abc":
+        dea_cache.save(key, values=rng.random(2000))
+    size = os.path.getsize(dea_cache._path("a"))
+    for stamp, key in enumerate("abc"):
+        os.utime(dea_cache._path(key), (100 + stamp, 100 + stamp))
+    # A hit makes "a" the most recently used entry, so "b" is now the oldest
+    assert dea_cache.load("a") is not None
+    monkeypatch.setattr(dea_cache, "CACHE_SIZE_LIMIT", int(3.5 * size))
+    dea_cache.save("d", values=rng.random(2000))
+    assert [key for key in "abcd" if os.path.exists(dea_cache._path(key))] == ["a", "c", "d"]
@@ -0,0 +1,48 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import run_fdh_analysis, run_order_m_analysis
+from dea_reference import bcc_theta, fdh_theta, make_frame, scores_of
+
+
+# ===== TEST DATA =====
+def _data():
+    # Small integers give ties, duplicates and chains of dominance
+    rng = np.random.default_rng(18)
+    return rng.integers(1, 6, (40, 3)).astype(float), rng.integers(1, 6, (40, 2)).astype(float)
+
+
+# ===== TESTS =====
+def test_fdh_matches_enumeration():
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_fdh_analysis(df, "DMU", inputs, outputs, use_cache=False)
+    expected = [fdh_theta(X, Y, k) for k in range(len(X))]
+    assert scores_of(results, "score") == pytest.approx(expected, abs=1e-12)
+    # The free disposal hull lies inside the VRS technology
+    assert (np.array(expected) >= [bcc_theta(X, Y, k) - 1e-9 for k in range(len(X))]).all()
+
+
+def test_fdh_peer_sets_the_score():
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    for k, r in enumerate(run_fdh_analysis(df, "DMU", inputs, outputs, use_cache=False)):
+        j = int(r["peer"][1:])
+        assert (Y[j] >= Y[k]).all()
+        assert (X[j] / X[k]).max() == pytest.approx(r["score"])
+        assert r["score"] <= 1
+
+
+def test_order_m_approaches_fdh_as_m_grows():
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    fdh = np.array([fdh_theta(X, Y, k) for k in range(len(X))])
+    gaps = []
+    for m in (1, 5, 25, 500):
+        scores = scores_of(run_order_m_analysis(df, "DMU", inputs, outputs, m=m, use_cache=False), "score")
+        # m draws from the candidates can only miss the best peer
+        assert (scores >= fdh - 1e-12).all()
+        gaps.append(np.abs(scores - fdh).mean())
+    assert all(a > b for a, b in zip(gaps, gaps[1:]))
+    assert gaps[-1] < 1e-3
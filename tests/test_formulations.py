@@ -0,0 +1,76 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import run_dea_analysis, run_hr_dea_analysis, run_ranking_dea
+from dea_reference import bcc_theta, make_frame, ranking_scores, sbm_score, scores_of
+
+
+# ===== TEST DATA =====
+def _random_data():
+    rng = np.random.default_rng(8)
+    return rng.uniform(1, 10, (25, 3)), rng.uniform(1, 10, (25, 2))
+
+
+def _degenerate_data():
+    # Duplicate DMUs (one of them efficient), a constant input, a zero input and a DMU with
+    # the largest output of all, whose super-SBM LP is infeasible
+    X, Y = _random_data()
+    X[:, 1] = 5.0
+    X[4, 0] = 0.0
+    Y[7] = Y.max(axis=0) * 1.5
+    X[[20, 21, 22]], Y[[20, 21, 22]] = X[[3, 4, 3]], Y[[3, 4, 3]]
+    return X, Y
+
+
+DATASETS = {"random": _random_data, "degenerate": _degenerate_data}
+MODELS = {
+    "sbm": (run_dea_analysis, "efficiency", lambda X, Y: [sbm_score(X, Y, k) for k in range(len(X))]),
+    "bcc": (run_hr_dea_analysis, "score", lambda X, Y: [bcc_theta(X, Y, k) for k in range(len(X))]),
+    "ranking": (run_ranking_dea, "score", ranking_scores),
+}
+# Every run must give the reference scores, whatever the formulation, batching, pool or backend
+ENGINES = {
+    "envelopment": {},
+    "multiplier": {"formulation": "multiplier"},
+    "batched": {"batch_size": 4},
+    "batched multiplier": {"batch_size": 4, "formulation": "multiplier"},
+    "no frontier": {"frontier_first": False},
+    "multiplier no frontier": {"formulation": "multiplier", "frontier_first": False},
+    "two jobs": {"n_jobs": 2},
+    "cbc": {"solver": "cbc"},
+}
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("dataset", DATASETS)
+def test_scores_match_reference_lp(dataset, model, engine):
+    X, Y = DATASETS[dataset]()
+    df, inputs, outputs = make_frame(X, Y)
+    run, key, reference = MODELS[model]
+    results = run(df, "DMU", inputs, outputs, use_cache=False, **ENGINES[engine])
+    expected = np.asarray(reference(X, Y), dtype=float)
+    # CBC stops at its own (looser) optimality tolerance
+    atol = 1e-6 if engine == "cbc" else 1e-7
+    np.testing.assert_allclose(scores_of(results, key), expected, atol=atol)
+    assert all(r["status"] == ("infeasible" if np.isnan(e) else "optimal") for r, e in zip(results, expected))
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_multiplier_matches_envelopment(model):
+    X, Y = _degenerate_data()
+    df, inputs, outputs = make_frame(X, Y)
+    run, key, _ = MODELS[model]
+    envelopment = run(df, "DMU", inputs, outputs, use_cache=False)
+    multiplier = run(df, "DMU", inputs, outputs, use_cache=False, formulation="multiplier")
+    np.testing.assert_allclose(scores_of(multiplier, key), scores_of(envelopment, key), atol=1e-8)
+    assert [r["status"] for r in multiplier] == [r["status"] for r in envelopment]
+
+
+def test_degenerate_ranking_has_an_infeasible_dmu():
+    X, Y = _degenerate_data()
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_ranking_dea(df, "DMU", inputs, outputs, use_cache=False)
+    assert results[7] == {"dmu": "d7", "score": None, "status": "infeasible"}
@@ -0,0 +1,36 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic import dea_analysis
+from app.logic.dea_analysis import run_dea_analysis
+from dea_reference import make_frame, sbm_score, scores_of
+
+
+# ===== TEST DATA =====
+def _data():
+    rng = np.random.default_rng(25)
+    X, Y = rng.uniform(1, 10, (36, 3)), rng.uniform(1, 10, (36, 2))
+    groups = np.array(["a", "b", "c"])[rng.integers(0, 3, 36)]
+    return X, Y, groups
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_grouped_sbm_equals_separate_runs(n_jobs):
+    X, Y, groups = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    df["group"] = groups
+    grouped = run_dea_analysis(df, "DMU", inputs, outputs, groups="group", n_jobs=n_jobs, use_cache=False)
+    assert [r["group"] for r in grouped] == list(groups)
+    for label in np.unique(groups):
+        idx = np.flatnonzero(groups == label)
+        dea_analysis.clear_result_store()
+        separate = run_dea_analysis(df.iloc[idx].reset_index(drop=True), "DMU", inputs, outputs, use_cache=False)
+        assert scores_of([grouped[k] for k in idx], "efficiency") == pytest.approx(
+            scores_of(separate, "efficiency"), abs=1e-9
+        )
+        assert [grouped[k]["peers"] for k in idx] == [r["peers"] for r in separate]
+        # And both agree with the reference LP on the group's rows alone
+        expected = [sbm_score(X[idx], Y[idx], k) for k in range(len(idx))]
+        assert scores_of(separate, "efficiency") == pytest.approx(expected, abs=1e-6)
@@ -0,0 +1,51 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import RunReport, clear_result_store, run_dea_analysis
+from dea_reference import make_frame, scores_of
+
+
+# ===== TEST DATA =====
+def _frame():
+    rng = np.random.default_rng(10)
+    return make_frame(rng.uniform(1, 10, (40, 3)), rng.uniform(1, 10, (40, 2)))
+
+
+def _worsen(df, inputs, outputs):
+    df.loc[5, inputs] *= 1.5
+
+
+def _improve(df, inputs, outputs):
+    # Far better than every DMU: it becomes the peer of many others
+    df.loc[12, inputs] = df[inputs].min().to_numpy() * 0.9
+    df.loc[12, outputs] = df[outputs].max().to_numpy()
+
+
+def _nudge(df, inputs, outputs):
+    df.loc[30, outputs[0]] += 0.25
+
+
+# Each edit and whether it stays an update; an edit that affects more than a quarter of
+# the DMUs falls back to a full re-solve
+EDITS = {"worsen": (_worsen, True), "improve": (_improve, False), "nudge": (_nudge, True)}
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("edit", EDITS)
+def test_incremental_update_matches_full_resolve(edit):
+    df, inputs, outputs = _frame()
+    run_dea_analysis(df, "DMU", inputs, outputs, use_cache=False, incremental=True)
+    edited = df.copy()
+    apply, partial = EDITS[edit]
+    apply(edited, inputs, outputs)
+
+    report = RunReport()
+    updated = run_dea_analysis(edited, "DMU", inputs, outputs, use_cache=False, incremental=True, report=report)
+    clear_result_store()
+    full = run_dea_analysis(edited, "DMU", inputs, outputs, use_cache=False)
+
+    np.testing.assert_allclose(scores_of(updated, "efficiency"), scores_of(full, "efficiency"), atol=1e-8)
+    assert [r["status"] for r in updated] == [r["status"] for r in full]
+    # An update solves only the DMUs the edit can affect
+    assert (0 < len(report.records) < len(df)) if partial else len(report.records) == len(df)
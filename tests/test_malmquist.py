@@ -0,0 +1,46 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.logic.dea_analysis import run_malmquist_analysis
+from dea_reference import theta_against
+
+
+# ===== TEST DATA =====
+def _panel(T: int = 3, K: int = 12):
+    # K DMUs over T periods, with a drifting frontier; the last DMU skips the middle period
+    rng = np.random.default_rng(22)
+    X = rng.uniform(1, 10, (T, K, 2)) * np.linspace(1.0, 0.8, T)[:, None, None]
+    Y = rng.uniform(1, 10, (T, K, 2))
+    rows = [(f"d{k}", t, *X[t, k], *Y[t, k]) for t in range(T) for k in range(K) if not (k == K - 1 and t == 1)]
+    return pd.DataFrame(rows, columns=["DMU", "period", "x0", "x1", "y0", "y1"]), X, Y
+
+
+def _frontier(X, Y, t, K):
+    # Period t's DMUs; the last DMU is missing in period 1
+    keep = np.arange(K) if t != 1 else np.arange(K - 1)
+    return X[t, keep], Y[t, keep]
+
+
+# ===== TESTS =====
+def test_crs_malmquist_matches_reference_lps():
+    df, X, Y = _panel()
+    T, K = X.shape[:2]
+    results = run_malmquist_analysis(df, "DMU", "period", ["x0", "x1"], ["y0", "y1"], use_cache=False)
+    assert len(results) == (T - 1) * (K - 1)
+    for r in results:
+        k, t = int(r["dmu"][1:]), r["period_from"]
+        assert r["period_to"] == t + 1 and r["status"] == "optimal"
+
+        def theta(s, u):
+            # Period u's point of DMU k against the CRS frontier of period s
+            return theta_against(*_frontier(X, Y, s, K), X[u, k], Y[u, k], "crs")
+
+        own, following = theta(t, t), theta(t + 1, t + 1)
+        assert r["efficiency_from"] == pytest.approx(own, abs=1e-6)
+        assert r["efficiency_to"] == pytest.approx(following, abs=1e-6)
+        assert r["efficiency_change"] == pytest.approx(following / own, rel=1e-6)
+        shift = np.sqrt(theta(t, t + 1) / following * own / theta(t + 1, t))
+        assert r["technical_change"] == pytest.approx(shift, rel=1e-6)
+        assert r["malmquist"] == pytest.approx(r["efficiency_change"] * r["technical_change"], rel=1e-12)
@@ -0,0 +1,63 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import RunReport, run_dea_analysis, run_hr_dea_analysis
+from dea_reference import bcc_theta, make_frame, sbm_score, scores_of
+
+
+# ===== TEST DATA =====
+def _degenerate_data(constant: bool, zero: bool, duplicates: bool):
+    rng = np.random.default_rng(15)
+    X = rng.uniform(1, 10, (14, 3))
+    Y = rng.uniform(1, 10, (14, 2))
+    if constant:
+        X[:, 2] = 4.0
+        Y[:, 1] = 7.0
+    if zero:
+        X[3, 0] = 0.0
+        X[9, 1] = 0.0
+    if duplicates:
+        X[[10, 11, 12]], Y[[10, 11, 12]] = X[[1, 3, 1]], Y[[1, 3, 1]]
+    return X, Y
+
+
+CASES = {
+    "constant column": dict(constant=True, zero=False, duplicates=False),
+    "zero input": dict(constant=False, zero=True, duplicates=False),
+    "duplicate DMUs": dict(constant=False, zero=False, duplicates=True),
+    "all at once": dict(constant=True, zero=True, duplicates=True),
+}
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("frontier_first", [True, False])
+def test_presolved_sbm_matches_raw_lp(case, frontier_first):
+    X, Y = _degenerate_data(**CASES[case])
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_dea_analysis(df, "DMU", inputs, outputs, frontier_first=frontier_first, use_cache=False)
+    expected = [sbm_score(X, Y, k) for k in range(len(X))]
+    assert all(r["status"] == "optimal" for r in results)
+    np.testing.assert_allclose(scores_of(results, "efficiency"), expected, atol=1e-7)
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("frontier_first", [True, False])
+def test_presolved_bcc_matches_raw_lp(case, frontier_first):
+    X, Y = _degenerate_data(**CASES[case])
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_hr_dea_analysis(df, "DMU", inputs, outputs, frontier_first=frontier_first, use_cache=False)
+    expected = [bcc_theta(X, Y, k) for k in range(len(X))]
+    assert all(r["status"] == "optimal" for r in results)
+    np.testing.assert_allclose(scores_of(results, "score"), expected, atol=1e-7)
+
+
+def test_duplicate_dmus_share_one_lp():
+    X, Y = _degenerate_data(constant=False, zero=False, duplicates=True)
+    df, inputs, outputs = make_frame(X, Y)
+    report = RunReport()
+    results = run_hr_dea_analysis(df, "DMU", inputs, outputs, frontier_first=False, use_cache=False, report=report)
+    assert report.presolve["duplicate_dmus"] == 3
+    assert len(report.records) == len(X) - 3
+    assert results[10]["score"] == results[12]["score"] == results[1]["score"]
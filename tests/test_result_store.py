@@ -0,0 +1,36 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pandas as pd
+
+from app.logic.dea_analysis import (
+    RunReport, run_cross_efficiency, run_dea_analysis, run_malmquist_analysis, run_ranking_dea, run_scale_efficiency,
+)
+from dea_reference import make_frame
+
+
+# ===== TEST DATA =====
+def _panel(periods: int = 10, K: int = 12):
+    rng = np.random.default_rng(6)
+    frames = []
+    for t in range(periods):
+        df, inputs, outputs = make_frame(rng.uniform(1, 10, (K, 2)), rng.uniform(1, 10, (K, 2)))
+        df.insert(1, "period", 2000 + t)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True), inputs, outputs
+
+
+# ===== TESTS =====
+def test_ranking_reuses_efficiency_scores_after_other_runs():
+    rng = np.random.default_rng(7)
+    df, inputs, outputs = make_frame(rng.uniform(1, 10, (30, 2)), rng.uniform(1, 10, (30, 2)))
+    panel, panel_inputs, panel_outputs = _panel()
+    run_dea_analysis(df, "DMU", inputs, outputs, use_cache=False)
+    # One frontier per period, plus the CRS/VRS frontiers of the other runs
+    run_malmquist_analysis(panel, "DMU", "period", panel_inputs, panel_outputs, use_cache=False)
+    run_cross_efficiency(df, "DMU", inputs, outputs, use_cache=False)
+    run_scale_efficiency(df, "DMU", inputs, outputs, use_cache=False)
+
+    report = RunReport()
+    run_ranking_dea(df, "DMU", inputs, outputs, use_cache=False, report=report)
+    phases = {r["phase"] for r in report.records}
+    assert phases == {"super-efficiency"}
@@ -0,0 +1,48 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import CONVEXITY_BOUNDS, run_scale_efficiency
+from dea_reference import make_frame, scores_of, theta_against
+
+
+# ===== TEST DATA =====
+def _data():
+    rng = np.random.default_rng(24)
+    X = rng.uniform(1, 10, (40, 2))
+    # Output grows slower than the inputs: small DMUs sit below the optimal scale, large ones above it
+    Y = (X.sum(axis=1, keepdims=True) ** 0.7) * rng.uniform(0.5, 1.0, (40, 2))
+    return X, Y
+
+
+def _label(crs, nirs, vrs, tol=1e-6):
+    if vrs - crs <= tol:
+        return "CRS"
+    return "IRS" if nirs - crs <= tol else "DRS"
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("frontier_first", [True, False])
+def test_scale_scores_and_labels_match_reference_lps(frontier_first):
+    X, Y = _data()
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_scale_efficiency(df, "DMU", inputs, outputs, frontier_first=frontier_first, use_cache=False)
+    expected = {
+        model: np.array([theta_against(X, Y, X[k], Y[k], model) for k in range(len(X))]) for model in CONVEXITY_BOUNDS
+    }
+    for model in CONVEXITY_BOUNDS:
+        assert scores_of(results, model) == pytest.approx(expected[model], abs=1e-6)
+    assert scores_of(results, "scale_efficiency") == pytest.approx(expected["crs"] / expected["vrs"], abs=1e-6)
+    labels = [_label(*(expected[model][k] for model in CONVEXITY_BOUNDS)) for k in range(len(X))]
+    assert [r["returns_to_scale"] for r in results] == labels
+    assert set(labels) == {"IRS", "CRS", "DRS"}
+
+
+def test_returns_to_scale_along_one_input_frontier():
+    # VRS frontier (1, 1) - (2, 4) - (4, 6) - (8, 7); the CRS ray touches it at (2, 4) only
+    X = np.array([[1.0], [2.0], [4.0], [8.0], [3.0]])
+    Y = np.array([[1.0], [4.0], [6.0], [7.0], [2.0]])
+    df, inputs, outputs = make_frame(X, Y)
+    results = run_scale_efficiency(df, "DMU", inputs, outputs, use_cache=False)
+    assert [r["returns_to_scale"] for r in results][:4] == ["IRS", "CRS", "DRS", "DRS"]
+    assert scores_of(results, "crs") == pytest.approx([0.5, 1.0, 0.75, 0.4375, 1 / 3])
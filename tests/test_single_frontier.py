@@ -0,0 +1,51 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import numpy as np
+import pytest
+
+from app.logic.dea_analysis import RunReport, run_dea_analysis, run_hr_dea_analysis
+from dea_reference import bcc_theta, make_frame, sbm_score, scores_of
+
+
+# ===== TEST DATA =====
+def _ties_and_zeros():
+    # Duplicate points, equal inputs with different outputs and the reverse, zero outputs
+    # and a zero input
+    x = np.array([2.0, 4, 4, 6, 8, 8, 0, 5, 5, 10, 7, 2, 3])
+    y = np.array([1.0, 3, 3, 4, 4, 6, 0, 3, 2, 6, 0, 1, 1])
+    return x[:, None], y[:, None]
+
+
+def _integer_grid():
+    # Few distinct values, so most DMUs tie with another one on x, y or both
+    rng = np.random.default_rng(17)
+    return rng.integers(0, 6, (60, 1)).astype(float), rng.integers(0, 6, (60, 1)).astype(float)
+
+
+DATASETS = {"ties and zeros": _ties_and_zeros, "integer grid": _integer_grid}
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("dataset", DATASETS)
+def test_single_sbm_matches_lp(dataset):
+    X, Y = DATASETS[dataset]()
+    df, inputs, outputs = make_frame(X, Y)
+    report = RunReport()
+    results = run_dea_analysis(df, "DMU", inputs, outputs, use_cache=False, report=report)
+    assert report.records == []
+    scores = scores_of(results, "efficiency")
+    np.testing.assert_allclose(scores, [sbm_score(X, Y, k) for k in range(len(X))], atol=1e-9)
+    # With one input the slack is the whole input excess
+    slacks = np.array([r["slacks"][inputs[0]] for r in results])
+    np.testing.assert_allclose(slacks, X[:, 0] * (1 - scores), atol=1e-9)
+
+
+@pytest.mark.parametrize("dataset", DATASETS)
+def test_single_bcc_matches_lp(dataset):
+    X, Y = DATASETS[dataset]()
+    df, inputs, outputs = make_frame(X, Y)
+    report = RunReport()
+    results = run_hr_dea_analysis(df, "DMU", inputs, outputs, use_cache=False, report=report)
+    assert report.records == []
+    # run_hr_dea_analysis reads zeros as 1e-6 (_prepare_bcc_data)
+    X, Y = np.clip(X, 1e-6, None), np.clip(Y, 1e-6, None)
+    np.testing.assert_allclose(scores_of(results, "score"), [bcc_theta(X, Y, k) for k in range(len(X))], atol=1e-9)
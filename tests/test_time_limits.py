@@ -0,0 +1,68 @@
+# ===== IMPORTS & DEPENDENCIES =====
+import os
+from functools import partial
+
+import numpy as np
+import pytest
+
+from app.logic import dea_analysis, dea_cache
+from app.logic.dea_analysis import (
+    RunReport, run_cross_efficiency, run_dea_analysis, run_hr_dea_analysis, run_malmquist_analysis,
+    run_ranking_dea, run_scale_efficiency,
+)
+from dea_reference import make_frame
+
+
+# ===== TEST DATA =====
+def _frame():
+    rng = np.random.default_rng(20)
+    df, inputs, outputs = make_frame(rng.uniform(1, 10, (30, 2)), rng.uniform(1, 10, (30, 2)))
+    return df, inputs, outputs
+
+
+def _malmquist(df, dmu_column, inputs, outputs, **kwargs):
+    # The 30 rows as 10 DMUs over 3 periods
+    df = df.assign(period=np.repeat([1, 2, 3], 10), DMU=[f"DMU_{k % 10}" for k in range(30)])
+    return run_malmquist_analysis(df, dmu_column, "period", inputs, outputs, **kwargs)
+
+
+ENTRY_POINTS = {
+    "sbm": run_dea_analysis, "ranking": run_ranking_dea, "hr": run_hr_dea_analysis, "scale": run_scale_efficiency,
+    "cross": partial(run_cross_efficiency, secondary_goal="aggressive"), "malmquist": _malmquist,
+}
+
+
+def _cached_entries():
+    directory = dea_cache.cache_dir()
+    return [f for f in os.listdir(directory) if f.endswith(".npz")] if os.path.isdir(directory) else []
+
+
+# ===== TESTS =====
+@pytest.mark.parametrize("name", ENTRY_POINTS)
+def test_spent_budget_leaves_every_row_unresolved_and_uncached(name):
+    df, inputs, outputs = _frame()
+    results = ENTRY_POINTS[name](df, "DMU", inputs, outputs, time_budget=0)
+    assert {r["status"] for r in results} == {"unresolved"}
+    assert _cached_entries() == []
+
+    # The next run without a budget reuses nothing partial, solves everything and only then fills the cache
+    report = RunReport()
+    results = ENTRY_POINTS[name](df, "DMU", inputs, outputs, report=report)
+    assert not report.cached
+    assert {r["status"] for r in results} <= {"optimal", "infeasible"}
+    assert _cached_entries()
+
+
+@pytest.mark.parametrize("name", ["sbm", "scale"])
+def test_tiny_time_limit_gives_true_scores_or_unresolved(name):
+    df, inputs, outputs = _frame()
+    exact = ENTRY_POINTS[name](df, "DMU", inputs, outputs, use_cache=False)
+    dea_analysis.clear_result_store()
+    limited = ENTRY_POINTS[name](df, "DMU", inputs, outputs, time_limit=1e-9)
+    key = "efficiency" if name == "sbm" else "crs"
+    for a, b in zip(exact, limited):
+        # An LP stopped on its limit is never reported as an answer
+        if b["status"] != "unresolved":
+            assert b[key] == pytest.approx(a[key], abs=1e-6)
+    if any(b["status"] == "unresolved" for b in limited):
+        assert _cached_entries() == []
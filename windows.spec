@@ -9,7 +9,7 @@ a = Analysis(
     binaries=[(CBC_EXECUTABLE_PATH, '.')],
     
     datas=[],
-    hiddenimports=['pulp', 'pulp.apis'],
+    hiddenimports=['pulp', 'pulp.apis', 'highspy'],
     hookspath=[],
     runtime_hooks=[],
     excludes=[],